@@ -2,11 +2,14 @@ from datetime import datetime, timedelta
 from typing import Optional
 from pydantic import BaseModel, Field
 
-import google.generativeai as genai
 import os
 import json
 
+from loguru import logger
+from utils.log import log_payload
 from grounding_service import GroundedTourExtractor
+from utils.llm_cache import cached_generate, parse_json_reply
+from utils.llm_provider import get_llm_provider
 import asyncio
 
 class TourInfo(BaseModel):
@@ -107,22 +110,14 @@ Extract all relevant information with intelligent assumptions based on traveler
 
 def extract_tour_information(query: str) -> ExtractedInfo:
     """Extract tour information using Google Gemini"""
-    print("🤖 [GEMINI-DELEGATOR] Starting tour information extraction with Gemini...")
-    print(f"📝 [GEMINI-DELEGATOR] Query: {query}")
+    logger.debug("🤖 [GEMINI-DELEGATOR] Starting tour information extraction with Gemini...")
+    logger.debug("📝 [GEMINI-DELEGATOR] Query: {}", query)
 
     try:
-        # Configure Gemini API
-        api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_API_KEY')
-        if not api_key:
-            raise ValueError("No API key found. Please set GEMINI_API_KEY or GOOGLE_API_KEY environment variable.")
-
-        print("🔑 [GEMINI-DELEGATOR] API key configured for Gemini")
-        genai.configure(api_key=api_key)
-
-        # Create Gemini model
+        # Calls go through the configured provider (live Gemini, recording or replay)
+        provider = get_llm_provider()
         model_name = "gemini-2.5-flash-lite"
-        model = genai.GenerativeModel(model_name)
-        print(f"🎯 [GEMINI-DELEGATOR] Using Gemini model: {model_name}")
+        logger.info("🎯 [GEMINI-DELEGATOR] Using model: {} ({} provider)", model_name, provider.name)
 
         # Format the prompt with the current date
         formatted_prompt = TOUR_PLANNER_PROMPT.format(
@@ -130,13 +125,16 @@ def extract_tour_information(query: str) -> ExtractedInfo:
             query=query
         )
 
-        print("📤 [GEMINI-DELEGATOR] Sending request to Gemini...")
+        logger.debug("📤 [GEMINI-DELEGATOR] Sending request to Gemini...")
         # Use Gemini to extract information
-        response = model.generate_content(formatted_prompt)
+        response_text = cached_generate(
+            "extraction.plan", model_name, formatted_prompt,
+            lambda: provider.generate(model_name, formatted_prompt, site="extraction.plan").text
+        )
 
-        print("✅ [GEMINI-DELEGATOR] Gemini response received")
-        print(f"📄 [GEMINI-DELEGATOR] Response length: {len(response.text)} characters")
-        print(f"💬 [GEMINI-DELEGATOR] Response preview: {response.text[:200]}...")
+        logger.info("✅ [GEMINI-DELEGATOR] Gemini response received")
+        logger.debug("📄 [GEMINI-DELEGATOR] Response length: {} characters", len(response_text))
+        log_payload("💬 [GEMINI-DELEGATOR] Response", response_text)
 
         # Parse the Gemini response to extract actual information
         # Use Gemini to intelligently extract destination from the query
@@ -160,14 +158,16 @@ def extract_tour_information(query: str) -> ExtractedInfo:
         """
 
         try:
-            extraction_response = model.generate_content(extraction_prompt)
-            destination = extraction_response.text.strip()
-            print(f"🎯 [GEMINI-DELEGATOR] Extracted destination: {destination}")
+            destination = cached_generate(
+                "extraction.destination", model_name, extraction_prompt,
+                lambda: provider.generate(model_name, extraction_prompt, site="extraction.destination").text
+            ).strip()
+            logger.info("🎯 [GEMINI-DELEGATOR] Extracted destination: {}", destination)
         except Exception as e:
-            print(f"⚠️  [GEMINI-DELEGATOR] Failed to extract destination with Gemini: {e}")
+            logger.warning("⚠️  [GEMINI-DELEGATOR] Failed to extract destination with Gemini: {}", e)
             # Fallback: extract from query manually
             destination = extract_destination_from_query(query)
-            print(f"🔄 [GEMINI-DELEGATOR] Fallback destination extraction: {destination}")
+            logger.debug("🔄 [GEMINI-DELEGATOR] Fallback destination extraction: {}", destination)
 
         # Extract dates from the original query
         departure_date = None
@@ -208,8 +208,8 @@ def extract_tour_information(query: str) -> ExtractedInfo:
             departure_date = (today + timedelta(days=30)).strftime("%Y-%m-%d")
             return_date = (today + timedelta(days=37)).strftime("%Y-%m-%d")
 
-        print(f"📅 [GEMINI-DELEGATOR] Parsed dates - Departure: {departure_date}, Return: {return_date}")
-        print(f"🎯 [GEMINI-DELEGATOR] Final destination: {destination}")
+        logger.debug("📅 [GEMINI-DELEGATOR] Parsed dates - Departure: {}, Return: {}", departure_date, return_date)
+        logger.info("🎯 [GEMINI-DELEGATOR] Final destination: {}", destination)
 
         # Ask Gemini to provide airport IATA codes dynamically (no hardcoded defaults)
         airports_prompt = f"""
@@ -225,21 +225,21 @@ User request: "{query}"
 Destination: "{destination}"
 """
 
-        airports_resp = model.generate_content(airports_prompt)
-        airports_text = (airports_resp.text or "").strip()
-        try:
-            airports_data = json.loads(airports_text)
-        except Exception:
-            m2 = re.search(r"\{[\s\S]*\}", airports_text)
-            if not m2:
-                airports_data = {}
-            else:
-                airports_data = json.loads(m2.group(0))
-
         # Normalize IATA outputs
         def code_ok(code: str) -> bool:
             return bool(code) and bool(re.fullmatch(r"[A-Z]{3}", code.strip().upper()))
 
+        def airports_reply_ok(text: str) -> bool:
+            data = parse_json_reply(text)
+            return data is not None and isinstance(data.get("airport_to"), str) and code_ok(data["airport_to"])
+
+        airports_text = cached_generate(
+            "extraction.airports", model_name, airports_prompt,
+            lambda: provider.generate(model_name, airports_prompt, site="extraction.airports").text,
+            validate=airports_reply_ok
+        ).strip()
+        airports_data = parse_json_reply(airports_text) or {}
+
         airport_from = (airports_data.get("airport_from") or "").upper()
         airport_to = (airports_data.get("airport_to") or "").upper()
         alt_from = [c.strip().upper() for c in (airports_data.get("alternative_airports_from") or []) if isinstance(c, str)]
@@ -299,7 +299,7 @@ Destination: "{destination}"
         )
 
     except Exception as e:
-        print(f"❌ [GEMINI-DELEGATOR] Error: {str(e)}")
+        logger.error("❌ [GEMINI-DELEGATOR] Error: {}", str(e))
         return ExtractedInfo(
             reasoning="Failed to extract tour information with Gemini",
             tour_info=None
@@ -1,6 +1,9 @@
-import google.generativeai as genai
 import os
 
+from loguru import logger
+from utils.log import log_payload
+from utils.llm_provider import get_llm_provider
+
 ITINERARY_WRITE_PROMPT = """
 You're a seasoned travel planner with a knack for finding the best deals and exploring new destinations. You're known for your attention to detail
 and your ability to make travel planning easy for customers.
@@ -46,23 +49,15 @@ def write_itinerary(
     language: str = "english",
 ) -> str:
     """Generate itinerary using Google Gemini SDK"""
-    print("🤖 [GEMINI-ITINERARY] Starting itinerary generation with Gemini...")
-    print(f"📍 [GEMINI-ITINERARY] Destination: {destination}")
-    print(f"🌐 [GEMINI-ITINERARY] Language: {language}")
+    logger.debug("🤖 [GEMINI-ITINERARY] Starting itinerary generation with Gemini...")
+    logger.info("📍 [GEMINI-ITINERARY] Destination: {}", destination)
+    logger.debug("🌐 [GEMINI-ITINERARY] Language: {}", language)
 
     try:
-        # Configure Gemini API
-        api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_API_KEY')
-        if not api_key:
-            raise ValueError("No API key found. Please set GEMINI_API_KEY or GOOGLE_API_KEY environment variable.")
-
-        print("🔑 [GEMINI-ITINERARY] API key configured for Gemini")
-        genai.configure(api_key=api_key)
-
-        # Create Gemini model
+        # Calls go through the configured provider (live Gemini, recording or replay)
+        provider = get_llm_provider()
         model_name = "gemini-2.5-flash-lite"
-        model = genai.GenerativeModel(model_name)
-        print(f"🎯 [GEMINI-ITINERARY] Using Gemini model: {model_name}")
+        logger.info("🎯 [GEMINI-ITINERARY] Using model: {} ({} provider)", model_name, provider.name)
 
         # Format the prompt with all the information
         formatted_prompt = ITINERARY_WRITE_PROMPT.format(
@@ -74,28 +69,28 @@ def write_itinerary(
             language=language
         )
 
-        print("📤 [GEMINI-ITINERARY] Sending request to Gemini...")
-        print(f"📊 [GEMINI-ITINERARY] Input data sizes - Flights: {len(flights_info)}, Hotels: {len(hotels_info)}, Places: {len(sights_info)}")
+        logger.debug("📤 [GEMINI-ITINERARY] Sending request to Gemini...")
+        logger.debug("📊 [GEMINI-ITINERARY] Input data sizes - Flights: {}, Hotels: {}, Places: {}", len(flights_info), len(hotels_info), len(sights_info))
 
         # Use Gemini to generate the itinerary
-        response = model.generate_content(formatted_prompt)
+        response = provider.generate(model_name, formatted_prompt, site="itinerary.write")
 
-        print("✅ [GEMINI-ITINERARY] Response received")
-        print(f"📄 [GEMINI-ITINERARY] Generated itinerary length: {len(response.text)} characters")
-        print(f"💬 [GEMINI-ITINERARY] Itinerary preview: {response.text[:200]}...")
+        logger.info("✅ [GEMINI-ITINERARY] Response received")
+        logger.debug("📄 [GEMINI-ITINERARY] Generated itinerary length: {} characters", len(response.text))
+        log_payload("💬 [GEMINI-ITINERARY] Itinerary", response.text)
 
         # Clean up the response to remove any broken URLs or problematic links
         cleaned_itinerary = clean_itinerary_content(response.text)
-        print("🧹 [GEMINI-ITINERARY] Itinerary content cleaned")
+        logger.debug("🧹 [GEMINI-ITINERARY] Itinerary content cleaned")
         
         # Process the response to convert image links to proper markdown images
         processed_itinerary = process_itinerary_images(cleaned_itinerary, flights_info, hotels_info, sights_info)
-        print("🖼️  [GEMINI-ITINERARY] Images processed and embedded in itinerary")
+        logger.debug("🖼️  [GEMINI-ITINERARY] Images processed and embedded in itinerary")
 
         return processed_itinerary
 
     except Exception as e:
-        print(f"❌ [GEMINI-ITINERARY] Error: {str(e)}")
+        logger.error("❌ [GEMINI-ITINERARY] Error: {}", str(e))
         return f"Error generating itinerary with Gemini: {str(e)}"
 
 
@@ -130,7 +125,7 @@ def clean_itinerary_content(itinerary_text: str) -> str:
     cleaned_text = protected_text
     for pattern in broken_url_patterns:
         cleaned_text = re.sub(pattern, '', cleaned_text)
-        print(f"🧹 [CLEAN-ITINERARY] Removed broken URLs matching pattern: {pattern}")
+        logger.debug("🧹 [CLEAN-ITINERARY] Removed broken URLs matching pattern: {}", pattern)
     
     # Remove excessive newlines created by URL removal
     cleaned_text = re.sub(r'\n{3,}', '\n\n', cleaned_text)
@@ -156,9 +151,9 @@ def clean_itinerary_content(itinerary_text: str) -> str:
         placeholder = f"___IMG_PLACEHOLDER_{i}___"
         cleaned_text = cleaned_text.replace(placeholder, img_tag)
     
-    print(f"🧹 [CLEAN-ITINERARY] Cleaned itinerary: {len(itinerary_text)} → {len(cleaned_text)} characters")
-    print(f"🖼️  [CLEAN-ITINERARY] Preserved {len(img_tags)} image tags")
-    print(f"🧹 [CLEAN-ITINERARY] Removed Image: lines and broken URLs")
+    logger.debug("🧹 [CLEAN-ITINERARY] Cleaned itinerary: {} → {} characters", len(itinerary_text), len(cleaned_text))
+    logger.debug("🖼️  [CLEAN-ITINERARY] Preserved {} image tags", len(img_tags))
+    logger.debug("🧹 [CLEAN-ITINERARY] Removed Image: lines and broken URLs")
     return cleaned_text
 
 
@@ -169,10 +164,10 @@ def process_itinerary_images(itinerary_text: str, flights_info: str, hotels_info
     image_urls = extract_image_urls_from_data(hotels_info, sights_info)
 
     if not image_urls:
-        print("🖼️  [ITINERARY-IMAGES] No valid external images found")
+        logger.debug("🖼️  [ITINERARY-IMAGES] No valid external images found")
         return itinerary_text
 
-    print(f"🖼️  [ITINERARY-IMAGES] Found {len(image_urls)} valid images to embed inline")
+    logger.debug("🖼️  [ITINERARY-IMAGES] Found {} valid images to embed inline", len(image_urls))
     
     # Try to embed images inline near their corresponding content
     for title, url in image_urls.items():
@@ -188,7 +183,7 @@ def process_itinerary_images(itinerary_text: str, flights_info: str, hotels_info
             if location_name in itinerary_text:
                 # Add image after the first mention
                 itinerary_text = itinerary_text.replace(location_name, location_name + image_html, 1)
-                print(f"🖼️  [ITINERARY-IMAGES] Embedded inline image for: {location_name}")
+                logger.debug("🖼️  [ITINERARY-IMAGES] Embedded inline image for: {}", location_name)
             else:
                 # Try partial match (first word of location name)
                 words = location_name.split()
@@ -196,7 +191,7 @@ def process_itinerary_images(itinerary_text: str, flights_info: str, hotels_info
                     first_word = words[0]
                     if first_word in itinerary_text:
                         itinerary_text = itinerary_text.replace(first_word, first_word + image_html, 1)
-                        print(f"🖼️  [ITINERARY-IMAGES] Embedded inline image for partial match: {first_word}")
+                        logger.debug("🖼️  [ITINERARY-IMAGES] Embedded inline image for partial match: {}", first_word)
 
     return itinerary_text
 
@@ -220,17 +215,17 @@ def extract_image_urls_from_data(hotels_info: str, sights_info: str) -> dict:
         
         for pattern in problematic_patterns:
             if pattern in url:
-                print(f"🚫 [EXTRACT-IMAGES] Filtering out problematic URL containing '{pattern}': {url[:100]}...")
+                logger.debug("🚫 [EXTRACT-IMAGES] Filtering out problematic URL containing '{}': {}...", pattern, url[:100])
                 return False
         
         # Check for reasonable URL length (broken URLs tend to be extremely long)
         if len(url) > 800:  # Increased from 500 to 800 to allow longer valid URLs
-            print(f"🚫 [EXTRACT-IMAGES] Filtering out excessively long URL: {url[:100]}...")
+            logger.debug("🚫 [EXTRACT-IMAGES] Filtering out excessively long URL: {}...", url[:100])
             return False
         
         # Allow Google User Content URLs (they're usually valid, frontend will handle errors)
         if 'googleusercontent.com' in url:
-            print(f"✅ [EXTRACT-IMAGES] Allowing Google User Content URL: {url[:80]}...")
+            logger.debug("✅ [EXTRACT-IMAGES] Allowing Google User Content URL: {}...", url[:80])
             return True
             
         return True
@@ -247,7 +242,7 @@ def extract_image_urls_from_data(hotels_info: str, sights_info: str) -> dict:
                 image_url = line.replace("Image:", "").strip()
                 if is_valid_image_url(image_url):
                     image_urls[f"🏨 {current_hotel}"] = image_url
-                    print(f"🖼️  [EXTRACT-IMAGES] Found valid hotel image: {current_hotel}")
+                    logger.debug("🖼️  [EXTRACT-IMAGES] Found valid hotel image: {}", current_hotel)
 
     # Extract sights images
     if "Image:" in sights_info:
@@ -261,9 +256,9 @@ def extract_image_urls_from_data(hotels_info: str, sights_info: str) -> dict:
                 image_url = line.replace("Image:", "").strip()
                 if is_valid_image_url(image_url):
                     image_urls[f"📍 {current_sight}"] = image_url
-                    print(f"🖼️  [EXTRACT-IMAGES] Found valid sight image: {current_sight}")
+                    logger.debug("🖼️  [EXTRACT-IMAGES] Found valid sight image: {}", current_sight)
 
-    print(f"🖼️  [EXTRACT-IMAGES] Total valid images extracted: {len(image_urls)}")
+    logger.debug("🖼️  [EXTRACT-IMAGES] Total valid images extracted: {}", len(image_urls))
     return image_urls
 
 
@@ -311,20 +306,13 @@ def modify_itinerary_content(
     Returns:
         Modified itinerary in markdown format
     """
-    print("🔄 [MODIFY-ITINERARY] Starting itinerary modification with Gemini...")
-    print(f"📝 [MODIFY-ITINERARY] Original itinerary length: {len(itinerary_content)} chars")
-    print(f"💬 [MODIFY-ITINERARY] Modification request: {modification_feedback}")
+    logger.debug("🔄 [MODIFY-ITINERARY] Starting itinerary modification with Gemini...")
+    logger.debug("📝 [MODIFY-ITINERARY] Original itinerary length: {} chars", len(itinerary_content))
+    logger.debug("💬 [MODIFY-ITINERARY] Modification request: {}", modification_feedback)
     
     try:
-        # Configure Gemini
-        api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_API_KEY')
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY not found in environment variables")
-        
-        genai.configure(api_key=api_key)
-        
-        # Use Gemini 1.5 Flash for faster modifications
-        model = genai.GenerativeModel("gemini-2.5-flash-lite")
+        # Use flash-lite through the configured provider for faster modifications
+        provider = get_llm_provider()
         
         # Prepare the prompt
         prompt = ITINERARY_MODIFY_PROMPT.format(
@@ -333,11 +321,13 @@ def modify_itinerary_content(
             language=language
         )
         
-        print("🚀 [MODIFY-ITINERARY] Sending modification request to Gemini...")
+        logger.info("🚀 [MODIFY-ITINERARY] Sending modification request to Gemini...")
         
         # Generate modified itinerary
-        response = model.generate_content(
+        response = provider.generate(
+            "gemini-2.5-flash-lite",
             prompt,
+            site="itinerary.modify",
             generation_config={
                 "temperature": 0.7,
                 "top_p": 0.95,
@@ -351,11 +341,11 @@ def modify_itinerary_content(
         
         modified_itinerary = response.text.strip()
         
-        print(f"✅ [MODIFY-ITINERARY] Modification complete! New length: {len(modified_itinerary)} chars")
-        print(f"📊 [MODIFY-ITINERARY] Length change: {len(modified_itinerary) - len(itinerary_content):+d} chars")
+        logger.info("✅ [MODIFY-ITINERARY] Modification complete! New length: {} chars", len(modified_itinerary))
+        logger.debug("📊 [MODIFY-ITINERARY] Length change: {:+d} chars", len(modified_itinerary) - len(itinerary_content))
         
         return modified_itinerary
         
     except Exception as e:
-        print(f"❌ [MODIFY-ITINERARY] Error: {e}")
+        logger.error("❌ [MODIFY-ITINERARY] Error: {}", e)
         raise Exception(f"Failed to modify itinerary: {str(e)}")
@@ -0,0 +1,169 @@
+"""
+Cold Start
+Measures what a fresh process pays before it can serve: import time per module for `import main`
+(python -X importtime), then time-to-ready and first-request latency of uvicorn main:app against the
+stubbed upstreams, with the server's own startup phase timings from /metrics. Optional budgets make it fail
+when a change slows cold start down.
+
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --import-budget-ms 1500 --ready-budget-ms 4000 --json cold.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import types
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List
+
+from benchmarks.load_test import PROBE_PATH, start_server
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+_PHASE_LINE = re.compile(r'^journezy_startup_phase_seconds\{phase="([^"]+)"\} (\S+)')
+
+
+def import_profile(module: str = "main", top: int = 15) -> Dict:
+    """Import `module` in a fresh interpreter under -X importtime; per-module and per-package times in ms"""
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=REPO_ROOT,
+                          capture_output=True, text=True, env={**os.environ, "AIRPORT_REFRESH_HOURS": "0"})
+    wall_ms = (time.perf_counter() - started) * 1000
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({"module": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000,
+                            "depth": len(indent) // 2})
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+        return {"module": module, "error": error, "wall_ms": round(wall_ms, 1)}
+
+    per_package = defaultdict(float)
+    for m in modules:
+        per_package[m["module"].split(".")[0]] += m["self_ms"]
+    target = next((m for m in modules if m["module"] == module), None)
+    return {
+        "module": module,
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": round(target["cumulative_ms"] if target else sum(m["self_ms"] for m in modules), 1),
+        "modules_loaded": len(modules),
+        "slowest_modules": sorted(modules, key=lambda m: -m["self_ms"])[:top],
+        "packages_ms": dict(sorted(((k, round(v, 1)) for k, v in per_package.items()), key=lambda kv: -kv[1])[:top]),
+    }
+
+
+def _get(url: str, timeout: float = 5.0) -> tuple:
+    started = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        body = response.read()
+    return response.status, body, (time.perf_counter() - started) * 1000
+
+
+def startup_profile(timeout: float = 120.0) -> Dict:
+    """Boot the app, time until it answers, then one probe request, and read its startup phases"""
+    workdir = tempfile.mkdtemp(prefix="journezy-cold-")
+    args = types.SimpleNamespace(llm_latency="fixed:0", serp_latency="fixed:0", serp_error_rate=0.0)
+    started = time.perf_counter()
+    process, base_url, log_path = start_server(workdir, args)
+    try:
+        ready_ms = None
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited during startup with code {process.returncode}; see {log_path}")
+            try:
+                if _get(base_url + "/health", timeout=1.0)[0] == 200:
+                    ready_ms = (time.perf_counter() - started) * 1000
+                    break
+            except (urllib.error.URLError, ConnectionError, OSError):
+                time.sleep(0.01)
+        if ready_ms is None:
+            raise RuntimeError(f"Server did not become ready within {timeout:.0f}s; see {log_path}")
+        _, _, first_request_ms = _get(base_url + PROBE_PATH)
+        _, _, second_request_ms = _get(base_url + PROBE_PATH)
+        phases = {}
+        _, metrics, _ = _get(base_url + "/metrics")
+        for line in metrics.decode().splitlines():
+            match = _PHASE_LINE.match(line)
+            if match:
+                phases[match.group(1)] = round(float(match.group(2)) * 1000, 1)
+        return {"ready_ms": round(ready_ms, 1), "first_request_ms": round(first_request_ms, 1),
+                "second_request_ms": round(second_request_ms, 1), "phases_ms": phases}
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def print_report(results: Dict):
+    imports = results["import_profile"]
+    if "error" in imports:
+        print(f"❌ [COLD-START] import {imports['module']} failed: {imports['error']}")
+    else:
+        print(f"📦 [COLD-START] import {imports['module']}: {imports['import_ms']:,.0f} ms "
+              f"({imports['modules_loaded']} modules, process wall {imports['wall_ms']:,.0f} ms)")
+        print(f"\n{'package':<28}{'self ms':>10}")
+        for package, ms in imports["packages_ms"].items():
+            print(f"{package:<28}{ms:>10,.1f}")
+        print(f"\n{'module':<48}{'self ms':>10}{'cumul ms':>10}")
+        for m in imports["slowest_modules"]:
+            print(f"{m['module'][:47]:<48}{m['self_ms']:>10,.1f}{m['cumulative_ms']:>10,.1f}")
+    startup = results.get("startup")
+    if startup:
+        print(f"\n🚀 [COLD-START] ready after {startup['ready_ms']:,.0f} ms; first request {startup['first_request_ms']:,.1f} ms, "
+              f"second {startup['second_request_ms']:,.1f} ms")
+        for phase, ms in startup["phases_ms"].items():
+            print(f"  {phase:<40}{ms:>10,.1f} ms")
+
+
+def check_budgets(results: Dict, import_budget_ms: float, ready_budget_ms: float) -> List[str]:
+    failures = []
+    import_ms = results["import_profile"].get("import_ms")
+    if import_budget_ms and (import_ms is None or import_ms > import_budget_ms):
+        failures.append(f"import took {import_ms} ms (budget {import_budget_ms:g} ms)")
+    ready_ms = (results.get("startup") or {}).get("ready_ms")
+    if ready_budget_ms and ready_ms is not None and ready_ms > ready_budget_ms:
+        failures.append(f"ready after {ready_ms} ms (budget {ready_budget_ms:g} ms)")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time profile and time-to-ready of the trip planner")
+    parser.add_argument("--module", default="main", help="Module whose import is profiled")
+    parser.add_argument("--top", type=int, default=15, help="Rows in the slowest module/package tables")
+    parser.add_argument("--imports-only", action="store_true", help="Skip booting the server")
+    parser.add_argument("--import-budget-ms", type=float, default=0, help="Fail if the import takes longer")
+    parser.add_argument("--ready-budget-ms", type=float, default=0, help="Fail if the server takes longer to answer")
+    parser.add_argument("--json", metavar="PATH", help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {"python": platform.python_version(), "created_at": int(time.time()),
+               "import_profile": import_profile(args.module, args.top)}
+    if not args.imports_only:
+        results["startup"] = startup_profile()
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 [COLD-START] Results written to {args.json}")
+
+    failures = check_budgets(results, args.import_budget_ms, args.ready_budget_ms)
+    for failure in failures:
+        print(f"❌ [COLD-START] Over budget: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,393 @@
+"""
+Load Test
+Boots main:app under uvicorn against the stubbed upstreams (replay LLM provider and replay
+SerpAPI transport) and drives /plan-trip, /airports and /modify-itinerary at fixed request rates.
+Reports throughput, latency percentiles, event-loop lag, server memory and per-stage timings.
+
+    python -m benchmarks.load_test --rps plan-trip=0.5 --rps airports=20 --duration 60
+    python -m benchmarks.load_test --steps 1,2,4 --llm-latency fixed:200 --json results.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+from benchmarks.stubs import copy_database, sample_itinerary, write_stub_upstreams
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_RATES = {"plan-trip": 0.5, "airports": 20.0, "modify": 0.5}
+ROUTES = [("New York", "Paris"), ("Mumbai", "London"), ("Delhi", "Dubai"), ("San Francisco", "Tokyo"),
+          ("Bangalore", "Singapore"), ("Chicago", "Rome")]
+AIRPORT_TERMS = ["new york", "lon", "mumbai", "paris", "del", "tokyo", "san fran", "bengaluru", "dubai", "goa"]
+FEEDBACK = ["Swap day 1 and day 2", "For day 3 skip the museum and add shopping", "Add more food experiences",
+            "Make day 5 a rest day"]
+# Cheapest endpoint: precomputed in-memory prefix table, so its latency is queueing on the server's event loop
+PROBE_PATH = "/airports/autocomplete?q=a"
+
+
+class Sample:
+    """Outcome of one request"""
+
+    __slots__ = ("scenario", "latency_ms", "status", "stages", "error")
+
+    def __init__(self, scenario: str, latency_ms: float, status: int, stages: Dict[str, float], error: str = ""):
+        self.scenario = scenario
+        self.latency_ms = latency_ms
+        self.status = status
+        self.stages = stages
+        self.error = error
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """"extract;dur=12.5, flights;dur=40" -> {"extract": 12.5, "flights": 40.0}"""
+    stages = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                try:
+                    stages[name] = float(value)
+                except ValueError:
+                    pass
+    return stages
+
+
+def _plan_trip_request(rng: random.Random):
+    from_city, to_city = rng.choice(ROUTES)
+    start = datetime.now() + timedelta(days=rng.randint(20, 90))
+    payload = {
+        "from_city": from_city,
+        "to_city": to_city,
+        "start_date": start.strftime("%Y-%m-%d"),
+        "end_date": (start + timedelta(days=7)).strftime("%Y-%m-%d"),
+        "budget_amount": rng.choice([None, 2500, 5000]),
+    }
+    return "POST", "/plan-trip", {"json": payload}
+
+
+def _airports_request(rng: random.Random):
+    # One in five requests is the full listing the frontend loads; the rest are searches
+    if rng.random() < 0.2:
+        return "GET", "/airports", {"params": {"limit": 2000}, "headers": {"Accept-Encoding": "gzip"}}
+    return "GET", "/airports", {"params": {"search": rng.choice(AIRPORT_TERMS), "limit": 10}}
+
+
+def _modify_request(rng: random.Random):
+    payload = {
+        "itinerary_content": sample_itinerary(rng.choice(ROUTES)[1]),
+        "modification_feedback": rng.choice(FEEDBACK),
+    }
+    return "POST", "/modify-itinerary", {"json": payload}
+
+
+SCENARIOS = {"plan-trip": _plan_trip_request, "airports": _airports_request, "modify": _modify_request}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def read_rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def start_server(workdir: str, args) -> tuple:
+    """Launch uvicorn main:app on a free port with every upstream stubbed; returns (process, base_url, log path)"""
+    env = dict(os.environ)
+    env.update(write_stub_upstreams(os.path.join(workdir, "stubs")))
+    db_path = os.path.join(workdir, "airports.db")
+    copy_database(os.path.join(REPO_ROOT, "airports.db"), db_path)
+    env.update({
+        "AIRPORT_DB_PATH": db_path,
+        "AIRPORT_REFRESH_HOURS": "0",
+        "LLM_REPLAY_LATENCY": args.llm_latency,
+        "SERPAPI_REPLAY_LATENCY": args.serp_latency,
+        "SERPAPI_REPLAY_ERROR_RATE": str(args.serp_error_rate),
+        "PYTHONUNBUFFERED": "1",
+    })
+    port = _free_port()
+    log_path = os.path.join(workdir, "server.log")
+    log = open(log_path, "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    return process, f"http://127.0.0.1:{port}", log_path
+
+
+async def wait_until_ready(client, process=None, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited during startup with code {process.returncode}")
+        try:
+            if (await client.get(PROBE_PATH)).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError("Server did not become ready in time")
+
+
+async def _issue(client, scenario: str, rng: random.Random, samples: List[Sample]):
+    method, path, kwargs = SCENARIOS[scenario](rng)
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, path, **kwargs)
+        latency_ms = (time.perf_counter() - started) * 1000
+        error = ""
+        # /plan-trip reports workflow failures as 200 with status="error"
+        if response.status_code == 200 and scenario == "plan-trip" and response.json().get("status") != "success":
+            error = response.json().get("message", "error")[:120]
+        samples.append(Sample(scenario, latency_ms, response.status_code,
+                              parse_server_timing(response.headers.get("server-timing", "")), error))
+    except Exception as e:
+        samples.append(Sample(scenario, (time.perf_counter() - started) * 1000, 0, {}, type(e).__name__))
+
+
+async def _drive(client, scenario: str, rate: float, duration: float, rng: random.Random, samples: List[Sample]):
+    """Open-loop arrivals at a fixed rate: requests are sent on schedule whether or not earlier ones finished"""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks = []
+    i = 0
+    while i / rate < duration:
+        delay = start + i / rate - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(_issue(client, scenario, rng, samples)))
+        i += 1
+    await asyncio.gather(*tasks)
+
+
+async def _probe_loop(client, interval: float, probe_ms: List[float], local_lag_ms: List[float]):
+    """Time the probe endpoint (server loop lag) and our own sleep overshoot (client loop lag)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        local_lag_ms.append(max(0.0, (loop.time() - expected) * 1000))
+        started = time.perf_counter()
+        try:
+            await client.get(PROBE_PATH)
+            probe_ms.append((time.perf_counter() - started) * 1000)
+        except Exception:
+            probe_ms.append((time.perf_counter() - started) * 1000)
+
+
+async def _sample_memory(pid: Optional[int], interval: float, rss_mb: List[float]):
+    while pid:
+        value = read_rss_mb(pid)
+        if value is not None:
+            rss_mb.append(value)
+        await asyncio.sleep(interval)
+
+
+def summarize(samples: List[Sample], elapsed: float, rates: Dict[str, float], probe_ms: List[float],
+              local_lag_ms: List[float], rss_mb: List[float], probe_baseline_ms: float) -> Dict:
+    """Aggregate one phase into a JSON-able summary"""
+    scenarios = {}
+    for scenario in rates:
+        group = [s for s in samples if s.scenario == scenario]
+        ok = [s.latency_ms for s in group if 200 <= s.status < 400 and not s.error]
+        statuses = defaultdict(int)
+        for s in group:
+            statuses[str(s.status) if not s.error else f"{s.status}:error"] += 1
+        stages = defaultdict(list)
+        for s in group:
+            for stage, ms in s.stages.items():
+                stages[stage].append(ms)
+        scenarios[scenario] = {
+            "offered_rps": rates[scenario],
+            "requests": len(group),
+            "ok": len(ok),
+            "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else 0.0,
+            "latency_ms": {p: round(percentile(ok, q), 1) for p, q in (("p50", 50), ("p90", 90), ("p99", 99))},
+            "max_ms": round(max(ok), 1) if ok else 0.0,
+            "statuses": dict(statuses),
+            "errors": sorted({s.error for s in group if s.error})[:5],
+            "stages_ms": {stage: {"p50": round(percentile(v, 50), 1), "p99": round(percentile(v, 99), 1),
+                                  "mean": round(sum(v) / len(v), 1)} for stage, v in stages.items()},
+        }
+    lag = [max(0.0, ms - probe_baseline_ms) for ms in probe_ms]
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "scenarios": scenarios,
+        "event_loop_lag_ms": {"p50": round(percentile(lag, 50), 1), "p99": round(percentile(lag, 99), 1),
+                              "max": round(max(lag), 1) if lag else 0.0, "probes": len(lag)},
+        "client_loop_lag_ms": {"p99": round(percentile(local_lag_ms, 99), 1)},
+        "server_rss_mb": {"start": round(rss_mb[0], 1), "peak": round(max(rss_mb), 1), "end": round(rss_mb[-1], 1)}
+        if rss_mb else {},
+    }
+
+
+async def run_phase(client, rates: Dict[str, float], duration: float, seed: int, pid: Optional[int],
+                    probe_interval: float, probe_baseline_ms: float) -> Dict:
+    samples: List[Sample] = []
+    probe_ms: List[float] = []
+    local_lag_ms: List[float] = []
+    rss_mb: List[float] = []
+    rng = random.Random(seed)
+    background = [asyncio.create_task(_probe_loop(client, probe_interval, probe_ms, local_lag_ms)),
+                  asyncio.create_task(_sample_memory(pid, 0.5, rss_mb))]
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(_drive(client, scenario, rate, duration, rng, samples)
+                               for scenario, rate in rates.items() if rate > 0))
+    finally:
+        for task in background:
+            task.cancel()
+    return summarize(samples, time.perf_counter() - started, rates, probe_ms, local_lag_ms, rss_mb,
+                     probe_baseline_ms)
+
+
+async def measure_probe_baseline(client, count: int = 20) -> float:
+    """Median probe latency on an idle server; subtracted from probes under load to estimate loop lag"""
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        await client.get(PROBE_PATH)
+        timings.append((time.perf_counter() - started) * 1000)
+    return percentile(timings, 50)
+
+
+def print_report(step: float, summary: Dict):
+    print(f"\n📊 [LOAD-TEST] Step x{step:g} ({summary['elapsed_s']} s)")
+    print(f"{'scenario':<12}{'offered':>9}{'thruput':>9}{'ok/total':>11}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for name, s in summary["scenarios"].items():
+        latency = s["latency_ms"]
+        print(f"{name:<12}{s['offered_rps']:>9.2f}{s['throughput_rps']:>9.2f}{s['ok']:>5}/{s['requests']:<5}"
+              f"{latency['p50']:>10.1f}{latency['p90']:>10.1f}{latency['p99']:>10.1f}")
+        if s["statuses"]:
+            print(f"{'':<12}statuses: {s['statuses']}")
+        for error in s["errors"]:
+            print(f"{'':<12}error: {error}")
+        for stage, t in s["stages_ms"].items():
+            print(f"{'':<12}  {stage:<10} p50 {t['p50']:>9.1f}  p99 {t['p99']:>9.1f}  mean {t['mean']:>9.1f}")
+    lag = summary["event_loop_lag_ms"]
+    print(f"event-loop lag (probe): p50 {lag['p50']} ms, p99 {lag['p99']} ms, max {lag['max']} ms "
+          f"over {lag['probes']} probes; client p99 {summary['client_loop_lag_ms']['p99']} ms")
+    if summary["server_rss_mb"]:
+        rss = summary["server_rss_mb"]
+        print(f"server RSS: start {rss['start']} MB, peak {rss['peak']} MB, end {rss['end']} MB")
+
+
+def _parse_rates(values: Optional[List[str]]) -> Dict[str, float]:
+    if not values:
+        return dict(DEFAULT_RATES)
+    rates = {name: 0.0 for name in SCENARIOS}
+    for value in values:
+        name, _, rate = value.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        rates[name] = float(rate)
+    return rates
+
+
+async def main_async(args) -> Dict:
+    rates = _parse_rates(args.rps)
+    steps = [float(s) for s in args.steps.split(",")]
+    process = None
+    workdir = tempfile.mkdtemp(prefix="journezy-load-")
+    base_url = args.base_url
+    log_path = None
+    if not base_url:
+        process, base_url, log_path = start_server(workdir, args)
+        print(f"🚀 [LOAD-TEST] Started main:app at {base_url} (pid {process.pid}, log {log_path})")
+    pid = process.pid if process else args.server_pid
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            await wait_until_ready(client, process)
+            baseline = await measure_probe_baseline(client)
+            print(f"✅ [LOAD-TEST] Server ready; idle probe {baseline:.2f} ms")
+            if args.warmup > 0:
+                await run_phase(client, rates, args.warmup, args.seed, None, args.probe_interval, baseline)
+            results = {"base_url": base_url, "rates": rates, "duration_s": args.duration,
+                       "llm_latency": args.llm_latency, "serp_latency": args.serp_latency, "steps": []}
+            for step in steps:
+                step_rates = {name: rate * step for name, rate in rates.items()}
+                summary = await run_phase(client, step_rates, args.duration, args.seed, pid,
+                                          args.probe_interval, baseline)
+                summary["step"] = step
+                results["steps"].append(summary)
+                print_report(step, summary)
+    finally:
+        if process:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test main:app with stubbed Gemini and SerpAPI")
+    parser.add_argument("--rps", action="append", metavar="SCENARIO=RATE",
+                        help=f"Request rate per scenario ({', '.join(SCENARIOS)}); repeatable. "
+                             f"Default: {', '.join(f'{k}={v:g}' for k, v in DEFAULT_RATES.items())}")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per step")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds of unmeasured load before the first step")
+    parser.add_argument("--steps", default="1", help="Comma-separated rate multipliers run in sequence, e.g. 1,2,4")
+    parser.add_argument("--llm-latency", default="recorded", help="LLM replay latency spec (see LLM_REPLAY_LATENCY)")
+    parser.add_argument("--serp-latency", default="recorded", help="SerpAPI replay latency spec")
+    parser.add_argument("--serp-error-rate", type=float, default=0.0, help="Fraction of SerpAPI calls that fail")
+    parser.add_argument("--timeout", type=float, default=330.0, help="Client timeout per request (seconds)")
+    parser.add_argument("--probe-interval", type=float, default=0.1, help="Seconds between event-loop lag probes")
+    parser.add_argument("--base-url", help="Target an already running server instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="PID to sample memory from when using --base-url")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="PATH", help="Write the full results as JSON")
+    args = parser.parse_args(argv)
+
+    if httpx is None:
+        raise SystemExit("httpx is required for the load test (pip install httpx)")
+    results = asyncio.run(main_async(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 [LOAD-TEST] Results written to {args.json}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
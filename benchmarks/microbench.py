@@ -0,0 +1,269 @@
+"""
+Microbenchmarks
+Times the CPU-bound hot paths of a trip plan in isolation: airport search, hotel selection,
+the SerpAPI result formatters, itinerary cleanup and image embedding, HTML assembly and PDF rendering.
+Reports ops/sec and the peak memory allocated per call; fixtures come from benchmarks.stubs.
+
+    python -m benchmarks.microbench
+    python -m benchmarks.microbench -k format --min-time 0.5 --json micro.json
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from benchmarks.stubs import copy_database, sample_itinerary, synthetic_serp_responses
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Mix of exact codes, cities, prefixes, misspellings and misses, as typed into the search box
+AIRPORT_SEARCH_TERMS = ["JFK", "london", "new yo", "bombay", "bengaluru", "san fran", "paris", "xyzzy", "del", "goa"]
+
+# name -> setup function returning the zero-argument callable to time
+BENCHMARKS: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _fixtures() -> Dict[str, Any]:
+    """Large payloads: 64 flight options, 60 hotels, 20 sights and a 14-day itinerary"""
+    responses = synthetic_serp_responses(flights=64, hotels=60, sights=20)
+    flights = responses["google_flights"]["best_flights"] + responses["google_flights"]["other_flights"]
+    itinerary = sample_itinerary("Paris", days=14)
+    # Model output often repeats image lines and embeds <img> tags that the cleanup has to handle
+    itinerary += "\n".join(f"* Image: https://images.example.com/raw/{i}.jpg\n<img src=\"https://images.example.com/{i}.jpg\" />"
+                           for i in range(20))
+    return {
+        "flights": flights,
+        "hotels": responses["google_hotels"]["properties"],
+        "sights": responses["google"]["top_sights"]["sights"],
+        "itinerary": itinerary,
+    }
+
+
+@benchmark("airports.search")
+def _airports_search():
+    from utils.airport_db import get_airports
+    terms = itertools.cycle(AIRPORT_SEARCH_TERMS)
+    return lambda: get_airports(next(terms), limit=10)
+
+
+@benchmark("airports.list")
+def _airports_list():
+    from utils.airport_db import get_airports
+    return lambda: get_airports(None, limit=2000)
+
+
+@benchmark("hotels.select")
+def _hotels_select():
+    from tools.hotels import select_hotels
+    hotels = _fixtures()["hotels"]
+    return lambda: select_hotels(hotels)
+
+
+@benchmark("format.flights")
+def _format_flights():
+    from tools.flights import get_formatted_flights_info
+    flights = _fixtures()["flights"]
+    return lambda: get_formatted_flights_info(flights, currency_code="USD")
+
+
+@benchmark("format.hotels")
+def _format_hotels():
+    from tools.hotels import get_formatted_hotels_info
+    hotels = _fixtures()["hotels"]
+    return lambda: get_formatted_hotels_info(hotels, currency_code="USD")
+
+
+@benchmark("format.places")
+def _format_places():
+    from tools.places import get_formatted_places_info
+    sights = _fixtures()["sights"]
+    return lambda: get_formatted_places_info(sights)
+
+
+@benchmark("itinerary.clean")
+def _itinerary_clean():
+    from agents.itinerary_writer import clean_itinerary_content
+    itinerary = _fixtures()["itinerary"]
+    return lambda: clean_itinerary_content(itinerary)
+
+
+@benchmark("itinerary.images")
+def _itinerary_images():
+    from agents.itinerary_writer import process_itinerary_images
+    from tools.flights import get_formatted_flights_info
+    from tools.hotels import get_formatted_hotels_info
+    from tools.places import get_formatted_places_info
+    fixtures = _fixtures()
+    flights_text = get_formatted_flights_info(fixtures["flights"])
+    hotels_text = get_formatted_hotels_info(fixtures["hotels"])
+    places_text = get_formatted_places_info(fixtures["sights"])
+    itinerary = fixtures["itinerary"]
+    return lambda: process_itinerary_images(itinerary, flights_text, hotels_text, places_text)
+
+
+def _workflow_with_data():
+    """Workflow holding formatted results; place images are dropped so nothing is fetched over the network"""
+    from workflow import TourPlannerWorkflow
+    from tools.flights import get_formatted_flights_info
+    from tools.hotels import get_formatted_hotels_info, select_hotels
+    from tools.places import get_formatted_places_info
+    fixtures = _fixtures()
+    workflow = TourPlannerWorkflow(language="en")
+    workflow.flights_data = get_formatted_flights_info(fixtures["flights"][:6], header="Flights from JFK to CDG:")
+    workflow.hotels_data = get_formatted_hotels_info(select_hotels(fixtures["hotels"]), header="Accommodations in Paris:")
+    workflow.places_data = get_formatted_places_info([dict(s, thumbnail="") for s in fixtures["sights"]])
+    return workflow, fixtures["itinerary"]
+
+
+@benchmark("html.render")
+def _html_render():
+    workflow, itinerary = _workflow_with_data()
+    return lambda: workflow._create_complete_html_content(itinerary)
+
+
+@benchmark("pdf.render")
+def _pdf_render():
+    from xhtml2pdf import pisa
+    workflow, itinerary = _workflow_with_data()
+    html = workflow._create_complete_html_content(itinerary)
+
+    def link_callback(uri, rel):
+        # Same local-static mapping as the workflow; remote images resolve to nothing so no I/O is timed
+        if uri.startswith('/static/'):
+            return os.path.join(REPO_ROOT, 'static', uri[8:])
+        return "" if uri.startswith('http') else uri
+
+    return lambda: pisa.CreatePDF(html, dest=io.BytesIO(), link_callback=link_callback)
+
+
+def _time(fn: Callable[[], Any], min_time: float, repeats: int) -> Dict[str, float]:
+    """Calibrate a loop count that takes at least min_time, then keep the best of several repeats"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    per_call = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - started) / number)
+    best = min(per_call)
+    return {
+        "ops_per_sec": round(1 / best, 2) if best else float("inf"),
+        "mean_us": round(statistics.mean(per_call) * 1e6, 2),
+        "best_us": round(best * 1e6, 2),
+        "stdev_us": round(statistics.pstdev(per_call) * 1e6, 2),
+        "loops": number,
+        "repeats": repeats,
+    }
+
+
+def _allocations(fn: Callable[[], Any], calls: int = 5) -> Dict[str, float]:
+    """Peak bytes allocated during one call (median over a few calls) and bytes still held afterwards"""
+    tracemalloc.start()
+    try:
+        peaks, retained = [], []
+        for _ in range(calls):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            result = fn()
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+            del result
+    finally:
+        tracemalloc.stop()
+    return {"alloc_peak_kib": round(statistics.median(peaks) / 1024, 1),
+            "alloc_retained_kib": round(statistics.median(retained) / 1024, 1)}
+
+
+def run_benchmarks(selected: List[str], min_time: float = 0.2, repeats: int = 5) -> Dict[str, Dict]:
+    """Run the named benchmarks; ones whose dependencies are missing are reported as skipped"""
+    results = {}
+    for name in selected:
+        # Whatever still prints must not put terminal I/O into the measurement
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            try:
+                fn = BENCHMARKS[name]()
+                fn()
+            except ImportError as e:
+                results[name] = {"skipped": f"missing dependency: {e.name or e}"}
+                continue
+            timing = _time(fn, min_time, repeats)
+            timing.update(_allocations(fn))
+        results[name] = timing
+    return results
+
+
+def print_report(results: Dict[str, Dict]):
+    print(f"{'benchmark':<20}{'ops/sec':>12}{'mean µs':>12}{'± µs':>10}{'peak KiB':>11}{'held KiB':>10}")
+    for name, r in results.items():
+        if "skipped" in r:
+            print(f"{name:<20}  skipped ({r['skipped']})")
+            continue
+        print(f"{name:<20}{r['ops_per_sec']:>12,.1f}{r['mean_us']:>12,.1f}{r['stdev_us']:>10,.1f}"
+              f"{r['alloc_peak_kib']:>11,.1f}{r['alloc_retained_kib']:>10,.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the trip planner's CPU hot paths")
+    parser.add_argument("-k", dest="pattern", help="Only run benchmarks whose name contains this substring")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timing repeat")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--list", action="store_true", help="List benchmark names and exit")
+    parser.add_argument("--json", metavar="PATH", help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return {}
+    selected = [name for name in BENCHMARKS if not args.pattern or args.pattern in name]
+
+    # Search a private copy of the airport database so a refresh elsewhere can't skew the numbers
+    if "AIRPORT_DB_PATH" not in os.environ:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="journezy-micro-"), "airports.db")
+        copy_database(os.path.join(REPO_ROOT, "airports.db"), db_path)
+        os.environ["AIRPORT_DB_PATH"] = db_path
+    sys.path.insert(0, REPO_ROOT)
+    try:
+        # Log at the production level into the void, so the cost of enabled records is still measured
+        from loguru import logger
+        logger.remove()
+        logger.add(open(os.devnull, "w"), level=os.getenv("LOG_LEVEL", "INFO"))
+    except ImportError:
+        pass
+
+    results = run_benchmarks(selected, args.min_time, args.repeats)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                       "created_at": int(time.time()), "benchmarks": results}, f, indent=2)
+        print(f"💾 [MICROBENCH] Results written to {args.json}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
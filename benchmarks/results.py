@@ -0,0 +1,271 @@
+"""
+Benchmark Results
+Stores microbenchmark, load-test and cold-start results as versioned JSON and compares a run against a baseline.
+A metric regresses only when it is worse by more than its relative threshold, by more than a minimum
+absolute amount, and by more than --sigma standard deviations of the baseline noise.
+
+    python -m benchmarks.results save micro.json                 # store a run
+    python -m benchmarks.results baseline micro.json             # store it and make it the baseline
+    python -m benchmarks.results compare micro.json              # compare against the baseline
+    python -m benchmarks.results compare load.json --last 5      # baseline = mean of the last 5 stored runs
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+SCHEMA_VERSION = 1
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.getenv("BENCH_RESULTS_DIR", os.path.join(REPO_ROOT, "benchmarks", "results"))
+
+# Relative change (worse direction) tolerated per metric type, keyed by the metric name's last part
+THRESHOLDS = {
+    "mean_us": 0.10,
+    "alloc_peak_kib": 0.10,
+    "p50_ms": 0.10,
+    "p99_ms": 0.20,
+    "throughput_rps": 0.10,
+    "lag_p99_ms": 0.50,
+    "rss_peak_mb": 0.15,
+    "import_ms": 0.15,
+    "ready_ms": 0.15,
+    "first_request_ms": 0.20,
+}
+DEFAULT_THRESHOLD = 0.10
+# Differences smaller than this are never reported, whatever the relative change
+MIN_ABSOLUTE = {"mean_us": 1.0, "alloc_peak_kib": 4.0, "p50_ms": 2.0, "p99_ms": 5.0, "throughput_rps": 0.05,
+                "lag_p99_ms": 5.0, "rss_peak_mb": 5.0, "import_ms": 20.0, "ready_ms": 50.0,
+                "first_request_ms": 10.0}
+
+
+class Metric:
+    """One comparable number: its value, which direction is better, and its measurement noise if known"""
+
+    __slots__ = ("value", "higher_is_better", "noise")
+
+    def __init__(self, value: float, higher_is_better: bool = False, noise: Optional[float] = None):
+        self.value = value
+        self.higher_is_better = higher_is_better
+        self.noise = noise
+
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, timeout=10).stdout.strip()
+    except Exception:
+        return ""
+
+
+def detect_kind(results: Dict) -> str:
+    if "benchmarks" in results:
+        return "microbench"
+    if "steps" in results:
+        return "load_test"
+    if "import_profile" in results:
+        return "cold_start"
+    raise ValueError("Unrecognised results: expected microbench (benchmarks), load test (steps) "
+                     "or cold start (import_profile) output")
+
+
+def envelope(results: Dict, label: str = "") -> Dict:
+    """Wrap raw benchmark output with the schema version and the code and machine it ran on"""
+    if results.get("schema_version"):
+        return results
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "kind": detect_kind(results),
+        "label": label,
+        "created_at": int(time.time()),
+        "git_commit": _git("rev-parse", "HEAD"),
+        "git_dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)",
+        "results": results,
+    }
+
+
+def load_run(path: str) -> Dict:
+    with open(path) as f:
+        run = envelope(json.load(f))
+    if run["schema_version"] > SCHEMA_VERSION:
+        raise ValueError(f"{path} uses schema {run['schema_version']}; this tool reads up to {SCHEMA_VERSION}")
+    return run
+
+
+def save_run(run: Dict) -> str:
+    """Write a run to the results directory as <kind>-<timestamp>-<commit>.json"""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(run["created_at"]))
+    commit = (run.get("git_commit") or "nogit")[:10] + ("-dirty" if run.get("git_dirty") else "")
+    path = os.path.join(RESULTS_DIR, f"{run['kind']}-{stamp}-{commit}.json")
+    with open(path, "w") as f:
+        json.dump(run, f, indent=2)
+    return path
+
+
+def baseline_path(kind: str) -> str:
+    return os.path.join(RESULTS_DIR, f"baseline-{kind}.json")
+
+
+def stored_runs(kind: str) -> List[str]:
+    """Saved runs of a kind, oldest first (baselines excluded)"""
+    return sorted(glob.glob(os.path.join(RESULTS_DIR, f"{kind}-*.json")))
+
+
+def flatten(run: Dict) -> Dict[str, Metric]:
+    """Comparable metrics of a run, keyed by a stable dotted name"""
+    results = run["results"]
+    metrics: Dict[str, Metric] = {}
+    if run["kind"] == "microbench":
+        for name, r in results["benchmarks"].items():
+            if "skipped" in r:
+                continue
+            # Standard error of the mean of the repeats
+            noise = r.get("stdev_us", 0) / math.sqrt(max(1, r.get("repeats", 1)))
+            metrics[f"micro.{name}.mean_us"] = Metric(r["mean_us"], noise=noise)
+            metrics[f"micro.{name}.alloc_peak_kib"] = Metric(r["alloc_peak_kib"])
+        return metrics
+
+    if run["kind"] == "cold_start":
+        if "import_ms" in results["import_profile"]:
+            metrics["cold.import.import_ms"] = Metric(results["import_profile"]["import_ms"])
+        if results.get("startup"):
+            metrics["cold.server.ready_ms"] = Metric(results["startup"]["ready_ms"])
+            metrics["cold.server.first_request_ms"] = Metric(results["startup"]["first_request_ms"])
+        return metrics
+
+    for step in results["steps"]:
+        prefix = f"load.x{step.get('step', 1):g}"
+        for scenario, s in step["scenarios"].items():
+            if not s["ok"]:
+                continue
+            metrics[f"{prefix}.{scenario}.p50_ms"] = Metric(s["latency_ms"]["p50"])
+            metrics[f"{prefix}.{scenario}.p99_ms"] = Metric(s["latency_ms"]["p99"])
+            metrics[f"{prefix}.{scenario}.throughput_rps"] = Metric(s["throughput_rps"], higher_is_better=True)
+            for stage, t in s.get("stages_ms", {}).items():
+                metrics[f"{prefix}.{scenario}.{stage}.p50_ms"] = Metric(t["p50"])
+        metrics[f"{prefix}.event_loop.lag_p99_ms"] = Metric(step["event_loop_lag_ms"]["p99"])
+        if step.get("server_rss_mb"):
+            metrics[f"{prefix}.server.rss_peak_mb"] = Metric(step["server_rss_mb"]["peak"])
+    return metrics
+
+
+def _metric_type(name: str) -> str:
+    return name.rsplit(".", 1)[-1]
+
+
+def compare(current: Dict[str, Metric], baselines: List[Dict[str, Metric]], sigma: float = 3.0,
+            threshold_scale: float = 1.0) -> List[Tuple]:
+    """
+    Classify each metric shared with the baseline as "regression", "improvement" or "ok".
+    Baseline noise is the spread across baseline runs when there are several, otherwise the
+    metric's own recorded noise. Returns (status, name, baseline mean, current, relative change) rows.
+    """
+    rows = []
+    for name, metric in sorted(current.items()):
+        history = [b[name].value for b in baselines if name in b]
+        if not history:
+            continue
+        base = statistics.mean(history)
+        if len(history) > 1:
+            noise = statistics.stdev(history)
+        else:
+            noise = next((b[name].noise for b in baselines if name in b), None) or 0.0
+            if metric.noise:
+                noise = math.hypot(noise, metric.noise)
+        delta = metric.value - base
+        relative = delta / base if base else (0.0 if delta == 0 else math.inf)
+        worse = -relative if metric.higher_is_better else relative
+
+        kind = _metric_type(name)
+        significant = (abs(relative) > THRESHOLDS.get(kind, DEFAULT_THRESHOLD) * threshold_scale
+                       and abs(delta) >= MIN_ABSOLUTE.get(kind, 0.0)
+                       and abs(delta) > sigma * noise)
+        status = "ok"
+        if significant:
+            status = "regression" if worse > 0 else "improvement"
+        rows.append((status, name, base, metric.value, relative))
+    return rows
+
+
+def print_comparison(rows: List[Tuple], current: Dict, baseline_desc: str) -> int:
+    regressions = [r for r in rows if r[0] == "regression"]
+    improvements = [r for r in rows if r[0] == "improvement"]
+    print(f"📊 [BENCH-RESULTS] {current['kind']} at {current.get('git_commit', '')[:10] or 'unknown'} "
+          f"vs {baseline_desc}: {len(rows)} metrics, {len(regressions)} regressions, {len(improvements)} improvements")
+    for title, group in (("Regressions", regressions), ("Improvements", improvements)):
+        if not group:
+            continue
+        print(f"\n{title}:")
+        for _, name, base, value, relative in sorted(group, key=lambda r: -abs(r[4])):
+            print(f"  {name:<55}{base:>12,.2f} -> {value:>12,.2f}  ({relative:+.1%})")
+    unchanged = len(rows) - len(regressions) - len(improvements)
+    print(f"\n{unchanged} metrics within thresholds")
+    if regressions:
+        print("❌ [BENCH-RESULTS] Performance regression detected")
+    else:
+        print("✅ [BENCH-RESULTS] No regressions")
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Store benchmark results and compare them against a baseline")
+    sub = parser.add_subparsers(dest="command", required=True)
+    save = sub.add_parser("save", help="Store a results file")
+    save.add_argument("path")
+    save.add_argument("--label", default="")
+    base = sub.add_parser("baseline", help="Store a results file and make it the baseline for its kind")
+    base.add_argument("path")
+    base.add_argument("--label", default="")
+    comp = sub.add_parser("compare", help="Compare a results file against the baseline")
+    comp.add_argument("path")
+    comp.add_argument("--baseline", help="Baseline results file (default: the stored baseline for this kind)")
+    comp.add_argument("--last", type=int, default=0, help="Use the mean of the last N stored runs as the baseline")
+    comp.add_argument("--sigma", type=float, default=3.0, help="Required distance from the baseline in noise stddevs")
+    comp.add_argument("--threshold-scale", type=float, default=1.0, help="Multiply every relative threshold")
+    comp.add_argument("--save", action="store_true", help="Also store the compared run")
+    args = parser.parse_args(argv)
+
+    run = load_run(args.path)
+    if args.command in ("save", "baseline"):
+        run["label"] = args.label or run.get("label", "")
+        path = save_run(run)
+        print(f"💾 [BENCH-RESULTS] Saved {path}")
+        if args.command == "baseline":
+            with open(baseline_path(run["kind"]), "w") as f:
+                json.dump(run, f, indent=2)
+            print(f"📌 [BENCH-RESULTS] Baseline for {run['kind']} set to {os.path.basename(path)}")
+        return 0
+
+    if args.last:
+        paths = [p for p in stored_runs(run["kind"]) if os.path.abspath(p) != os.path.abspath(args.path)][-args.last:]
+        desc = f"mean of last {len(paths)} stored runs"
+    else:
+        paths = [args.baseline or baseline_path(run["kind"])]
+        desc = os.path.basename(paths[0])
+    paths = [p for p in paths if os.path.exists(p)]
+    if not paths:
+        print(f"❌ [BENCH-RESULTS] No baseline found for {run['kind']}; create one with "
+              f"`python -m benchmarks.results baseline <results.json>`")
+        return 2
+    baselines = [load_run(p) for p in paths]
+    if any(b["kind"] != run["kind"] for b in baselines):
+        print("❌ [BENCH-RESULTS] Baseline and current results are of different kinds")
+        return 2
+
+    rows = compare(flatten(run), [flatten(b) for b in baselines], args.sigma, args.threshold_scale)
+    status = print_comparison(rows, run, desc)
+    if args.save:
+        print(f"💾 [BENCH-RESULTS] Saved {save_run(run)}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
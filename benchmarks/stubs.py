@@ -0,0 +1,228 @@
+"""
+Stubbed Upstreams
+Writes a synthetic LLM recording and SerpAPI fixtures for benchmarks, so main:app can run
+fully offline through the replay LLM provider and replay SerpAPI transport.
+Payload sizes and recorded latencies are modelled on real responses for a one-week trip.
+"""
+import gzip
+import hashlib
+import json
+import os
+import random
+import sqlite3
+from typing import Dict
+
+# Recorded latency (ms) per LLM call site, roughly what live Gemini takes for each prompt
+LLM_SITE_LATENCY_MS = {
+    "extraction.plan": 1500,
+    "extraction.destination": 400,
+    "extraction.airports": 600,
+    "extraction.grounded": 3500,
+    "flights.grounded": 4000,
+    "flights.summary": 2500,
+    "airport.grounding": 2000,
+    "itinerary.write": 9000,
+    "itinerary.modify": 6000,
+}
+
+# Recorded latency (ms) per SerpAPI engine
+SERP_ENGINE_LATENCY_MS = {
+    "google_flights": 2500,
+    "google_hotels": 2000,
+    "google": 1500,
+}
+
+AIRLINES = ["Air France", "Delta", "Emirates", "Lufthansa", "KLM", "British Airways", "Qatar Airways"]
+AIRPLANES = ["Boeing 777", "Airbus A350", "Boeing 787", "Airbus A321neo", "Airbus A380"]
+AMENITIES = ["Free Wi-Fi", "Breakfast", "Pool", "Spa", "Fitness centre", "Air conditioning", "Restaurant",
+             "Room service", "Airport shuttle", "Bar", "Kid-friendly", "Accessible"]
+
+
+def sample_itinerary(destination: str = "Paris", days: int = 7) -> str:
+    """Markdown itinerary about the size write_itinerary returns for a one-week trip"""
+    lines = [f"# {days}-Day Trip to {destination}", "", "## Overview",
+             f"A relaxed week in {destination} mixing landmarks, museums, food and neighbourhood walks.", ""]
+    for day in range(1, days + 1):
+        lines += [f"## Day {day}: Exploring {destination} - Part {day}", ""]
+        for slot, activity in (("Morning", "Museum visit"), ("Afternoon", "Old town walk"), ("Evening", "Dinner")):
+            lines += [
+                f"### {slot}",
+                f"- **{activity}** at {destination} Landmark {day}-{slot[0]}",
+                "  - Duration: 2-3 hours",
+                "  - Cost: $25 per person",
+                "  - Tip: Book ahead to skip the queue and arrive early for the best light.",
+                f"  - ![{activity}](https://images.example.com/{destination.lower()}/{day}/{slot.lower()}.jpg)",
+                "",
+            ]
+    lines += ["## Budget Summary", "| Item | Cost |", "|------|------|", "| Flights | $850 |",
+              "| Hotels | $1,400 |", "| Activities | $525 |", "| **Total** | **$2,775** |", ""]
+    return "\n".join(lines)
+
+
+def _llm_texts(destination: str) -> Dict[str, str]:
+    itinerary = sample_itinerary(destination)
+    return {
+        "extraction.plan": (
+            f"Primary departure airport: JFK. Alternatives: EWR, LGA. Primary arrival airport: CDG. "
+            f"Alternatives: ORY, BVA. Destination: {destination}. Leisure trip, mid-range budget."
+        ),
+        "extraction.destination": destination,
+        "extraction.airports": json.dumps({
+            "airport_from": "JFK", "alternative_airports_from": ["EWR", "LGA"],
+            "airport_to": "CDG", "alternative_airports_to": ["ORY", "BVA"],
+        }),
+        "extraction.grounded": json.dumps({"destination": destination, "airport_from": "JFK", "airport_to": "CDG"}),
+        # No grounded options, so plans exercise the SerpAPI flight path and its formatting
+        "flights.grounded": json.dumps({"outbound": [], "return": []}),
+        "flights.summary": "Cheapest: Delta $612 (8 hr 10 min, nonstop). Fastest: Air France $655 (7 hr 25 min).",
+        "airport.grounding": json.dumps({
+            "airport_code": "CDG", "airport_name": "Charles de Gaulle Airport", "city": "Paris",
+            "country": "France", "distance_km": 25,
+        }),
+        "itinerary.write": itinerary,
+        "itinerary.modify": itinerary.replace("Museum visit", "Shopping"),
+    }
+
+
+def write_llm_recording(path: str, destination: str = "Paris"):
+    """JSONL recording with one answer per call site; replay serves it for any prompt at that site"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for site, text in _llm_texts(destination).items():
+            record = {
+                "key": hashlib.sha256(site.encode()).hexdigest(),
+                "site": site,
+                "model": "gemini-2.5-flash-lite",
+                "prompt": "",
+                "config": {},
+                "text": text,
+                "citations": [],
+                "latency_ms": LLM_SITE_LATENCY_MS[site],
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _flight_option(rng: random.Random, dep: str, arr: str) -> Dict:
+    segments = []
+    stops = rng.choice([0, 0, 1])
+    airports = [dep] + (["LHR"] if stops else []) + [arr]
+    for a, b in zip(airports, airports[1:]):
+        hour = rng.randint(6, 22)
+        segments.append({
+            "departure_airport": {"name": f"{a} International", "id": a, "time": f"2026-11-10 {hour:02d}:{rng.choice(['05', '30', '45'])}"},
+            "arrival_airport": {"name": f"{b} International", "id": b, "time": f"2026-11-11 {(hour + 7) % 24:02d}:15"},
+            "duration": rng.randint(90, 480),
+            "airplane": rng.choice(AIRPLANES),
+            "airline": rng.choice(AIRLINES),
+            "airline_logo": "https://www.gstatic.com/flights/airline_logos/70px/AF.png",
+            "travel_class": "Economy",
+            "flight_number": f"{rng.choice(['AF', 'DL', 'EK', 'LH'])} {rng.randint(10, 9999)}",
+            "legroom": "31 in",
+            "extensions": ["Average legroom (31 in)", "Wi-Fi for a fee", "In-seat power & USB outlets",
+                           "On-demand video", "Carbon emissions estimate: 412 kg"],
+        })
+    return {
+        "flights": segments,
+        "layovers": [{"duration": rng.randint(60, 240), "name": "Heathrow Airport", "id": "LHR"}] if stops else [],
+        "total_duration": sum(s["duration"] for s in segments),
+        "carbon_emissions": {"this_flight": 412000, "typical_for_this_route": 398000, "difference_percent": 4},
+        "price": rng.randint(450, 1400),
+        "type": "Round trip",
+        "airline_logo": "https://www.gstatic.com/flights/airline_logos/70px/multi.png",
+        "departure_token": hashlib.sha256(str(rng.random()).encode()).hexdigest() * 4,
+    }
+
+
+def _hotel(rng: random.Random, i: int) -> Dict:
+    return {
+        "type": "hotel",
+        "name": f"Hotel Synthetic {i}",
+        "description": "Boutique hotel in a quiet street, ten minutes' walk from the river and the old town. " * 2,
+        "link": f"https://hotels.example.com/{i}",
+        "gps_coordinates": {"latitude": 48.85 + rng.random() / 10, "longitude": 2.35 + rng.random() / 10},
+        "check_in_time": "3:00 PM",
+        "check_out_time": "11:00 AM",
+        "rate_per_night": {"lowest": f"${rng.randint(90, 450)}", "extracted_lowest": rng.randint(90, 450)},
+        "total_rate": {"lowest": f"${rng.randint(600, 3000)}"},
+        "hotel_class": f"{rng.randint(2, 5)}-star hotel",
+        "overall_rating": round(rng.uniform(3.2, 4.9), 1),
+        "reviews": rng.randint(50, 8000),
+        "location_rating": round(rng.uniform(3.0, 5.0), 1),
+        "amenities": rng.sample(AMENITIES, 8),
+        "images": [{"thumbnail": f"https://images.example.com/hotels/{i}/{n}.jpg",
+                    "original_image": f"https://images.example.com/hotels/{i}/{n}-full.jpg"} for n in range(12)],
+        "nearby_places": [{"name": f"Metro station {n}", "transportations": [{"type": "Walking", "duration": "5 min"}]}
+                          for n in range(4)],
+    }
+
+
+def _sight(rng: random.Random, i: int, destination: str) -> Dict:
+    return {
+        "title": f"{destination} Landmark {i}",
+        "description": "Historic monument with guided tours, gardens and a rooftop view over the city.",
+        "rating": round(rng.uniform(4.0, 4.9), 1),
+        "reviews": rng.randint(500, 90000),
+        "price": rng.choice(["Free Entry", "$15", "$22"]),
+        "thumbnail": f"https://images.example.com/sights/{i}.jpg",
+    }
+
+
+def synthetic_serp_responses(destination: str = "Paris", seed: int = 7, flights: int = 64, hotels: int = 25,
+                             sights: int = 20) -> Dict[str, Dict]:
+    """SerpAPI-shaped response bodies per engine, with the fields the tools read plus typical bulk"""
+    rng = random.Random(seed)
+    return {
+        "google_flights": {
+            "best_flights": [_flight_option(rng, "JFK", "CDG") for _ in range(min(4, flights))],
+            "other_flights": [_flight_option(rng, "JFK", "CDG") for _ in range(max(0, flights - 4))],
+            "price_insights": {"lowest_price": 450, "price_level": "typical",
+                               "price_history": [[1760000000 + d * 86400, rng.randint(450, 900)] for d in range(60)]},
+        },
+        "google_hotels": {"properties": [_hotel(rng, i) for i in range(hotels)]},
+        "google": {
+            "top_sights": {"sights": [_sight(rng, i, destination) for i in range(sights)]},
+            "organic_results": [{"position": i, "title": f"Top attractions to visit in {destination} #{i}",
+                                 "link": f"https://travel.example.com/{i}",
+                                 "snippet": "Museums, parks and landmarks worth a visit. " * 4} for i in range(10)],
+            "local_results": [{"title": f"{destination} Park {i}", "type": "Park", "rating": 4.5,
+                               "reviews": 1200} for i in range(5)],
+        },
+    }
+
+
+def write_serp_fixtures(directory: str, destination: str = "Paris", seed: int = 7):
+    """One large fixture per engine; replay falls back to it for any params of that engine"""
+    os.makedirs(directory, exist_ok=True)
+    responses = synthetic_serp_responses(destination, seed)
+    for engine, response in responses.items():
+        fixture = {"params": {"engine": engine}, "latency_ms": SERP_ENGINE_LATENCY_MS[engine],
+                   "recorded_at": 0, "response": response}
+        with gzip.open(os.path.join(directory, f"{engine}-synthetic.json.gz"), "wt", encoding="utf-8") as f:
+            json.dump(fixture, f)
+
+
+def copy_database(source: str, target: str):
+    """Consistent copy of a SQLite database, so a benchmark never touches the live airports.db"""
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def write_stub_upstreams(directory: str, destination: str = "Paris") -> Dict[str, str]:
+    """Write all stand-ins under directory and return the environment that points main:app at them"""
+    llm_path = os.path.join(directory, "llm.jsonl")
+    serp_dir = os.path.join(directory, "serpapi")
+    write_llm_recording(llm_path, destination)
+    write_serp_fixtures(serp_dir, destination)
+    return {
+        "LLM_PROVIDER": "replay",
+        "LLM_RECORDING_PATH": llm_path,
+        "LLM_CACHE_ENABLED": "false",
+        "SERPAPI_MODE": "replay",
+        "SERPAPI_FIXTURES_DIR": serp_dir,
+        "SERPAPI_KEY": "replay",
+    }
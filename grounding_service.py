@@ -6,27 +6,15 @@ from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from loguru import logger
 
-try:
-    # New Google GenAI client (for grounding)
-    from google import genai
-    from google.genai import types
-except Exception as _e:  # pragma: no cover
-    genai = None
-    types = None
+from utils.llm_cache import cached_generate, parse_json_reply
+from utils.llm_provider import get_llm_provider
 
 load_dotenv()
 
 
 class GroundedFlightsSummarizer:
     def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY or GOOGLE_API_KEY not set")
-        if genai is None:
-            raise RuntimeError("google-genai package not available")
-        self.client = genai.Client(api_key=api_key)
-        self.grounding_tool = types.Tool(google_search=types.GoogleSearch())
-        self.config = types.GenerateContentConfig(tools=[self.grounding_tool])
+        self.provider = get_llm_provider()
 
     async def summarize_flights(self, query: str, flights_text: str) -> Dict[str, Any]:
         """Use Gemini Grounding to provide a grounded summary/citations for flight options."""
@@ -42,22 +30,13 @@ class GroundedFlightsSummarizer:
 
         try:
             response = await asyncio.to_thread(
-                self.client.models.generate_content,
-                model="gemini-2.5-flash-lite",
-                contents=prompt,
-                config=self.config,
+                self.provider.generate,
+                "gemini-2.5-flash-lite",
+                prompt,
+                site="flights.summary",
+                grounding=True,
             )
-            text = response.text or ""
-            grounding = response.candidates[0].grounding_metadata if response.candidates else None
-            citations = []
-            if grounding and hasattr(grounding, "grounding_supports") and grounding.grounding_supports:
-                chunks = getattr(grounding, "grounding_chunks", [])
-                for sup in grounding.grounding_supports:
-                    if getattr(sup, "grounding_chunk_indices", None):
-                        for i in sup.grounding_chunk_indices:
-                            if i < len(chunks) and getattr(chunks[i], "web", None) and getattr(chunks[i].web, "uri", None):
-                                citations.append(chunks[i].web.uri)
-            return {"text": text, "citations": citations}
+            return {"text": response.text, "citations": response.citations}
         except Exception as e:
             logger.error(f"Grounded summary error: {e}")
             return {"text": "Grounded summary unavailable.", "citations": []}
@@ -68,14 +47,7 @@ class GroundedFlightFinder:
     """Fallback flight finder using Gemini Grounding when SerpAPI returns no results."""
 
     def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY or GOOGLE_API_KEY not set")
-        if genai is None:
-            raise RuntimeError("google-genai package not available")
-        self.client = genai.Client(api_key=api_key)
-        self.grounding_tool = types.Tool(google_search=types.GoogleSearch())
-        self.config = types.GenerateContentConfig(tools=[self.grounding_tool])
+        self.provider = get_llm_provider()
 
     async def find_flights(self, dep: str, arr: str, depart_date: str, return_date: str | None) -> str:
         """
@@ -94,13 +66,21 @@ class GroundedFlightFinder:
         )
 
         try:
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
-                model="gemini-2.5-flash-lite",
-                contents=search_query,
-                config=self.config,
+            text = await asyncio.to_thread(
+                cached_generate,
+                "flights.grounded",
+                "gemini-2.5-flash-lite",
+                search_query,
+                lambda: self.provider.generate(
+                    "gemini-2.5-flash-lite",
+                    search_query,
+                    site="flights.grounded",
+                    grounding=True,
+                ).text,
+                {"tools": ["google_search"]},
+                validate=lambda reply: parse_json_reply(reply) is not None,
             )
-            text = (response.text or "").strip()
+            text = text.strip()
         except Exception as e:
             logger.error(f"Grounded flight fetch error: {e}")
             return ""
@@ -237,26 +217,19 @@ class GroundedTourExtractor:
     """Extract structured TourInfo using Gemini with Google Search grounding and return citations text."""
 
     def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY or GOOGLE_API_KEY not set")
-        if genai is None:
-            raise RuntimeError("google-genai package not available")
-        self.client = genai.Client(api_key=api_key)
-        self.tool = types.Tool(google_search=types.GoogleSearch())
-        self.config = types.GenerateContentConfig(
-            response_schema=TourInfo,
-            tools=[self.tool],
-        )
+        self.provider = get_llm_provider()
 
     def extract(self, user_query: str) -> dict:
-        response = self.client.models.generate_content(
-            model="gemini-2.5-flash-lite",
-            contents=user_query,
-            config=self.config,
+        response = self.provider.generate(
+            "gemini-2.5-flash-lite",
+            user_query,
+            site="extraction.grounded",
+            grounding=True,
+            response_schema=TourInfo,
         )
         # Structured JSON in response.text by schema; also build citations-annotated text
-        structured_json = response.text or ""
-        cited_text = add_citations(response)
+        # (replayed responses have no raw grounding metadata, so they keep the plain text)
+        structured_json = response.text
+        cited_text = add_citations(response.raw) if response.raw is not None else response.text
         return {"structured": structured_json, "cited_text": cited_text}
 
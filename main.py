@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, Header, HTTPException, Request
 from pydantic import BaseModel, Field, model_validator
 from dotenv import load_dotenv
 from workflow import TourPlannerWorkflow
@@ -8,25 +8,95 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, PlainTextResponse, StreamingResponse
 import base64
+import json
 from grounding_service import GroundedFlightsSummarizer
-from utils.airport_db import init_database, populate_from_csv, get_airports, ensure_popular_airports, delete_unpopular_airports
+import asyncio
+import time
+from utils.airport_db import (
+    init_database, get_airports, ensure_popular_airports, refresh_airport_tiers,
+    refresh_airport_database, airport_refresh_loop, find_airports_near_city, get_airport_list_blob
+)
 from utils.airport_grounding import enrich_airports_with_grounding
+from utils.airport_autocomplete import autocomplete_airports, warm_autocomplete, TOP_N, MIN_RESOLVE_LENGTH
+from utils.gemini_clients import warm_gemini_connections, close_gemini_clients
+from utils.startup import STARTUP_WARMUP, STARTUP_TIMINGS, startup_phase, since_process_start_ms, warm_up
+from utils.tracing import start_span, parse_traceparent, sample_request, shutdown_tracing
+from loguru import logger
+from utils.profiling import profiling_requested, start_profile, load_profile
+from utils.log import configure_logging, log_payload, new_request_id, request_id_var
+from utils.diagnostics import RequestDiagnostics, start_diagnostics
+from utils.metrics import (
+    render_metrics, observe_request, HTTP_REQUESTS_IN_FLIGHT, PLANS_IN_FLIGHT
+)
+from utils.loop_monitor import start_loop_monitor
+from utils.readiness import readiness_loop, readiness
+from utils.admission import PLAN_ADMISSION, AdmissionRejected
+from utils.deadline import DEADLINE_RESERVE_SECONDS, current_deadline, remaining, start_deadline
+
+AIRPORT_REFRESH_HOURS = float(os.getenv("AIRPORT_REFRESH_HOURS", "24"))
+AIRPORT_LIST_MAX_AGE = int(os.getenv("AIRPORT_LIST_MAX_AGE", "300"))
+
+# Fire-and-forget tasks started by endpoints; held here so they are not garbage-collected mid-run
+_background_tasks = set()
+
+def _background_task_done(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("❌ [BACKGROUND] Task {} failed: {}", task.get_name(), task.exception())
+
+def run_in_background(coro, name: str) -> asyncio.Task:
+    """Start coro as a task that is kept alive until it finishes and whose failure is logged"""
+    task = asyncio.create_task(coro, name=name)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_task_done)
+    return task
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("🚀 [LIFESPAN] Initializing Journezy Trip Planner...")
-    # Initialize airport database on startup
-    init_database()
-    populate_from_csv()
-    # Always ensure popular airports are present (even if database already existed)
-    ensure_popular_airports()
-    # Delete unpopular USA airports to reduce clutter
-    print("🧹 [LIFESPAN] Cleaning unpopular airports...")
-    delete_unpopular_airports()
-    print("✅ [LIFESPAN] Application ready")
+    logger.info("🚀 [LIFESPAN] Initializing Journezy Trip Planner...")
+    # Heavy SDK imports, the shared Gemini clients and a first PDF render are done in a worker thread
+    # while the airport data is prepared here (STARTUP_WARMUP=off leaves them to the first request)
+    warmup_task = None
+    if STARTUP_WARMUP != "off":
+        warmup_task = asyncio.create_task(asyncio.to_thread(warm_up))
+    with startup_phase("airport_db"):
+        # Initialize airport database on startup
+        init_database()
+        # Always ensure popular airports are present and ranked (the full dataset is kept)
+        ensure_popular_airports()
+    with startup_phase("airport_listing"):
+        # Prebuild the listing the frontend loads on every page view
+        get_airport_list_blob(2000)
+        warm_autocomplete()
+    # The full dataset is downloaded, built and swapped in by a background task, off the request path
+    # (AIRPORT_REFRESH_HOURS=0 disables it, e.g. for offline benchmarks)
+    refresh_task = None
+    if AIRPORT_REFRESH_HOURS > 0:
+        refresh_task = asyncio.create_task(airport_refresh_loop(AIRPORT_REFRESH_HOURS * 3600))
+    # Event-loop lag metrics and stack dumps of any call that blocks the loop
+    loop_monitor = start_loop_monitor()
+    # /ready answers from the result of these periodic checks
+    readiness_task = asyncio.create_task(readiness_loop())
+    if warmup_task and STARTUP_WARMUP == "wait":
+        with startup_phase("warmup_wait"):
+            await warmup_task
+    # TLS to Gemini is opened in the background
+    warm_task = asyncio.create_task(asyncio.to_thread(warm_gemini_connections))
+    STARTUP_TIMINGS["ready"] = since_process_start_ms()
+    logger.info("✅ [LIFESPAN] Application ready {} ms after import ({})", STARTUP_TIMINGS["ready"],
+                ", ".join(f"{phase} {ms:.0f} ms" for phase, ms in STARTUP_TIMINGS.items() if phase != "ready"))
     yield
+    if refresh_task:
+        refresh_task.cancel()
+    if warmup_task:
+        warmup_task.cancel()
+    warm_task.cancel()
+    readiness_task.cancel()
+    loop_monitor.stop()
+    close_gemini_clients()
+    shutdown_tracing()
 
 app = FastAPI(
     title="Journezy Trip Planner",
@@ -37,6 +107,7 @@ app = FastAPI(
 
 # Load environment variables on startup
 load_dotenv()
+configure_logging()
 
 # Add template support
 templates = Jinja2Templates(directory="templates")
@@ -44,6 +115,54 @@ templates = Jinja2Templates(directory="templates")
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# Probed every few seconds by the orchestrator; kept out of traces and request metrics
+PROBE_PATHS = {"/live", "/ready"}
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Root tracing span, latency metrics and request ID per request; the trace ID goes back in X-Trace-Id
+    (an incoming traceparent is continued) and the request ID in X-Request-ID
+    """
+    if request.url.path.startswith("/static/") or request.url.path in PROBE_PATHS:
+        return await call_next(request)
+    started = time.perf_counter()
+    request_id = new_request_id(request.headers.get("x-request-id"))
+    request_id_token = request_id_var.set(request_id)
+    trace_id, parent_id = parse_traceparent(request.headers.get("traceparent")) or (None, None)
+    profiled = profiling_requested(request.headers.get("x-profile-token") or request.query_params.get("profile"))
+    # Plans (and profiled requests) are always traced; other routes such as autocomplete only by sample
+    sampled = profiled or sample_request(request.url.path, continued=trace_id is not None)
+    request_span = start_span(f"{request.method} {request.url.path}", trace_id=trace_id, parent_id=parent_id,
+                              sampled=sampled, method=request.method, path=request.url.path, request_id=request_id)
+    profile = None
+    if profiled:
+        profile = start_profile(request_span.trace_id or request_id)
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    except Exception as e:
+        request_span.end(error=e)
+        raise
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        if profile:
+            profile.stop()
+        # Label by the route template, so path parameters and unknown URLs can't explode the series count
+        route = request.scope.get("route")
+        observe_request(request.method, getattr(route, "path", "unmatched"), status_code, started)
+        request_id_var.reset(request_id_token)
+    request_span.set_attribute("status_code", response.status_code)
+    request_span.end(error=f"HTTP {response.status_code}" if response.status_code >= 500 else None)
+    response.headers["X-Request-ID"] = request_id
+    if profile:
+        response.headers["X-Profile-Id"] = profile.profile_id
+    if request_span.sampled:
+        response.headers["X-Trace-Id"] = request_span.trace_id
+    return response
+
 # Auth configuration from environment (with secure defaults and null-safety)
 _env_user = os.getenv("AUTH_USERNAME")
 _env_pass = os.getenv("AUTH_PASSWORD")
@@ -123,6 +242,10 @@ class TripRequest(BaseModel):
         default=True,
         description="Perform safety check for travel destination"
     )
+    include_diagnostics: bool = Field(
+        default=False,
+        description="Add timings and diagnostics blocks (stage times, upstream calls, cache hits) to the response"
+    )
 
     @model_validator(mode='before')
     @classmethod
@@ -347,6 +470,8 @@ class TripResponse(BaseModel):
     itinerary: Dict[str, Any]  # Raw workflow data
     document: Optional[str] = None  # PDF/Markdown content
     document_type: Optional[str] = None  # "pdf" or "markdown"
+    timings: Optional[Dict[str, Any]] = None  # Only with include_diagnostics
+    diagnostics: Optional[Dict[str, Any]] = None  # Only with include_diagnostics
 
 class BrowserSearchRequest(BaseModel):
     search_type: str = Field(..., description="Type of search: 'flights', 'hotels', or 'places'")
@@ -407,18 +532,67 @@ class ModifyItineraryResponse(BaseModel):
     message: str
     modified_itinerary: str
 
+def trip_debug_fields(workflow: TourPlannerWorkflow, diagnostics: Optional[RequestDiagnostics],
+                      started: float) -> Dict[str, Any]:
+    """timings and diagnostics blocks for a TripResponse, or nothing when the request didn't ask for them"""
+    if diagnostics is None:
+        return {}
+    collected = diagnostics.to_dict()
+    timings = {
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        "stages_ms": dict(workflow.stage_timings),
+        "document_render_ms": collected.pop("pdf_render_ms"),
+    }
+    if workflow.stage_memory:
+        collected["stage_memory_kib"] = dict(workflow.stage_memory)
+    deadline = current_deadline()
+    if deadline is not None:
+        timings["deadline_remaining_ms"] = round(deadline.remaining() * 1000, 1)
+        collected["skipped_optional"] = list(deadline.skipped)
+    return {"timings": timings, "diagnostics": {"flights_source": workflow.flights_source, **collected}}
+
+
+# Slice size when streaming a base64 document into the /plan-trip response body
+DOCUMENT_CHUNK_CHARS = 256 * 1024
+
+
+def stream_trip_response(trip: TripResponse, headers) -> Response:
+    """Serialize a TripResponse whose document is a base64 PDF without copying the document: the rest is
+    JSON-encoded as usual and the base64 text (which needs no JSON escaping) is streamed in slices after it"""
+    document = trip.document
+    if trip.document_type != "pdf" or not document:
+        return Response(content=json.dumps(trip.model_dump(), ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                        media_type="application/json", headers=dict(headers))
+    head = json.dumps(trip.model_dump(exclude={"document"}), ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")[:-1] + b',"document":"'
+
+    async def body():
+        yield head
+        for offset in range(0, len(document), DOCUMENT_CHUNK_CHARS):
+            yield document[offset:offset + DOCUMENT_CHUNK_CHARS].encode("ascii")
+        yield b'"}'
+
+    headers = {**dict(headers), "content-length": str(len(head) + len(document) + 2)}
+    return StreamingResponse(body(), media_type="application/json", headers=headers)
+
+
 @app.post("/plan-trip", response_model=TripResponse)
-async def plan_trip(request: TripRequest):
+async def plan_trip(request: TripRequest, response: Response,
+                    x_request_timeout: Optional[float] = Header(default=None)):
+    started = time.perf_counter()
+    diagnostics = start_diagnostics() if request.include_diagnostics else None
+    # One deadline for the whole plan, queue wait included; stages and upstream calls read it from context
+    start_deadline(x_request_timeout)
     try:
-        print("🎯 [PLAN-TRIP] Starting trip planning request...")
-        print(f"📝 [PLAN-TRIP] Request: {request.from_city} -> {request.to_city}")
+        logger.info("🎯 [PLAN-TRIP] Starting trip planning request...")
+        logger.debug("📝 [PLAN-TRIP] Request: {} -> {}", request.from_city, request.to_city)
 
         start_date, end_date = request.get_dates()
-        print(f"📅 [PLAN-TRIP] Trip dates: {start_date} to {end_date}")
+        logger.debug("📅 [PLAN-TRIP] Trip dates: {} to {}", start_date, end_date)
 
         # Build the structured query
         query = request.build_query()
-        print(f"🔍 [PLAN-TRIP] Generated query: {query}")
+        logger.debug("🔍 [PLAN-TRIP] Generated query: {}", query)
         
         # Ensure dates are properly formatted strings
         if not isinstance(start_date, str):
@@ -432,7 +606,7 @@ async def plan_trip(request: TripRequest):
         if language not in supported_langs:
             raise HTTPException(status_code=400, detail=f"Unsupported language: {language}. Supported languages: {', '.join(supported_langs)}")
 
-        print(f"🌐 [PLAN-TRIP] Language: {language}")
+        logger.debug("🌐 [PLAN-TRIP] Language: {}", language)
 
         # Validate required fields
         if not request.from_city or not request.to_city:
@@ -448,16 +622,30 @@ async def plan_trip(request: TripRequest):
         # Create workflow (Gemini used directly inside)
         workflow = TourPlannerWorkflow(language=language)
 
-        print(f"⚙️  [PLAN-TRIP] Created workflow: {type(workflow)}")
+        logger.debug("⚙️  [PLAN-TRIP] Created workflow: {}", type(workflow))
         
+        # Wait for a planning slot; when the queue is full or the wait runs out, shed the request right away
+        queued_at = time.perf_counter()
+        try:
+            # A plan admitted with less than the reserve left could only time out
+            admitted = await PLAN_ADMISSION.acquire(timeout=remaining() - DEADLINE_RESERVE_SECONDS)
+        except AdmissionRejected as rejected:
+            logger.warning("🚫 [PLAN-TRIP] Shed by admission control ({}), retry after {} s",
+                           rejected.reason, rejected.retry_after)
+            raise HTTPException(status_code=rejected.status_code,
+                                detail="The trip planner is busy right now, please retry shortly",
+                                headers={"Retry-After": str(rejected.retry_after)})
+        workflow.stage_timings["queue"] = round((admitted - queued_at) * 1000, 1)
+
         # Add timeout to prevent infinite running
         import asyncio
         try:
-            print("🚀 [PLAN-TRIP] Starting workflow execution...")
-            print(f"📊 [PLAN-TRIP] Smart defaults: toddler_friendly={request.consider_toddler_friendly}, senior_friendly={request.consider_senior_friendly}")
-            print(f"🧳 [PLAN-TRIP] Travelers: {request.travelers.adults} adults, {request.travelers.children} children, {request.travelers.seniors} seniors")
-            print(f"✈️  [PLAN-TRIP] Flight prefs: child_friendly={request.flight_preferences.child_friendly}, senior_friendly={request.flight_preferences.senior_friendly}")
+            logger.info("🚀 [PLAN-TRIP] Starting workflow execution...")
+            logger.debug("📊 [PLAN-TRIP] Smart defaults: toddler_friendly={}, senior_friendly={}", request.consider_toddler_friendly, request.consider_senior_friendly)
+            logger.debug("🧳 [PLAN-TRIP] Travelers: {} adults, {} children, {} seniors", request.travelers.adults, request.travelers.children, request.travelers.seniors)
+            logger.debug("✈️  [PLAN-TRIP] Flight prefs: child_friendly={}, senior_friendly={}", request.flight_preferences.child_friendly, request.flight_preferences.senior_friendly)
             
+            PLANS_IN_FLIGHT.inc()
             result = await asyncio.wait_for(
                 workflow.run(
                     query=query,
@@ -469,14 +657,15 @@ async def plan_trip(request: TripRequest):
                     consider_senior_friendly=request.consider_senior_friendly,
                     safety_check=request.safety_check
                 ),
-                timeout=300.0  # 5 minutes timeout
+                # Backstop only: the workflow stops itself at the deadline
+                timeout=remaining() + 5.0
             )
-            print("✅ [PLAN-TRIP] Workflow execution completed successfully")
+            logger.info("✅ [PLAN-TRIP] Workflow execution completed successfully")
         except asyncio.TimeoutError:
-            print("⏰ [PLAN-TRIP] Request timed out after 5 minutes")
+            logger.warning("⏰ [PLAN-TRIP] Request ran past its deadline")
             return TripResponse(
                 status="error",
-                message="Trip planning timed out after 5 minutes. This may happen with complex requests. Please try again with a simpler request or check your internet connection.",
+                message="Trip planning ran out of time. This may happen with complex requests. Please try again with a simpler request or check your internet connection.",
                 itinerary={
                     "flights": {"data": getattr(workflow, 'flights_data', None), "formatted": True},
                     "hotels": {"data": getattr(workflow, 'hotels_data', None), "formatted": True},
@@ -484,12 +673,11 @@ async def plan_trip(request: TripRequest):
                     "itinerary": {"data": getattr(workflow, 'itinerary', None), "formatted": True}
                 },
                 document=None,
-                document_type="markdown"
+                document_type="markdown",
+                **trip_debug_fields(workflow, diagnostics, started)
             )
         except Exception as workflow_err:
-            print(f"❌ [PLAN-TRIP] Workflow error: {workflow_err}")
-            import traceback
-            print("❌ [PLAN-TRIP] Full traceback: " + traceback.format_exc())
+            logger.exception("❌ [PLAN-TRIP] Workflow error: {}", workflow_err)
             return TripResponse(
                 status="error",
                 message=f"Trip planning failed: {str(workflow_err)}",
@@ -500,10 +688,19 @@ async def plan_trip(request: TripRequest):
                     "itinerary": {"data": getattr(workflow, 'itinerary', None), "formatted": True}
                 },
                 document=None,
-                document_type="markdown"
+                document_type="markdown",
+                **trip_debug_fields(workflow, diagnostics, started)
             )
-        print(f"🤖 [MAIN] Workflow result type: {type(result)}")
-        print(f"📝 [MAIN] Result preview: {result[:200] if isinstance(result, str) else str(result)[:200]}...")
+        finally:
+            PLANS_IN_FLIGHT.dec()
+            PLAN_ADMISSION.release(admitted)
+            # Per-stage durations (ms) for browser devtools and the load-test harness
+            if workflow.stage_timings:
+                response.headers["Server-Timing"] = ", ".join(
+                    f"{stage};dur={ms}" for stage, ms in workflow.stage_timings.items()
+                )
+        logger.debug("🤖 [MAIN] Workflow result type: {}", type(result))
+        log_payload("📝 [MAIN] Workflow result", result)
 
         # Structure the workflow data
         workflow_data = {
@@ -527,17 +724,18 @@ async def plan_trip(request: TripRequest):
 
         # Check if result is an error message
         if isinstance(result, str) and (result.startswith("Error") or result.startswith("Failed")):
-            print(f"❌ [MAIN] Error in workflow: {result}")
+            logger.error("❌ [MAIN] Error in workflow: {}", result)
             return TripResponse(
                 status="error",
                 message=result,
                 itinerary=workflow_data,
                 document=None,
-                document_type="markdown"
+                document_type="markdown",
+                **trip_debug_fields(workflow, diagnostics, started)
             )
 
         # Handle workflow output - now returns base64 PDF directly
-        print("✅ [MAIN] Workflow completed successfully")
+        logger.info("✅ [MAIN] Workflow completed successfully")
         document_data: Optional[str] = None
         document_type: str = "pdf"  # Default to PDF since workflow now generates PDFs
 
@@ -546,7 +744,7 @@ async def plan_trip(request: TripRequest):
                 # Check if it's a base64-encoded PDF (new workflow behavior)
                 if len(result) > 1000 and not any(char in result for char in ['\n', '#', '*', '-']):
                     # Likely base64 PDF data
-                    print("📄 [MAIN] Detected base64 PDF output from workflow")
+                    logger.debug("📄 [MAIN] Detected base64 PDF output from workflow")
                     document_data = result
                     document_type = "pdf"
                     
@@ -555,38 +753,38 @@ async def plan_trip(request: TripRequest):
                         # Quick validation: decode a small portion to check PDF signature
                         test_decode = base64.b64decode(result[:100])
                         if test_decode.startswith(b'%PDF'):
-                            print("✅ [MAIN] Validated PDF signature in base64 data")
+                            logger.info("✅ [MAIN] Validated PDF signature in base64 data")
                         else:
-                            print("⚠️ [MAIN] Base64 data doesn't appear to be a valid PDF, treating as text")
+                            logger.warning("⚠️ [MAIN] Base64 data doesn't appear to be a valid PDF, treating as text")
                             document_data = result
                             document_type = "markdown"
                     except Exception as validation_err:
-                        print(f"⚠️ [MAIN] PDF validation failed: {validation_err}, treating as text")
+                        logger.warning("⚠️ [MAIN] PDF validation failed: {}, treating as text", validation_err)
                         document_data = result
                         document_type = "markdown"
                 
                 # Check if it's a file path
                 elif isinstance(result, str) and os.path.exists(result):
                     if result.lower().endswith('.pdf'):
-                        print(f"📄 [MAIN] Detected PDF file output at: {result}")
+                        logger.debug("📄 [MAIN] Detected PDF file output at: {}", result)
                         try:
                             with open(result, 'rb') as f:
                                 pdf_content = f.read()
                             pdf_base64 = base64.b64encode(pdf_content).decode('utf-8')
                             document_data = pdf_base64
                             document_type = "pdf"
-                            print("✅ [MAIN] Successfully encoded PDF file to base64")
+                            logger.info("✅ [MAIN] Successfully encoded PDF file to base64")
                         except Exception as file_err:
-                            print(f"❌ [MAIN] Error reading PDF file: {file_err}")
+                            logger.error("❌ [MAIN] Error reading PDF file: {}", file_err)
                             document_data = result
                             document_type = "markdown"
 
                         # Clean up temp file
                         try:
                             os.unlink(result)
-                            print(f"🧹 [MAIN] Cleaned up temp PDF file: {result}")
+                            logger.debug("🧹 [MAIN] Cleaned up temp PDF file: {}", result)
                         except Exception as cleanup_err:
-                            print(f"⚠️ [MAIN] Error cleaning up PDF file: {cleanup_err}")
+                            logger.warning("⚠️ [MAIN] Error cleaning up PDF file: {}", cleanup_err)
                 
                 # Handle .pdf in result string (reference format) - only if file exists
                 elif ".pdf" in result and os.path.exists(result):
@@ -601,74 +799,75 @@ async def plan_trip(request: TripRequest):
                         # Clean up temp file
                         try:
                             os.unlink(result)
-                            print(f"🧹 [MAIN] Cleaned up temp PDF file: {result}")
+                            logger.debug("🧹 [MAIN] Cleaned up temp PDF file: {}", result)
                         except Exception as cleanup_err:
-                            print(f"⚠️ [MAIN] Error cleaning up PDF file: {cleanup_err}")
+                            logger.warning("⚠️ [MAIN] Error cleaning up PDF file: {}", cleanup_err)
                     except Exception as file_err:
-                        print(f"❌ [MAIN] Error reading PDF file: {file_err}")
+                        logger.error("❌ [MAIN] Error reading PDF file: {}", file_err)
                         document_data = result
                         document_type = "markdown"
                     
                 elif isinstance(result, str) and result.lower().endswith('.md'):
-                    print(f"📝 [MAIN] Detected markdown file output at: {result}")
+                    logger.debug("📝 [MAIN] Detected markdown file output at: {}", result)
                     try:
                         with open(result, 'r', encoding='utf-8') as f:
                             document_data = f.read()
                         document_type = "markdown"
-                        print("✅ [MAIN] Successfully read markdown file")
+                        logger.info("✅ [MAIN] Successfully read markdown file")
                     except Exception as file_err:
-                        print(f"❌ [MAIN] Error reading markdown file: {file_err}")
+                        logger.error("❌ [MAIN] Error reading markdown file: {}", file_err)
                         document_data = result
                         document_type = "markdown"
                         
                     # Clean up temp file
                     try:
                         os.unlink(result)
-                        print(f"🧹 [MAIN] Cleaned up temp markdown file: {result}")
+                        logger.debug("🧹 [MAIN] Cleaned up temp markdown file: {}", result)
                     except Exception as cleanup_err:
-                        print(f"⚠️ [MAIN] Error cleaning up markdown file: {cleanup_err}")
+                        logger.warning("⚠️ [MAIN] Error cleaning up markdown file: {}", cleanup_err)
                 else:
-                    print(f"📝 [MAIN] Unknown file type, treating as text: {result}")
+                    logger.debug("📝 [MAIN] Unknown file type, treating as text: {}", result)
                     document_data = result
                     document_type = "markdown"
             
             # Handle binary data (fallback case)
             elif isinstance(result, (bytes, bytearray)):
-                print("📦 [MAIN] Detected binary output; encoding as base64 PDF")
+                logger.debug("📦 [MAIN] Detected binary output; encoding as base64 PDF")
                 try:
                     pdf_base64 = base64.b64encode(result).decode('utf-8')
                     document_data = pdf_base64
                     document_type = "pdf"
-                    print("✅ [MAIN] Successfully encoded binary data to base64")
+                    logger.info("✅ [MAIN] Successfully encoded binary data to base64")
                 except Exception as encode_err:
-                    print(f"❌ [MAIN] Error encoding binary data: {encode_err}")
+                    logger.error("❌ [MAIN] Error encoding binary data: {}", encode_err)
                     document_data = str(result)
                     document_type = "markdown"
             
             # Handle None or other types
             else:
-                print(f"⚠️ [MAIN] Unexpected result type: {type(result)}")
+                logger.warning("⚠️ [MAIN] Unexpected result type: {}", type(result))
                 document_data = str(result) if result is not None else "No content generated"
                 document_type = "markdown"
                 
         except Exception as process_err:
-            print(f"❌ [MAIN] Error processing workflow output: {process_err}")
-            import traceback
-            print(f"❌ [MAIN] Processing error traceback: {traceback.format_exc()}")
+            logger.exception("❌ [MAIN] Error processing workflow output: {}", process_err)
             document_data = str(result) if result is not None else "Error processing workflow output"
             document_type = "markdown"
 
-        print(f"📄 [MAIN] Document payload length: {len(document_data) if document_data else 0} characters")
-        print(f"📋 [MAIN] Document type: {document_type}")
-        print("🎯 [MAIN] Sending document data to client for download")
+        logger.debug("📄 [MAIN] Document payload length: {} characters", len(document_data) if document_data else 0)
+        logger.debug("📋 [MAIN] Document type: {}", document_type)
+        logger.info("🎯 [MAIN] Sending document data to client for download")
 
-        return TripResponse(
+        return stream_trip_response(TripResponse(
             status="success",
             message="Trip planned successfully with Gemini 2.5 flash-lite",
             itinerary=workflow_data,
             document=document_data,
-            document_type=document_type
-        )
+            document_type=document_type,
+            **trip_debug_fields(workflow, diagnostics, started)
+        ), response.headers)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -693,7 +892,7 @@ async def grounded_flights(req: GroundedFlightsRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ [GROUNDED-FLIGHTS] Error: {e}")
+        logger.error("❌ [GROUNDED-FLIGHTS] Error: {}", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @app.post("/safety-check", response_model=SafetyCheckResponse)
@@ -702,7 +901,7 @@ async def safety_check(req: SafetyCheckRequest):
         if not req.destination or not req.destination.strip():
             raise HTTPException(status_code=400, detail="Destination is required")
         
-        print(f"🔍 [SAFETY-CHECK] Checking safety for destination: {req.destination}")
+        logger.debug("🔍 [SAFETY-CHECK] Checking safety for destination: {}", req.destination)
         
         # Basic safety information (in a real implementation, this would call external APIs)
         safety_info = {
@@ -757,7 +956,7 @@ async def safety_check(req: SafetyCheckRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ [SAFETY-CHECK] Error: {e}")
+        logger.error("❌ [SAFETY-CHECK] Error: {}", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @app.get("/")
@@ -768,7 +967,7 @@ async def read_root():
             raise HTTPException(status_code=404, detail="Login page not found")
         return FileResponse('static/login.html')
     except Exception as e:
-        print(f"❌ [ROOT] Error serving login page: {e}")
+        logger.error("❌ [ROOT] Error serving login page: {}", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.post("/login")
@@ -786,7 +985,7 @@ async def login(request: Request):
                 username = (data.get("username") or "").strip()
                 password = (data.get("password") or "").strip()
             except Exception as json_err:
-                print(f"⚠️ [LOGIN] JSON parsing error: {json_err}")
+                logger.warning("⚠️ [LOGIN] JSON parsing error: {}", json_err)
                 username = None
                 password = None
         
@@ -796,7 +995,7 @@ async def login(request: Request):
                 username = (form_data.get("username") or "").strip()
                 password = (form_data.get("password") or "").strip()
             except Exception as form_err:
-                print(f"⚠️ [LOGIN] Form parsing error: {form_err}")
+                logger.warning("⚠️ [LOGIN] Form parsing error: {}", form_err)
                 raise HTTPException(status_code=400, detail="Invalid request format")
         
         # Input validation
@@ -811,17 +1010,17 @@ async def login(request: Request):
         if len(password) > 200:
             raise HTTPException(status_code=400, detail="Password too long")
         
-        print(f"🔐 [LOGIN] Authentication attempt for user: {username}")
+        logger.info("🔐 [LOGIN] Authentication attempt for user: {}", username)
         
         # Compare against environment-configured credentials
         valid_user = (username.lower() == (AUTH_USERNAME or "").lower())
         valid_pass = (password == (AUTH_PASSWORD or ""))
         
         if valid_user and valid_pass:
-            print(f"✅ [LOGIN] Successful authentication for user: {username}")
+            logger.info("✅ [LOGIN] Successful authentication for user: {}", username)
             return {"status": "success", "message": "Login successful"}
         else:
-            print(f"❌ [LOGIN] Failed authentication attempt for user: {username}")
+            logger.error("❌ [LOGIN] Failed authentication attempt for user: {}", username)
             raise HTTPException(status_code=401, detail="Invalid username or password")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -829,34 +1028,67 @@ async def login(request: Request):
 @app.post("/log-download")
 async def log_download():
     """Log PDF download events from client"""
-    print("📥 [SERVER-LOG] PDF download initiated from client")
-    print("🎯 [SERVER-LOG] Client requested PDF download")
+    logger.info("📥 [SERVER-LOG] PDF download initiated from client")
+    logger.info("🎯 [SERVER-LOG] Client requested PDF download")
     return {"status": "logged", "message": "Download logged"}
 
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """If-None-Match check: * or an exact match with one of the listed tags (W/ prefixes ignored)"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
 @app.get("/airports", response_model=AirportResponse)
-async def get_airports_endpoint(search: Optional[str] = None, limit: int = 500):
+async def get_airports_endpoint(request: Request, search: Optional[str] = None, limit: int = 500):
     """Get list of airports with optional search - uses grounding for unknown cities"""
     try:
         # Cap limit at 2000 to prevent performance issues
         limit = min(limit, 2000)
+        
+        # The unfiltered list is prebuilt per database version and revalidated by ETag
+        if not search:
+            etag, body, gzipped = get_airport_list_blob(limit)
+            headers = {
+                "ETag": etag,
+                "Cache-Control": f"public, max-age={AIRPORT_LIST_MAX_AGE}",
+                "Vary": "Accept-Encoding"
+            }
+            if etag_matches(etag, request.headers.get("if-none-match", "")):
+                return Response(status_code=304, headers=headers)
+            if "gzip" in request.headers.get("accept-encoding", ""):
+                headers["Content-Encoding"] = "gzip"
+                body = gzipped
+            return Response(content=body, media_type="application/json", headers=headers)
         airports = get_airports(search_term=search, limit=limit)
         
         # If no results and search term provided, try multiple fallbacks
         if search and len(airports) == 0:
-            print(f"🔍 [AIRPORTS] No results for '{search}' in database...")
+            logger.debug("🔍 [AIRPORTS] No results for '{}' in database...", search)
             
             # Fallback 1: Ensure popular airports are present and retry
-            print(f"🔍 [AIRPORTS] Fallback 1: Refreshing popular airports...")
+            logger.debug("🔍 [AIRPORTS] Fallback 1: Refreshing popular airports...")
             ensure_popular_airports()
             airports = get_airports(search_term=search, limit=limit)
             
-            # Fallback 2: Use Google Gemini grounding to find nearby airport
+            # Fallback 2: Resolve the city offline through the gazetteer and spatial index
+            if len(airports) == 0:
+                logger.debug("🔍 [AIRPORTS] Fallback 2: Looking up nearest airports in the gazetteer...")
+                airports = find_airports_near_city(search, limit=min(limit, 3))
+            
+            # Fallback 3: Use Google Gemini grounding for names the gazetteer doesn't know
             if len(airports) == 0:
-                print(f"🔍 [AIRPORTS] Fallback 2: Using Gemini grounding service...")
-                airports = enrich_airports_with_grounding(search, airports)
+                logger.debug("🔍 [AIRPORTS] Fallback 3: Using Gemini grounding service...")
+                # Off the event loop so concurrent lookups of the same term can coalesce
+                airports = await asyncio.to_thread(enrich_airports_with_grounding, search, airports)
                 
                 if len(airports) > 0:
-                    print(f"✅ [AIRPORTS] Found {len(airports)} airports via grounding")
+                    logger.info("✅ [AIRPORTS] Found {} airports via grounding", len(airports))
         
         message = f"Found {len(airports)} airports"
         if airports and len(airports) > 0 and hasattr(airports[0], 'get'):
@@ -869,39 +1101,64 @@ async def get_airports_endpoint(search: Optional[str] = None, limit: int = 500):
             airports=airports
         )
     except Exception as e:
-        print(f"❌ [AIRPORTS] Error: {e}")
+        logger.error("❌ [AIRPORTS] Error: {}", e)
         raise HTTPException(status_code=500, detail=f"Error fetching airports: {str(e)}")
 
+@app.get("/airports/autocomplete")
+async def autocomplete_airports_endpoint(q: str = "", limit: int = 5):
+    """Keystroke search - served from in-memory prefix tables, never writes or calls an LLM"""
+    limit = max(1, min(limit, TOP_N))
+    airports = autocomplete_airports(q, limit)
+    return {
+        "q": q,
+        "airports": airports,
+        # Nothing matched: the client may ask /airports/resolve, which can use grounding
+        "resolvable": not airports and len(q.strip()) >= MIN_RESOLVE_LENGTH
+    }
+
+@app.get("/airports/resolve", response_model=AirportResponse)
+async def resolve_airport_endpoint(q: str):
+    """Find airports near a place autocomplete doesn't know - offline gazetteer first, then cached grounding"""
+    try:
+        airports = find_airports_near_city(q, limit=3)
+        if not airports:
+            airports = await asyncio.to_thread(enrich_airports_with_grounding, q, [])
+        return AirportResponse(
+            status="success",
+            message=f"Found {len(airports)} airports near {q}",
+            airports=airports
+        )
+    except Exception as e:
+        logger.error("❌ [AIRPORTS-RESOLVE] Error: {}", e)
+        raise HTTPException(status_code=500, detail=f"Error resolving airport: {str(e)}")
+
 @app.post("/airports/refresh-popular")
 async def refresh_popular_airports():
-    """Manually refresh popular airports in the database"""
+    """Schedule a background rebuild of the airport database - live data is swapped, never mutated in place"""
     try:
-        added, total, indian = ensure_popular_airports()
+        run_in_background(asyncio.to_thread(refresh_airport_database), "airport-refresh")
         return {
-            "status": "success",
-            "message": f"Popular airports refreshed. Added: {added}, Total: {total}, Indian: {indian}",
-            "added_count": added,
-            "total_count": total,
-            "indian_count": indian
+            "status": "scheduled",
+            "message": "Airport database refresh scheduled in the background"
         }
     except Exception as e:
-        print(f"❌ [AIRPORTS-REFRESH] Error: {e}")
+        logger.error("❌ [AIRPORTS-REFRESH] Error: {}", e)
         raise HTTPException(status_code=500, detail=f"Error refreshing airports: {str(e)}")
 
-@app.post("/airports/clean-unpopular")
-async def clean_unpopular_airports():
-    """Delete unpopular airports, especially USA ones"""
+@app.post("/airports/refresh-tiers")
+async def refresh_tiers():
+    """Re-apply curated popularity tiers - nothing is deleted, unpopular airports just rank lower"""
     try:
-        print("🧹 [AIRPORTS] Cleaning unpopular airports...")
-        deleted_count = delete_unpopular_airports()
+        logger.debug("🏷️ [AIRPORTS] Refreshing airport tiers...")
+        counts = refresh_airport_tiers()
         return {
-            "status": "success", 
-            "message": f"Deleted {deleted_count} unpopular airports",
-            "deleted_count": deleted_count
+            "status": "success",
+            "message": f"Airport tiers refreshed. Curated: {counts['popular_india'] + counts['popular']}, Total: {counts['total']}",
+            **counts
         }
     except Exception as e:
-        print(f"❌ [AIRPORTS] Error cleaning airports: {e}")
-        raise HTTPException(status_code=500, detail=f"Error cleaning airports: {str(e)}")
+        logger.error("❌ [AIRPORTS] Error refreshing tiers: {}", e)
+        raise HTTPException(status_code=500, detail=f"Error refreshing tiers: {str(e)}")
 
 @app.post("/modify-itinerary", response_model=ModifyItineraryResponse)
 async def modify_itinerary(request: ModifyItineraryRequest):
@@ -926,9 +1183,9 @@ async def modify_itinerary(request: ModifyItineraryRequest):
         ModifyItineraryResponse with the modified itinerary
     """
     try:
-        print("✏️ [MODIFY-ITINERARY] Starting itinerary modification...")
-        print(f"📝 [MODIFY-ITINERARY] Original itinerary length: {len(request.itinerary_content)} characters")
-        print(f"📝 [MODIFY-ITINERARY] Feedback: {request.modification_feedback}")
+        logger.info("✏️ [MODIFY-ITINERARY] Starting itinerary modification...")
+        logger.debug("📝 [MODIFY-ITINERARY] Original itinerary length: {} characters", len(request.itinerary_content))
+        logger.debug("📝 [MODIFY-ITINERARY] Feedback: {}", request.modification_feedback)
         
         from agents.itinerary_writer import modify_itinerary_content
         
@@ -945,7 +1202,7 @@ async def modify_itinerary(request: ModifyItineraryRequest):
             language=language
         )
         
-        print("✅ [MODIFY-ITINERARY] Itinerary modified successfully")
+        logger.info("✅ [MODIFY-ITINERARY] Itinerary modified successfully")
         
         return ModifyItineraryResponse(
             status="success",
@@ -953,9 +1210,7 @@ async def modify_itinerary(request: ModifyItineraryRequest):
             modified_itinerary=modified_itinerary
         )
     except Exception as e:
-        print(f"❌ [MODIFY-ITINERARY] Error: {e}")
-        import traceback
-        print(f"❌ [MODIFY-ITINERARY] Traceback: {traceback.format_exc()}")
+        logger.exception("❌ [MODIFY-ITINERARY] Error: {}", e)
         raise HTTPException(status_code=500, detail=f"Error modifying itinerary: {str(e)}")
 
 @app.get("/health")
@@ -1000,6 +1255,32 @@ async def health_check():
             "error": str(e)
         }
 
+@app.get("/live")
+async def liveness():
+    """Liveness probe: answers as long as the event loop does, without touching any dependency"""
+    return {"status": "alive"}
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe from cached background checks; 503 while starting, overloaded or the airport DB is down"""
+    state = readiness()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint: request, stage and upstream latencies, cache hit ratios, loop lag"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/debug/profiles/{profile_id}")
+async def get_profile(profile_id: str, request: Request):
+    """Folded stacks of a profiled request (feed to flamegraph.pl or speedscope); needs the profiling token"""
+    if not profiling_requested(request.headers.get("x-profile-token") or request.query_params.get("profile")):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+    profile = load_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="No profile for this trace ID")
+    return PlainTextResponse(profile)
+
 @app.get("/app")
 async def read_app():
     """Serve the main application page"""
@@ -1013,5 +1294,5 @@ async def read_app():
         response.headers["Expires"] = "0"
         return response
     except Exception as e:
-        print(f"❌ [APP] Error serving application page: {e}")
+        logger.error("❌ [APP] Error serving application page: {}", e)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -3385,8 +3385,9 @@ function sortAirportsByPopularity(airports) {
     ]);
     
     return airports.sort((a, b) => {
-        const aPopular = popularCodes.has(a.code);
-        const bPopular = popularCodes.has(b.code);
+        // Backend marks curated airports with tier > 0
+        const aPopular = (a.tier || 0) > 0 || popularCodes.has(a.code);
+        const bPopular = (b.tier || 0) > 0 || popularCodes.has(b.code);
         
         // Popular airports first
         if (aPopular && !bPopular) return -1;
@@ -3568,25 +3569,114 @@ function filterAirports(searchTerm) {
     return results;
 }
 
-// Search backend API if client-side search fails (fallback to Gemini grounding)
+// Search backend API if client-side search fails: fast autocomplete only.
+// Returns { airports, resolvable } - when resolvable, the dropdown offers a
+// "Find nearest airport" entry that the user has to pick to call /airports/resolve
 async function searchAirportBackend(searchTerm) {
     if (!searchTerm || searchTerm.length < 3) {
-        return [];
+        return { airports: [], resolvable: false };
     }
     
     try {
-        const response = await fetch(`/airports?search=${encodeURIComponent(searchTerm)}&limit=5`);
+        const response = await fetch(`/airports/autocomplete?q=${encodeURIComponent(searchTerm)}&limit=5`);
         if (!response.ok) {
             throw new Error(`HTTP ${response.status}`);
         }
         const data = await response.json();
-        if (data.status === 'success' && data.airports && data.airports.length > 0) {
-            return data.airports;
-        }
+        const airports = data.airports || [];
+        airports.forEach(airport => backendAirports.set(airport.code, airport));
+        return { airports, resolvable: Boolean(data.resolvable) };
     } catch (error) {
         console.warn(`⚠️ [AIRPORT-API] Backend search failed: ${error.message}`);
     }
-    return [];
+    return { airports: [], resolvable: false };
+}
+
+// Airports returned by the backend that are not in allAirports, so they can still be selected
+const backendAirports = new Map();
+const RESOLVE_OPTION_VALUE = '__resolve__';
+
+function findAirportByCode(code) {
+    return allAirports.find(a => a.code === code) || backendAirports.get(code);
+}
+
+// Build a dropdown option, showing the searched city prominently for "nearest to" results
+function createAirportOption(airport, searchTerm) {
+    let displayText = `${airport.code} - ${airport.name} (${airport.city || 'Unknown'})`;
+    if (airport.name && airport.name.includes('(nearest to')) {
+        const match = airport.name.match(/\(nearest to ([^,)]+)/);
+        const searchedCity = match ? match[1] : null;
+        const baseName = airport.name.replace(/\s*\(nearest to [^)]+\)/, '');
+        if (searchedCity && searchTerm && searchedCity.toLowerCase() === searchTerm.trim().toLowerCase()) {
+            displayText = `${airport.code} - ${searchedCity} → ${airport.city} (${baseName})`;
+        }
+    }
+    
+    const option = document.createElement('option');
+    option.value = airport.code;
+    option.textContent = displayText;
+    option.setAttribute('data-code', airport.code);
+    option.setAttribute('data-name', airport.name);
+    option.setAttribute('data-city', airport.city || '');
+    // Add tooltip with full airport information
+    option.title = `${airport.name}\nCode: ${airport.code}\nCity: ${airport.city || 'Unknown'}\nCountry: ${airport.country || 'Unknown'}`;
+    return option;
+}
+
+// Offer an explicit nearest-airport lookup for a place autocomplete doesn't know
+function appendResolveOption(dropdown, searchTerm) {
+    const option = document.createElement('option');
+    option.value = RESOLVE_OPTION_VALUE;
+    option.textContent = `🔎 Find nearest airport for "${searchTerm.trim()}"`;
+    option.setAttribute('data-query', searchTerm.trim());
+    dropdown.appendChild(option);
+    dropdown.size = 3;
+}
+
+// Resolve the query behind the dropdown's "Find nearest airport" entry (gazetteer / Gemini grounding)
+async function resolveNearestAirport(dropdown) {
+    const resolveOption = dropdown.querySelector(`option[value="${RESOLVE_OPTION_VALUE}"]`);
+    if (!resolveOption || resolveOption.disabled) {
+        return;
+    }
+    const query = resolveOption.getAttribute('data-query');
+    resolveOption.disabled = true;
+    resolveOption.textContent = `Searching for airports near "${query}"...`;
+    
+    let airports = [];
+    try {
+        const response = await fetch(`/airports/resolve?q=${encodeURIComponent(query)}`);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        const resolved = await response.json();
+        if (resolved.status === 'success' && resolved.airports) {
+            airports = resolved.airports;
+        }
+    } catch (error) {
+        console.warn(`⚠️ [AIRPORT-API] Resolve failed: ${error.message}`);
+    }
+    
+    dropdown.innerHTML = '<option value="">Select an airport...</option>';
+    if (airports.length === 0) {
+        const noResultsOption = document.createElement('option');
+        noResultsOption.textContent = `No airports found near "${query}"`;
+        noResultsOption.disabled = true;
+        noResultsOption.style.fontStyle = 'italic';
+        noResultsOption.style.color = '#6c757d';
+        dropdown.appendChild(noResultsOption);
+        dropdown.size = 2;
+        return;
+    }
+    
+    console.log(`✅ [AIRPORTS] Resolved "${query}" → ${airports.map(a => a.code).join(', ')}`);
+    airports.forEach(airport => {
+        backendAirports.set(airport.code, airport);
+        dropdown.appendChild(createAirportOption(airport, query));
+    });
+    dropdown.size = Math.min(airports.length + 1, 5);
+    dropdown.style.display = 'block';
+    dropdown.style.opacity = '1';
 }
 
 // Populate airport dropdowns with filtered results
@@ -3606,12 +3696,14 @@ async function populateAirportDropdowns(searchTermFrom = '', searchTermTo = '',
     
     // Filter airports for "from" dropdown (client-side first)
     let filteredFrom = filterAirports(searchTermFrom);
+    let resolvableFrom = false;
     
     // If client-side search finds nothing and search term is long enough, try backend
     if (filteredFrom.length === 0 && searchTermFrom && searchTermFrom.trim().length >= 3) {
         const backendResults = await searchAirportBackend(searchTermFrom);
-        if (backendResults.length > 0) {
-            filteredFrom = backendResults;
+        resolvableFrom = backendResults.resolvable;
+        if (backendResults.airports.length > 0) {
+            filteredFrom = backendResults.airports;
             console.log(`✅ [AIRPORTS] Backend found ${filteredFrom.length} result(s) for "${searchTermFrom}"`);
         }
     }
@@ -3623,33 +3715,7 @@ async function populateAirportDropdowns(searchTermFrom = '', searchTermTo = '',
     const displayFrom = filteredFrom.slice(0, maxResultsFrom);
     
     displayFrom.forEach((airport) => {
-        // Check if this is a fuzzy match or "nearest to" result
-        let displayText;
-        if (airport.name && airport.name.includes('(nearest to')) {
-            // Extract the "nearest to X" part for better display
-            const match = airport.name.match(/\(nearest to ([^)]+)\)/);
-            const searchedCity = match ? match[1] : null;
-            const baseName = airport.name.replace(/\s*\(nearest to [^)]+\)/, '');
-            
-            if (searchedCity && searchTermFrom && searchedCity.toLowerCase() === searchTermFrom.toLowerCase()) {
-                // Show the searched city prominently
-                displayText = `${airport.code} - ${searchedCity} → ${airport.city} (${baseName})`;
-            } else {
-                displayText = `${airport.code} - ${airport.name} (${airport.city || 'Unknown'})`;
-            }
-        } else {
-            displayText = `${airport.code} - ${airport.name} (${airport.city || 'Unknown'})`;
-        }
-        
-        const option = document.createElement('option');
-        option.value = airport.code;
-        option.textContent = displayText;
-        option.setAttribute('data-code', airport.code);
-        option.setAttribute('data-name', airport.name);
-        option.setAttribute('data-city', airport.city || '');
-        // Add tooltip with full airport information
-        option.title = `${airport.name}\nCode: ${airport.code}\nCity: ${airport.city || 'Unknown'}\nCountry: ${airport.country || 'Unknown'}`;
-        fromDropdown.appendChild(option);
+        fromDropdown.appendChild(createAirportOption(airport, searchTermFrom));
     });
     
     // Set dropdown size - expand when searching or focused
@@ -3680,6 +3746,9 @@ async function populateAirportDropdowns(searchTermFrom = '', searchTermTo = '',
         noResultsOption.style.fontStyle = 'italic';
         noResultsOption.style.color = '#6c757d';
         fromDropdown.appendChild(noResultsOption);
+        if (resolvableFrom) {
+            appendResolveOption(fromDropdown, searchTermFrom);
+        }
     } else if (isFromFocused) {
         // Show recommendations when input is focused (even without typing)
         fromDropdown.size = 3;
@@ -3693,14 +3762,16 @@ async function populateAirportDropdowns(searchTermFrom = '', searchTermTo = '',
     
     // Filter airports for "to" dropdown (client-side first)
     let filteredTo = filterAirports(searchTermTo);
+    let resolvableTo = false;
     
     // If client-side search finds nothing and search term is long enough, try backend
     if (filteredTo.length === 0 && searchTermTo && searchTermTo.trim().length >= 3) {
         console.log(`🔍 [AIRPORTS] No client-side results for "${searchTermTo}", trying backend...`);
         const backendResults = await searchAirportBackend(searchTermTo);
-        if (backendResults.length > 0) {
-            filteredTo = backendResults;
-            console.log(`✅ [AIRPORTS] Backend returned ${backendResults.length} results`);
+        resolvableTo = backendResults.resolvable;
+        if (backendResults.airports.length > 0) {
+            filteredTo = backendResults.airports;
+            console.log(`✅ [AIRPORTS] Backend returned ${filteredTo.length} results`);
         }
     }
     
@@ -3711,33 +3782,7 @@ async function populateAirportDropdowns(searchTermFrom = '', searchTermTo = '',
     const displayTo = filteredTo.slice(0, maxResultsTo);
     
     displayTo.forEach(airport => {
-        // Check if this is a fuzzy match or "nearest to" result
-        let displayText;
-        if (airport.name && airport.name.includes('(nearest to')) {
-            // Extract the "nearest to X" part for better display
-            const match = airport.name.match(/\(nearest to ([^)]+)\)/);
-            const searchedCity = match ? match[1] : null;
-            const baseName = airport.name.replace(/\s*\(nearest to [^)]+\)/, '');
-            
-            if (searchedCity && searchTermTo && searchedCity.toLowerCase() === searchTermTo.toLowerCase()) {
-                // Show the searched city prominently
-                displayText = `${airport.code} - ${searchedCity} → ${airport.city} (${baseName})`;
-            } else {
-                displayText = `${airport.code} - ${airport.name} (${airport.city || 'Unknown'})`;
-            }
-        } else {
-            displayText = `${airport.code} - ${airport.name} (${airport.city || 'Unknown'})`;
-        }
-        
-        const option = document.createElement('option');
-        option.value = airport.code;
-        option.textContent = displayText;
-        option.setAttribute('data-code', airport.code);
-        option.setAttribute('data-name', airport.name);
-        option.setAttribute('data-city', airport.city || '');
-        // Add tooltip with full airport information
-        option.title = `${airport.name}\nCode: ${airport.code}\nCity: ${airport.city || 'Unknown'}\nCountry: ${airport.country || 'Unknown'}`;
-        toDropdown.appendChild(option);
+        toDropdown.appendChild(createAirportOption(airport, searchTermTo));
     });
     
     // Set dropdown size - expand when searching, hide when not
@@ -3766,6 +3811,9 @@ async function populateAirportDropdowns(searchTermFrom = '', searchTermTo = '',
         noResultsOption.style.fontStyle = 'italic';
         noResultsOption.style.color = '#6c757d';
         toDropdown.appendChild(noResultsOption);
+        if (resolvableTo) {
+            appendResolveOption(toDropdown, searchTermTo);
+        }
     } else {
         // When not searching, still show dropdown if it's focused or if we're showing initial recommendations
         const toSearchInput = document.getElementById('to_airport_search');
@@ -3814,9 +3862,12 @@ function setupAirportEventListeners() {
             }, 150);
         });
         
-        // Clear search on Escape
+        // Clear search on Escape; Enter runs the "Find nearest airport" entry when that is all there is
         fromSearch.addEventListener('keydown', function(e) {
-            if (e.key === 'Escape') {
+            if (e.key === 'Enter' && fromDropdown.querySelector(`option[value="${RESOLVE_OPTION_VALUE}"]`)) {
+                e.preventDefault();
+                resolveNearestAirport(fromDropdown);
+            } else if (e.key === 'Escape') {
                 this.value = '';
                 populateAirportDropdowns('', toSearch ? toSearch.value : '');
             }
@@ -3853,9 +3904,12 @@ function setupAirportEventListeners() {
             }, 150);
         });
         
-        // Clear search on Escape
+        // Clear search on Escape; Enter runs the "Find nearest airport" entry when that is all there is
         toSearch.addEventListener('keydown', function(e) {
-            if (e.key === 'Escape') {
+            if (e.key === 'Enter' && toDropdown.querySelector(`option[value="${RESOLVE_OPTION_VALUE}"]`)) {
+                e.preventDefault();
+                resolveNearestAirport(toDropdown);
+            } else if (e.key === 'Escape') {
                 this.value = '';
                 populateAirportDropdowns(fromSearch ? fromSearch.value : '', '');
             }
@@ -3881,7 +3935,7 @@ function setupAirportEventListeners() {
     // Add event listeners for airport selection with smooth auto-close
     fromDropdown.addEventListener('change', function() {
         if (this.value) {
-            const airport = allAirports.find(a => a.code === this.value);
+            const airport = findAirportByCode(this.value);
             if (airport) {
                 // Update hidden input for form submission
                 const cityInput = document.getElementById('from_city');
@@ -3911,7 +3965,7 @@ function setupAirportEventListeners() {
     
     toDropdown.addEventListener('change', function() {
         if (this.value) {
-            const airport = allAirports.find(a => a.code === this.value);
+            const airport = findAirportByCode(this.value);
             if (airport) {
                 // Update hidden input for form submission
                 const cityInput = document.getElementById('to_city');
@@ -3939,6 +3993,22 @@ function setupAirportEventListeners() {
         }
     });
     
+    // "Find nearest airport" only runs when the user clicks it or presses Enter on it -
+    // arrowing through the list fires change events and must not trigger a resolve
+    [fromDropdown, toDropdown].forEach(dropdown => {
+        dropdown.addEventListener('click', function() {
+            if (this.value === RESOLVE_OPTION_VALUE) {
+                resolveNearestAirport(this);
+            }
+        });
+        dropdown.addEventListener('keydown', function(e) {
+            if (e.key === 'Enter' && this.value === RESOLVE_OPTION_VALUE) {
+                e.preventDefault();
+                resolveNearestAirport(this);
+            }
+        });
+    });
+    
     // Double-click to select (alternative to change event)
     fromDropdown.addEventListener('dblclick', function() {
         if (this.value) {
@@ -0,0 +1,79 @@
+"""
+Airport search regressions: real city names must win over look-alike city aliases
+(Paris/Puri, Bangkok/Gangtok, Hanoi/Hampi), while typos of alias cities still resolve.
+"""
+import pytest
+
+from utils import airport_autocomplete, airport_db
+from utils.fuzzy_match import FuzzyIndex
+
+
+@pytest.fixture(autouse=True)
+def curated_database(tmp_path, monkeypatch):
+    """A fresh database holding only the curated airports"""
+    monkeypatch.setattr(airport_db, "DB_PATH", str(tmp_path / "airports.db"))
+    monkeypatch.setattr(airport_db, "_pool", None)
+    monkeypatch.setattr(airport_db, "_schema_checked", False)
+    monkeypatch.setattr(airport_db, "_geo_index", None)
+    monkeypatch.setattr(airport_db, "_all_geo_index", None)
+    monkeypatch.setattr(airport_autocomplete, "_state", None)
+    airport_db.init_database()
+    airport_db.ensure_popular_airports()
+
+
+@pytest.mark.parametrize("city, codes", [
+    ("Paris", {"CDG"}),
+    ("Bangkok", {"BKK", "DMK"}),
+    ("Hanoi", {"HAN"}),
+])
+def test_real_city_beats_fuzzy_alias(city, codes):
+    airports = airport_db.get_airports(city)
+    assert airports
+    assert {airport["code"] for airport in airports} <= codes
+    assert not any("nearest to" in airport["name"] for airport in airports)
+
+
+@pytest.mark.parametrize("city, codes", [
+    ("Paris", {"CDG"}),
+    ("Bangkok", {"BKK", "DMK"}),
+    ("Hanoi", {"HAN"}),
+])
+def test_autocomplete_lists_real_city_first(city, codes):
+    suggestions = airport_autocomplete.autocomplete_airports(city.lower(), limit=5)
+    assert suggestions[0]["code"] in codes
+    assert not any("nearest to" in suggestion["name"] for suggestion in suggestions)
+
+
+@pytest.mark.parametrize("typo, code", [("amala", "IXC"), ("munanr", "COK"), ("darjiling", "IXB")])
+def test_alias_typos_still_resolve(typo, code):
+    assert airport_db.get_airports(typo)[0]["code"] == code
+
+
+def test_short_names_need_one_edit_and_the_same_start():
+    index = FuzzyIndex({"puri": "BBI", "gangtok": "IXB", "hampi": "BLR", "ambala": "IXC"})
+    assert index.search("paris") == []
+    assert index.search("bangkok") == []
+    assert index.search("hanoi") == []
+    assert [match.term for match in index.search("amala")] == ["ambala"]
+
+
+def _add_airport(code, latitude, longitude, airport_type, scheduled_service):
+    with airport_db._write_connection() as conn:
+        conn.execute("""
+            INSERT INTO airports (code, name, city, country, country_code, latitude, longitude, timezone,
+                                  airport_type, scheduled_service)
+            VALUES (?, ?, 'Nowhere', 'Nowhere', 'NW', ?, ?, 'UTC', ?, ?)
+        """, (code, f"{code} Field", latitude, longitude, airport_type, scheduled_service))
+    airport_db._reset_geo_index()
+
+
+def test_nearest_airport_skips_heliports_and_unscheduled_fields():
+    _add_airport("HLP", -40.0, -140.0, "heliport", "no")
+    _add_airport("SML", -40.05, -140.0, "small_airport", "no")
+    _add_airport("MED", -40.5, -140.0, "medium_airport", "yes")
+    assert [airport["code"] for airport in airport_db.find_nearest_airports(-40.0, -140.0, limit=1)] == ["MED"]
+
+
+def test_nearest_airport_falls_back_to_any_airport_in_range():
+    _add_airport("SML", -40.0, -140.0, "small_airport", "no")
+    assert [airport["code"] for airport in airport_db.find_nearest_airports(-40.0, -140.0, limit=1)] == ["SML"]
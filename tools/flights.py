@@ -3,7 +3,9 @@ import os
 
 from pydantic import Field
 from dotenv import load_dotenv
-from serpapi import GoogleSearch
+from loguru import logger
+from utils.serp_transport import serp_search
+from utils.log import log_payload
 
 load_dotenv()
 
@@ -86,13 +88,14 @@ def format_one_flight(
     
     # Debug only when there are issues with the data
     if dep_time == 'N/A' or arr_time == 'N/A' or duration == 0:
-        print(f"⚠️ [FORMAT-ONE-FLIGHT] Missing data - Times: {dep_time}/{arr_time}, Duration: {duration}")
+        logger.debug("⚠️ [FORMAT-ONE-FLIGHT] Missing data - Times: {}/{}, Duration: {}", dep_time, arr_time, duration)
     
     result = f"{airline} {flight_no} - {dep_port} ({dep_time_clean}) -> {arr_port} ({arr_time_clean}) [{duration_clean}] - {airplane}"
     return result
 
 
-def get_formatted_flights_info(flights: list, currency_code: str = "USD") -> str:
+def get_formatted_flights_info(flights: list, currency_code: str = "USD", header: str = "") -> str:
+    """Flight summary text, one block per itinerary; header (if any) is joined in, not prepended with +"""
     # Ensure consistent currency symbol mapping
     currency_upper = currency_code.upper()
     if currency_upper == "USD":
@@ -102,7 +105,7 @@ def get_formatted_flights_info(flights: list, currency_code: str = "USD") -> str
     else:
         symbol = "$"  # Default fallback
         
-    formatted_flights = []
+    formatted_flights = [header, ""] if header else []
     for flight in flights:
         for part in flight["flights"]:
             # Ensure all flight data fields exist with fallbacks
@@ -117,8 +120,8 @@ def get_formatted_flights_info(flights: list, currency_code: str = "USD") -> str
             
             # Debug only if time extraction fails
             if dep_time == "N/A" or arr_time == "N/A":
-                print(f"⚠️ [FLIGHT-FORMAT] Missing time data - Departure: {dep_time}, Arrival: {arr_time}")
-                print(f"⚠️ [FLIGHT-FORMAT] Full part data: {part}")
+                logger.debug("⚠️ [FLIGHT-FORMAT] Missing time data - Departure: {}, Arrival: {}", dep_time, arr_time)
+                log_payload("⚠️ [FLIGHT-FORMAT] Full part data", part)
             
             formatted_flight_line = format_one_flight(
                 flight_number,
@@ -159,8 +162,8 @@ def get_formatted_flights_info(flights: list, currency_code: str = "USD") -> str
     
     # Only debug if there seems to be an issue with the output
     if "N/A" in final_output:
-        print(f"⚠️ [FLIGHT-FORMAT] Output contains N/A values:")
-        print(f"📄 [FLIGHT-FORMAT] {final_output}")
+        logger.debug("⚠️ [FLIGHT-FORMAT] Output contains N/A values")
+        log_payload("📄 [FLIGHT-FORMAT] Formatted flights", final_output)
     
     return final_output
 
@@ -210,25 +213,13 @@ def find_flights(
     else:
         params["type"] = "2"  # One Way
 
-    # Add debug prints
-    print("\n=== DEBUG: SerpAPI Request Parameters ===")
-    print(f"Departure Airport: {departure_airport}")
-    print(f"Arrival Airport: {arrival_airport}")
-    print(f"Departure Date: {departure_date}")
-    print(f"Return Date: {return_date}")
-    print("Full params:")
-    print(params)
-    print("=======================================\n")
+    logger.debug("🔍 [FLIGHTS] SerpAPI params: {}", {k: v for k, v in params.items() if k != "api_key"})
 
     try:
-        print(f"\n> Finding flights from {departure_airport} to {arrival_airport}\n")
-        search = GoogleSearch(params)
-        results = search.get_dict()
-        
-        # Add debug print for API response
-        print("\n=== DEBUG: SerpAPI Response ===")
-        print(results)
-        print("==============================\n")
+        logger.info("✈️ [FLIGHTS] Finding flights from {} to {} ({} - {})",
+                    departure_airport, arrival_airport, departure_date, return_date)
+        results = serp_search(params)
+        log_payload("🔍 [FLIGHTS] SerpAPI response", results)
         
         if "error" in results:
             raise ValueError(f"SerpAPI error: {results['error']}")
@@ -258,7 +249,7 @@ def find_flights(
         
         first_line = f"Flights from {departure_airport} to {arrival_airport}:"
         if avoid_red_eye or avoid_early_morning or child_friendly or senior_friendly or direct_flights_only:
-            first_line += " (filtered by preferences)"
-        return first_line + "\n\n" + get_formatted_flights_info(flights_data[:3], currency_code=currency)
+            first_line = f"{first_line} (filtered by preferences)"
+        return get_formatted_flights_info(flights_data[:3], currency_code=currency, header=first_line)
     except Exception as e:
         raise Exception(f"Failed to search flights: {str(e)}")
@@ -2,13 +2,15 @@ import os
 
 from pydantic import Field
 from dotenv import load_dotenv
-from serpapi import GoogleSearch
+from loguru import logger
+from utils.serp_transport import serp_search
 
 
 load_dotenv()
 
 
-def get_formatted_hotels_info(hotels: list, currency_code: str = "USD") -> str:
+def get_formatted_hotels_info(hotels: list, currency_code: str = "USD", header: str = "") -> str:
+    """Hotel summary text, one block per hotel; header (if any) is joined in, not prepended with +"""
     # Ensure consistent currency symbol mapping
     currency_upper = currency_code.upper()
     if currency_upper == "USD":
@@ -17,7 +19,7 @@ def get_formatted_hotels_info(hotels: list, currency_code: str = "USD") -> str:
         symbol = "₹"
     else:
         symbol = "$"  # Default fallback
-    formatted_hotels = []
+    formatted_hotels = [header, ""] if header else []
     for hotel in hotels:
         name = hotel.get("name", "Hotel")
 
@@ -78,6 +80,56 @@ def get_formatted_hotels_info(hotels: list, currency_code: str = "USD") -> str:
     return "\n".join(formatted_hotels)
 
 
+def _hotel_price(h: dict) -> float:
+    p = None
+    rp = h.get("rate_per_night")
+    if isinstance(rp, dict):
+        p = rp.get("lowest") or rp.get("exact") or rp.get("value")
+    elif isinstance(rp, (int, float)):
+        p = rp
+    elif isinstance(rp, str):
+        # Try to extract number from string
+        import re
+        numbers = re.findall(r'\d+', rp)
+        if numbers:
+            p = float(numbers[0])
+    if p is None:
+        p = h.get("price") or h.get("lowest_price")
+    try:
+        return float(p) if p is not None else 999999  # High value for unknown prices
+    except Exception:
+        return 999999
+
+
+def _hotel_rating(h: dict) -> float:
+    rating = h.get("overall_rating") or h.get("rating") or 3.5
+    try:
+        return float(rating)
+    except:
+        return 3.5
+
+
+def select_hotels(hotels_data: list) -> list:
+    """Pick a display mix from raw hotel results: top-rated first, then budget options"""
+    # Sort by rating first, then by price
+    hotels_data = sorted(hotels_data, key=lambda h: (-_hotel_rating(h), _hotel_price(h)))
+    
+    # Take a good mix of hotels
+    high_rated = [h for h in hotels_data if _hotel_rating(h) >= 4.0][:8]  # Top rated
+    budget_options = [h for h in hotels_data if h not in high_rated][:4]  # Budget options
+    
+    selected_hotels = high_rated + budget_options
+    
+    # Ensure we have at least some hotels
+    if len(selected_hotels) < 8 and len(hotels_data) >= 8:
+        selected_hotels = hotels_data[:8]
+    elif len(selected_hotels) < len(hotels_data):
+        # Fill remaining slots
+        remaining = [h for h in hotels_data if h not in selected_hotels]
+        selected_hotels.extend(remaining[:max(0, 12 - len(selected_hotels))])
+    return selected_hotels
+
+
 def find_hotels(
     city: str = Field(..., description="The city where the hotels are located"),
     check_in_date: str = Field(
@@ -135,26 +187,25 @@ def find_hotels(
     }
 
     try:
-        print(f"\n> Finding hotels in {city}\n")
-        print(f"🔍 [HOTELS] Search query: {search_query}")
-        print(f"🔍 [HOTELS] Check-in: {check_in_date}, Check-out: {check_out_date}")
+        logger.info("🏨 [HOTELS] Finding hotels in {}", city)
+        logger.debug("🔍 [HOTELS] Search query: {}", search_query)
+        logger.debug("🔍 [HOTELS] Check-in: {}, Check-out: {}", check_in_date, check_out_date)
         
         # Primary search using google_hotels engine
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        results = serp_search(params)
         
-        print(f"🔍 [HOTELS] API Response keys: {list(results.keys()) if results else 'No response'}")
+        logger.debug("🔍 [HOTELS] API Response keys: {}", results.keys() if results else 'No response')
         
         if "error" in results:
-            print(f"❌ [HOTELS] SerpAPI error: {results['error']}")
+            logger.error("❌ [HOTELS] SerpAPI error: {}", results['error'])
             raise ValueError(f"SerpAPI error: {results['error']}")
         
         hotels_data = results.get("properties", [])
-        print(f"🔍 [HOTELS] Found {len(hotels_data)} hotels from primary search")
+        logger.debug("🔍 [HOTELS] Found {} hotels from primary search", len(hotels_data))
         
         # If limited results from google_hotels, try regular Google search
         if len(hotels_data) < 10:
-            print("⚠️ [HOTELS] Limited results from google_hotels, trying regular Google search...")
+            logger.warning("⚠️ [HOTELS] Limited results from google_hotels, trying regular Google search...")
             
             # Multiple alternative search strategies
             alternative_searches = [
@@ -179,8 +230,7 @@ def find_hotels(
                         "num": 20
                     }
                     
-                    alt_search = GoogleSearch(alt_params)
-                    alt_results = alt_search.get_dict()
+                    alt_results = serp_search(alt_params)
                     
                     # Extract hotel information from organic results
                     if "organic_results" in alt_results:
@@ -221,71 +271,29 @@ def find_hotels(
                                 if result.get("title", "").lower() not in existing_names:
                                     hotels_data.append(local_hotel)
                     
-                    print(f"🔍 [HOTELS] Alternative search '{alt_query}' added hotels, total now: {len(hotels_data)}")
+                    logger.debug("🔍 [HOTELS] Alternative search '{}' added hotels, total now: {}", alt_query, len(hotels_data))
                     
                     # Stop if we have enough hotels
                     if len(hotels_data) >= 20:
                         break
                         
                 except Exception as e:
-                    print(f"⚠️ [HOTELS] Alternative search failed for '{alt_query}': {str(e)}")
+                    logger.warning("⚠️ [HOTELS] Alternative search failed for '{}': {}", alt_query, str(e))
                     continue
         
-        print(f"🔍 [HOTELS] Total hotels before filtering: {len(hotels_data)}")
+        logger.debug("🔍 [HOTELS] Total hotels before filtering: {}", len(hotels_data))
         
         # Enhanced filtering and sorting
-        def _price(h: dict) -> float:
-            p = None
-            rp = h.get("rate_per_night")
-            if isinstance(rp, dict):
-                p = rp.get("lowest") or rp.get("exact") or rp.get("value")
-            elif isinstance(rp, (int, float)):
-                p = rp
-            elif isinstance(rp, str):
-                # Try to extract number from string
-                import re
-                numbers = re.findall(r'\d+', rp)
-                if numbers:
-                    p = float(numbers[0])
-            if p is None:
-                p = h.get("price") or h.get("lowest_price")
-            try:
-                return float(p) if p is not None else 999999  # High value for unknown prices
-            except Exception:
-                return 999999
-
-        def _rating(h: dict) -> float:
-            rating = h.get("overall_rating") or h.get("rating") or 3.5
-            try:
-                return float(rating)
-            except:
-                return 3.5
-
-        # Sort by rating first, then by price
-        hotels_data = sorted(hotels_data, key=lambda h: (-_rating(h), _price(h)))
-        
-        # Take a good mix of hotels
-        high_rated = [h for h in hotels_data if _rating(h) >= 4.0][:8]  # Top rated
-        budget_options = [h for h in hotels_data if h not in high_rated][:4]  # Budget options
-        
-        selected_hotels = high_rated + budget_options
-        
-        # Ensure we have at least some hotels
-        if len(selected_hotels) < 8 and len(hotels_data) >= 8:
-            selected_hotels = hotels_data[:8]
-        elif len(selected_hotels) < len(hotels_data):
-            # Fill remaining slots
-            remaining = [h for h in hotels_data if h not in selected_hotels]
-            selected_hotels.extend(remaining[:max(0, 12 - len(selected_hotels))])
+        selected_hotels = select_hotels(hotels_data)
         
-        print(f"🔍 [HOTELS] Selected {len(selected_hotels)} hotels for display")
+        logger.debug("🔍 [HOTELS] Selected {} hotels for display", len(selected_hotels))
         
-        first_line = f"Accommodations in {city}:"
+        first_line = [f"Accommodations in {city}:"]
         if toddler_friendly:
-            first_line += " (family-friendly options included)"
+            first_line.append("(family-friendly options included)")
         if senior_friendly:
-            first_line += " (senior-friendly options included)"
+            first_line.append("(senior-friendly options included)")
             
-        return first_line + "\n\n" + get_formatted_hotels_info(selected_hotels, currency_code=currency)
+        return get_formatted_hotels_info(selected_hotels, currency_code=currency, header=" ".join(first_line))
     except Exception as e:
         raise Exception(f"Failed to find hotels: {str(e)}")
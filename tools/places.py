@@ -2,25 +2,29 @@ import os
 
 from pydantic import Field
 from dotenv import load_dotenv
-from serpapi import GoogleSearch
+from loguru import logger
+from utils.serp_transport import serp_search, SERPAPI_MODE
+from utils.deadline import skip_optional
 
 load_dotenv()
 
 
-def get_formatted_places_info(sights: list) -> str:
+def get_formatted_places_info(sights: list, header: str = "") -> str:
+    """Places summary text, one block per sight; header (if any) is joined in, not prepended with +"""
+    formatted_places = [header, ""] if header else []
     if not sights or not isinstance(sights, list):
-        print("⚠️ [PLACES-FORMAT] No sights provided to format or invalid type")
-        return "No places found."
+        logger.warning("⚠️ [PLACES-FORMAT] No sights provided to format or invalid type")
+        formatted_places.append("No places found.")
+        return "\n".join(formatted_places)
     
-    formatted_places = []
     for i, sight in enumerate(sights):
         try:
             if not isinstance(sight, dict):
-                print(f"⚠️ [PLACES-FORMAT] Sight {i+1} is not a dictionary, skipping: {sight}")
+                logger.warning("⚠️ [PLACES-FORMAT] Sight {} is not a dictionary, skipping: {}", i+1, sight)
                 continue
                 
-            print(f"🔍 [PLACES-FORMAT] Processing sight {i+1}: {sight.get('title', 'Unknown')}")
-            print(f"🔍 [PLACES-FORMAT] Available keys: {list(sight.keys())}")
+            logger.debug("🔍 [PLACES-FORMAT] Processing sight {}: {}", i+1, sight.get('title', 'Unknown'))
+            logger.debug("🔍 [PLACES-FORMAT] Available keys: {}", sight.keys())
             
             # Place name
             title = sight.get("title", "Unknown Place")
@@ -61,17 +65,17 @@ def get_formatted_places_info(sights: list) -> str:
                         break
             
             if image_url:
-                print(f"🖼️ [PLACES-FORMAT] Found valid image URL: {image_url}")
+                logger.debug("🖼️ [PLACES-FORMAT] Found valid image URL: {}", image_url)
                 formatted_places.append(f"Image: {image_url}")
             else:
-                print(f"⚠️ [PLACES-FORMAT] No valid image found for {sight.get('title', 'Unknown')}")
+                logger.warning("⚠️ [PLACES-FORMAT] No valid image found for {}", sight.get('title', 'Unknown'))
                 # Use local fallback image instead of external placeholder
                 formatted_places.append("Image: /static/images/fallbacks/no-image.png")
             
             formatted_places.append("")
             
         except Exception as e:
-            print(f"❌ [PLACES-FORMAT] Error processing sight {i+1}: {str(e)}")
+            logger.error("❌ [PLACES-FORMAT] Error processing sight {}: {}", i+1, str(e))
             # Add a minimal entry for failed sights
             formatted_places.extend([
                 f"Place {i+1}",
@@ -83,7 +87,7 @@ def get_formatted_places_info(sights: list) -> str:
             ])
     
     result = "\n".join(formatted_places)
-    print(f"✅ [PLACES-FORMAT] Formatted {len(sights)} places, result length: {len(result)}")
+    logger.info("✅ [PLACES-FORMAT] Formatted {} places, result length: {}", len(sights), len(result))
     return result
 
 
@@ -98,12 +102,12 @@ def find_places_to_visit(
     
     # Input validation
     if not location or not isinstance(location, str) or location.strip() == "":
-        print("❌ [PLACES] Invalid location provided")
+        logger.error("❌ [PLACES] Invalid location provided")
         return "Error: Invalid location provided."
 
     SERPAPI_KEY = os.getenv("SERPAPI_KEY")
-    if not SERPAPI_KEY:
-        print("❌ [PLACES] No SerpAPI key found")
+    if not SERPAPI_KEY and SERPAPI_MODE != "replay":
+        logger.error("❌ [PLACES] No SerpAPI key found")
         return "Error: API configuration missing."
     
     # Clean and normalize location
@@ -130,22 +134,21 @@ def find_places_to_visit(
     }
 
     try:
-        print(f"\n> Finding places to visit in {location}\n")
-        print(f"🔍 [PLACES] Search query: {base_query}")
-        print(f"🔍 [PLACES] API Key present: {bool(SERPAPI_KEY)}")
+        logger.info("📍 [PLACES] Finding places to visit in {}", location)
+        logger.debug("🔍 [PLACES] Search query: {}", base_query)
+        logger.debug("🔍 [PLACES] API Key present: {}", bool(SERPAPI_KEY))
         
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        results = serp_search(params)
         
-        print(f"🔍 [PLACES] API Response keys: {list(results.keys()) if results else 'No response'}")
+        logger.debug("🔍 [PLACES] API Response keys: {}", results.keys() if results else 'No response')
         
         # Handle API errors
         if not results or not isinstance(results, dict):
-            print("❌ [PLACES] No valid response from SerpAPI")
+            logger.error("❌ [PLACES] No valid response from SerpAPI")
             raise ValueError("No valid response from SerpAPI")
             
         if "error" in results:
-            print(f"❌ [PLACES] SerpAPI error: {results['error']}")
+            logger.error("❌ [PLACES] SerpAPI error: {}", results['error'])
             raise ValueError(f"SerpAPI error: {results['error']}")
 
         # Try multiple data sources from SerpAPI response
@@ -156,11 +159,11 @@ def find_places_to_visit(
             primary_places = results["top_sights"]["sights"]
             if primary_places and isinstance(primary_places, list):
                 places_data.extend(primary_places)
-                print(f"🔍 [PLACES] Found {len(primary_places)} places from top_sights")
+                logger.debug("🔍 [PLACES] Found {} places from top_sights", len(primary_places))
             else:
-                print("⚠️ [PLACES] top_sights.sights is empty or invalid")
+                logger.warning("⚠️ [PLACES] top_sights.sights is empty or invalid")
         else:
-            print("⚠️ [PLACES] No top_sights found in API response")
+            logger.warning("⚠️ [PLACES] No top_sights found in API response")
         
         # Secondary source: organic_results (regular search results)
         if "organic_results" in results and results["organic_results"] is not None:
@@ -174,7 +177,7 @@ def find_places_to_visit(
                     try:
                         result = organic_results[i]
                         if not result or not isinstance(result, dict):
-                            print(f"⚠️ [PLACES] Skipping invalid organic result at index {i}: {type(result)}")
+                            logger.warning("⚠️ [PLACES] Skipping invalid organic result at index {}: {}", i, type(result))
                             continue
                             
                         title = result.get("title", "")
@@ -189,15 +192,15 @@ def find_places_to_visit(
                             }
                             organic_places.append(organic_place)
                     except (IndexError, KeyError, TypeError) as e:
-                        print(f"⚠️ [PLACES] Error processing organic result at index {i}: {str(e)}")
+                        logger.warning("⚠️ [PLACES] Error processing organic result at index {}: {}", i, str(e))
                         continue
                 
                 places_data.extend(organic_places)
-                print(f"🔍 [PLACES] Found {len(organic_places)} additional places from organic results")
+                logger.debug("🔍 [PLACES] Found {} additional places from organic results", len(organic_places))
             else:
-                print("⚠️ [PLACES] organic_results is empty or not a valid list")
+                logger.warning("⚠️ [PLACES] organic_results is empty or not a valid list")
         else:
-            print("⚠️ [PLACES] No organic_results found in API response")
+            logger.warning("⚠️ [PLACES] No organic_results found in API response")
         
         # Third source: local_results
         if "local_results" in results and results["local_results"] is not None:
@@ -211,7 +214,7 @@ def find_places_to_visit(
                     try:
                         result = local_results[i]
                         if not result or not isinstance(result, dict):
-                            print(f"⚠️ [PLACES] Skipping invalid local result at index {i}: {type(result)}")
+                            logger.warning("⚠️ [PLACES] Skipping invalid local result at index {}: {}", i, type(result))
                             continue
                             
                         local_place = {
@@ -224,21 +227,21 @@ def find_places_to_visit(
                         }
                         local_places.append(local_place)
                     except (IndexError, KeyError, TypeError) as e:
-                        print(f"⚠️ [PLACES] Error processing local result at index {i}: {str(e)}")
+                        logger.warning("⚠️ [PLACES] Error processing local result at index {}: {}", i, str(e))
                         continue
                 
                 places_data.extend(local_places)
-                print(f"🔍 [PLACES] Found {len(local_places)} places from local results")
+                logger.debug("🔍 [PLACES] Found {} places from local results", len(local_places))
             else:
-                print("⚠️ [PLACES] local_results is empty or not a valid list")
+                logger.warning("⚠️ [PLACES] local_results is empty or not a valid list")
         else:
-            print("⚠️ [PLACES] No local_results found in API response")
+            logger.warning("⚠️ [PLACES] No local_results found in API response")
         
-        print(f"🔍 [PLACES] Total places found: {len(places_data)}")
+        logger.debug("🔍 [PLACES] Total places found: {}", len(places_data))
         
         # If still limited results, try multiple alternative searches
         if len(places_data) < 5:
-            print("⚠️ [PLACES] Limited results, trying multiple alternative searches...")
+            logger.warning("⚠️ [PLACES] Limited results, trying multiple alternative searches...")
             
             alternative_queries = [
                 f"tourist attractions {location}",
@@ -250,6 +253,9 @@ def find_places_to_visit(
             ]
             
             for alt_query in alternative_queries:
+                # Each one is another SerpAPI round trip; stop when the plan's deadline is getting close
+                if skip_optional("places.alternative_searches"):
+                    break
                 try:
                     alt_params = {
                         "api_key": SERPAPI_KEY,
@@ -260,16 +266,15 @@ def find_places_to_visit(
                         "hl": "en",
                         "num": 20  # Request more results
                     }
-                    alt_search = GoogleSearch(alt_params)
-                    alt_results = alt_search.get_dict()
+                    alt_results = serp_search(alt_params)
                     
                     # Check if alternative search returned valid results
                     if not alt_results or not isinstance(alt_results, dict):
-                        print(f"⚠️ [PLACES] Alternative search '{alt_query}' returned no valid results")
+                        logger.warning("⚠️ [PLACES] Alternative search '{}' returned no valid results", alt_query)
                         continue
                         
                     if "error" in alt_results:
-                        print(f"⚠️ [PLACES] Alternative search '{alt_query}' returned error: {alt_results['error']}")
+                        logger.warning("⚠️ [PLACES] Alternative search '{}' returned error: {}", alt_query, alt_results['error'])
                         continue
                     
                     # Extract from multiple sources in alternative search
@@ -304,7 +309,7 @@ def find_places_to_visit(
                                     }
                                     alt_places.append(alt_place)
                                 except (IndexError, KeyError, TypeError) as e:
-                                    print(f"⚠️ [PLACES] Error processing alt organic result at index {i}: {str(e)}")
+                                    logger.warning("⚠️ [PLACES] Error processing alt organic result at index {}: {}", i, str(e))
                                     continue
                     
                     # Remove duplicates based on title
@@ -312,21 +317,21 @@ def find_places_to_visit(
                     new_places = [place for place in alt_places if place.get("title", "").lower() not in existing_titles]
                     
                     places_data.extend(new_places)
-                    print(f"🔍 [PLACES] Alternative query '{alt_query}' found {len(new_places)} new places")
+                    logger.debug("🔍 [PLACES] Alternative query '{}' found {} new places", alt_query, len(new_places))
                     
                     # Stop if we have enough places
                     if len(places_data) >= 15:
                         break
                         
                 except Exception as e:
-                    print(f"⚠️ [PLACES] Alternative search failed for '{alt_query}': {str(e)}")
+                    logger.warning("⚠️ [PLACES] Alternative search failed for '{}': {}", alt_query, str(e))
                     continue
             
-            print(f"🔍 [PLACES] Final total after alternative searches: {len(places_data)}")
+            logger.debug("🔍 [PLACES] Final total after alternative searches: {}", len(places_data))
 
         # If still no places found, create fallback places
         if len(places_data) == 0:
-            print("⚠️ [PLACES] No places found from any source, creating comprehensive fallback recommendations")
+            logger.warning("⚠️ [PLACES] No places found from any source, creating comprehensive fallback recommendations")
             fallback_places = [
                 {
                     "title": f"{location} City Center",
@@ -370,19 +375,17 @@ def find_places_to_visit(
                 }
             ]
             places_data = fallback_places
-            print(f"🔍 [PLACES] Created {len(fallback_places)} comprehensive fallback places")
+            logger.debug("🔍 [PLACES] Created {} comprehensive fallback places", len(fallback_places))
 
-        first_line = f"Here are the top places to visit in {location}:"
+        first_line = [f"Here are the top places to visit in {location}:"]
         if toddler_friendly:
-            first_line += " (toddler-friendly options included)"
+            first_line.append("(toddler-friendly options included)")
         if senior_friendly:
-            first_line += " (senior-friendly options included)"
+            first_line.append("(senior-friendly options included)")
         
-        formatted_result = first_line + "\n\n" + get_formatted_places_info(places_data)
-        print(f"✅ [PLACES] Formatted result length: {len(formatted_result)}")
+        formatted_result = get_formatted_places_info(places_data, header=" ".join(first_line))
+        logger.info("✅ [PLACES] Formatted result length: {}", len(formatted_result))
         return formatted_result
     except Exception as e:
-        print(f"❌ [PLACES] Error: {str(e)}")
-        import traceback
-        print(f"❌ [PLACES] Traceback: {traceback.format_exc()}")
+        logger.exception("❌ [PLACES] Error: {}", e)
         raise Exception(f"Failed to find places: {str(e)}")
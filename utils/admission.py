@@ -0,0 +1,121 @@
+"""
+Admission Control
+Caps how many trip plans run at once so that, under a burst, the plans already running keep their speed
+instead of all slowing down together until they time out. Up to MAX_CONCURRENT_PLANS run. Up to
+PLAN_QUEUE_MAX more wait in FIFO order, each for at most PLAN_QUEUE_TIMEOUT_SECONDS (or less if the caller's
+deadline is shorter). Anything beyond that is shed at once: 429 when the queue is full, 503 when the wait ran
+out. Both carry a Retry-After estimated from recent plan durations. Queue wait time is exported as
+journezy_plan_queue_wait_seconds.
+  MAX_CONCURRENT_PLANS          plans running at once (default 8; 0 disables admission control)
+  PLAN_QUEUE_MAX                plans allowed to wait for a slot (default 16)
+  PLAN_QUEUE_TIMEOUT_SECONDS    longest wait for a slot (default 20)
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Deque, Optional
+
+from utils.metrics import PLANS_QUEUED, PLAN_QUEUE_WAIT, PLANS_REJECTED
+
+MAX_CONCURRENT_PLANS = int(os.getenv("MAX_CONCURRENT_PLANS", "8"))
+PLAN_QUEUE_MAX = int(os.getenv("PLAN_QUEUE_MAX", "16"))
+PLAN_QUEUE_TIMEOUT_SECONDS = float(os.getenv("PLAN_QUEUE_TIMEOUT_SECONDS", "20"))
+# Starting guess for how long a plan holds its slot, until real plans have been timed
+INITIAL_PLAN_SECONDS = 30.0
+MAX_RETRY_AFTER_SECONDS = 300
+
+
+class AdmissionRejected(Exception):
+    """A plan that was shed; status_code and retry_after go straight into the HTTP response"""
+
+    def __init__(self, reason: str, status_code: int, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class PlanAdmission:
+    """Counting limiter with a bounded FIFO wait queue; a released slot is handed straight to the next waiter"""
+
+    def __init__(self, limit: int = MAX_CONCURRENT_PLANS, queue_max: int = PLAN_QUEUE_MAX,
+                 queue_timeout: float = PLAN_QUEUE_TIMEOUT_SECONDS):
+        self.limit = limit
+        self.queue_max = queue_max
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._avg_plan_seconds = INITIAL_PLAN_SECONDS
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a newcomer, from the average plan time and the queue"""
+        estimate = self._avg_plan_seconds * (len(self._waiters) + 1) / max(self.limit, 1)
+        return int(min(max(math.ceil(estimate), 1), MAX_RETRY_AFTER_SECONDS))
+
+    def _reject(self, reason: str, status_code: int, waited: float) -> AdmissionRejected:
+        PLANS_REJECTED.inc(reason=reason)
+        if waited:
+            PLAN_QUEUE_WAIT.observe(waited, outcome="rejected")
+        return AdmissionRejected(reason, status_code, self.retry_after())
+
+    async def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        Wait for a slot, for at most timeout (default PLAN_QUEUE_TIMEOUT_SECONDS) seconds.
+        Returns the admission time to pass to release(); raises AdmissionRejected when the plan is shed.
+        """
+        started = time.perf_counter()
+        if self.limit <= 0:
+            return started
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            PLAN_QUEUE_WAIT.observe(0.0, outcome="admitted")
+            return started
+        timeout = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+        if len(self._waiters) >= self.queue_max:
+            raise self._reject("queue_full", 429, 0.0)
+        if timeout <= 0:
+            raise self._reject("deadline", 503, 0.0)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        PLANS_QUEUED.set(len(self._waiters))
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            raise self._reject("queue_timeout", 503, time.perf_counter() - started) from None
+        except asyncio.CancelledError:
+            # The client went away; if the slot was handed over in the meantime, pass it on
+            if waiter.done() and not waiter.cancelled():
+                self._hand_over()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            PLANS_QUEUED.set(len(self._waiters))
+        admitted = time.perf_counter()
+        PLAN_QUEUE_WAIT.observe(admitted - started, outcome="admitted")
+        return admitted
+
+    def release(self, admitted: float):
+        """Give the slot back (to the longest waiter, if any) and fold the plan's run time into the average"""
+        if self.limit <= 0:
+            return
+        self._avg_plan_seconds = 0.8 * self._avg_plan_seconds + 0.2 * (time.perf_counter() - admitted)
+        self._hand_over()
+
+    def _hand_over(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+PLAN_ADMISSION = PlanAdmission()
@@ -0,0 +1,173 @@
+"""
+Airport Autocomplete
+Read-only, in-memory prefix lookup for the airport search box.
+Top results for every 1-3 character prefix are precomputed; longer prefixes are
+computed on demand from the airports sharing their first three characters and kept in an LRU.
+Nothing here writes to the database or calls an LLM.
+"""
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional
+
+from loguru import logger
+from utils.airport_db import get_airports, get_alias_index, add_reload_listener
+
+PRECOMPUTED_PREFIX_LENGTH = 3
+TOP_N = 10
+LRU_SIZE = 2048
+MIN_RESOLVE_LENGTH = 3
+
+# Lower rank sorts first: which field the prefix matched
+_FIELD_CODE, _FIELD_CITY, _FIELD_NAME = 0, 1, 2
+
+_lock = threading.Lock()
+# Everything built from one version of the airport data, replaced as a whole on reload
+_state: Optional[Dict] = None
+
+
+def _tokens(airport: Dict):
+    """(field rank, token) pairs a prefix can match: the code, then words of the city and the name"""
+    yield _FIELD_CODE, airport['code'].lower()
+    for word in re.split(r"[\s\-/,()]+", (airport.get('city') or '').lower()):
+        if word:
+            yield _FIELD_CITY, word
+    for word in re.split(r"[\s\-/,()]+", (airport.get('name') or '').lower()):
+        if word:
+            yield _FIELD_NAME, word
+
+
+def _compact(airport: Dict) -> Dict:
+    return {key: airport.get(key) for key in ('code', 'name', 'city', 'country')}
+
+
+def _rank(airport: Dict, prefix: str, field: int) -> tuple:
+    return (0 if airport['code'].lower() == prefix else 1, -airport.get('tier', 0), field, airport['name'])
+
+
+def _build() -> Dict:
+    """Load the airport list once, tokenize it and precompute top results for every short prefix"""
+    airports = get_airports(limit=1_000_000)
+    best = defaultdict(dict)  # prefix -> code -> (rank, airport)
+    # Per airport: (airport, tokens, lowercased city, lowercased name), so keystrokes never re-tokenize
+    entries = []
+    # 3-character prefix -> indexes into entries; longer prefixes only look at these candidates
+    postings = defaultdict(set)
+    for airport in airports:
+        tokens = list(_tokens(airport))
+        city, name = (airport.get('city') or '').lower(), airport['name'].lower()
+        index = len(entries)
+        entries.append((airport, tokens, city, name))
+        # Whole city and name too, for multi-word prefixes like "new yo"
+        for text in [token for _, token in tokens] + [city, name]:
+            if len(text) >= PRECOMPUTED_PREFIX_LENGTH:
+                postings[text[:PRECOMPUTED_PREFIX_LENGTH]].add(index)
+        for field, token in tokens:
+            for length in range(1, min(len(token), PRECOMPUTED_PREFIX_LENGTH) + 1):
+                prefix = token[:length]
+                rank = _rank(airport, prefix, field)
+                current = best[prefix].get(airport['code'])
+                if current is None or rank < current[0]:
+                    best[prefix][airport['code']] = (rank, airport)
+
+    prefixes = {
+        prefix: [_compact(airport) for _, airport in sorted(matches.values(), key=lambda m: m[0])[:TOP_N]]
+        for prefix, matches in best.items()
+    }
+    logger.debug("⌨️ [AUTOCOMPLETE] Indexed {} airports, {} short prefixes", len(airports), len(prefixes))
+    return {
+        'entries': entries,
+        'postings': {prefix: sorted(indexes) for prefix, indexes in postings.items()},
+        'by_code': {airport['code']: airport for airport in airports},
+        'prefixes': prefixes,
+        'lru': OrderedDict(),
+    }
+
+
+def _get_state() -> Dict:
+    global _state
+    state = _state
+    if state is None:
+        with _lock:
+            if _state is None:
+                _state = _build()
+            state = _state
+    return state
+
+
+def _rebuild():
+    """Rebuild off the request path after the data changes; readers keep the old tables until it's done"""
+    global _state
+    if _state is not None:
+        _state = _build()
+
+
+add_reload_listener(_rebuild)
+
+
+def _search_long_prefix(state: Dict, prefix: str) -> List[Dict]:
+    """Airports with a token starting with prefix, then alias matches (exact or fuzzy) to fill the free slots"""
+    matches = []
+    # Whether the prefix is a whole word of some airport's city or name, i.e. a real place was typed
+    real_place = False
+    entries = state['entries']
+    for index in state['postings'].get(prefix[:PRECOMPUTED_PREFIX_LENGTH], ()):
+        airport, tokens, city, name = entries[index]
+        fields = [field for field, token in tokens if token.startswith(prefix)]
+        real_place = real_place or any(token == prefix for _, token in tokens) or prefix in (city, name)
+        # Multi-word prefixes like "new yo" match the start of the whole city or name
+        if city.startswith(prefix):
+            fields.append(_FIELD_CITY)
+        if name.startswith(prefix):
+            fields.append(_FIELD_NAME)
+        if fields:
+            matches.append((_rank(airport, prefix, min(fields)), airport))
+    matches.sort(key=lambda m: m[0])
+    results = [_compact(airport) for _, airport in matches[:TOP_N]]
+    if len(results) >= TOP_N or real_place:
+        return results
+
+    # "paris" must show CDG, not an alias that happens to be a few edits away
+    seen = {result['code'] for result in results}
+    for match in get_alias_index().search(prefix, limit=3):
+        airport = state['by_code'].get(match.value)
+        if airport and airport['code'] not in seen:
+            seen.add(airport['code'])
+            result = _compact(airport)
+            result['name'] = f"{airport['name']} (nearest to {match.term})"
+            results.append(result)
+    return results[:TOP_N]
+
+
+def autocomplete_airports(query: str, limit: int = 5) -> List[Dict]:
+    """Compact {code, name, city, country} suggestions for a typed prefix, best first"""
+    prefix = query.lower().strip()
+    if not prefix:
+        return []
+    state = _get_state()
+
+    if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+        return state['prefixes'].get(prefix, [])[:limit]
+
+    lru = state['lru']
+    with _lock:
+        results = lru.get(prefix)
+        if results is not None:
+            lru.move_to_end(prefix)
+    if results is None:
+        results = _search_long_prefix(state, prefix)
+        with _lock:
+            lru[prefix] = results
+            if len(lru) > LRU_SIZE:
+                lru.popitem(last=False)
+    return results[:limit]
+
+
+def warm_autocomplete():
+    """Build the prefix table ahead of the first keystroke"""
+    _get_state()
+
+
+def autocomplete_warm() -> bool:
+    """Whether the prefix table is built (a cold one is built by the next keystroke)"""
+    return _state is not None
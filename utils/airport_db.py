@@ -5,22 +5,55 @@ Downloads comprehensive airport data from public sources
 """
 import sqlite3
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable, Tuple
 import csv
 import urllib.request
 import io
+import zipfile
+import gzip
+import json
+import hashlib
+import time
+import queue
+import asyncio
+import threading
+from contextlib import closing, contextmanager
+from loguru import logger
+from utils.fuzzy_match import FuzzyIndex
+from utils.geo_index import GeoIndex
 
-DB_PATH = "airports.db"
+DB_PATH = os.getenv("AIRPORT_DB_PATH", "airports.db")
 
+# GeoNames cities file (cities with population > 15000) used as the offline gazetteer
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", "cities15000.txt")
+GAZETTEER_URL = "https://download.geonames.org/export/dump/cities15000.zip"
 
-def init_database():
-    """Initialize the airport database if it doesn't exist"""
-    if os.path.exists(DB_PATH):
-        return
-    
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
+# Cities further than this from every airport are left to the grounding service
+MAX_NEAREST_AIRPORT_KM = 300
+
+# A rebuilt database must contain at least this many airports to be swapped in
+MIN_AIRPORTS_FOR_SWAP = 1000
+
+# Ranking tiers - every IATA airport is kept, curated airports rank first
+TIER_STANDARD = 0
+TIER_POPULAR = 1
+TIER_POPULAR_INDIA = 2
+
+_schema_checked = False
+_alias_index: Optional[FuzzyIndex] = None
+_geo_index: Optional[GeoIndex] = None
+_all_geo_index: Optional[GeoIndex] = None
+
+# Serialized unfiltered listings keyed by limit: (etag, json body, gzipped body)
+_list_blobs: Dict[int, Tuple[str, bytes, bytes]] = {}
+_list_generation = 0
+# Limits whose listing was dropped by a data change, rebuilt by the reload listener
+_stale_list_limits = set()
+MAX_LIST_BLOBS = 8
+
+
+def _create_schema(cursor):
+    """Create tables and indexes (idempotent) and add columns missing from older databases"""
     # Create airports table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS airports (
@@ -32,7 +65,60 @@ def init_database():
             country_code TEXT,
             latitude REAL,
             longitude REAL,
-            timezone TEXT
+            timezone TEXT,
+            tier INTEGER NOT NULL DEFAULT 0,
+            airport_type TEXT,
+            scheduled_service TEXT
+        )
+    """)
+    
+    # Databases created before tiering have no tier column
+    cursor.execute("PRAGMA table_info(airports)")
+    columns = {row[1] for row in cursor.fetchall()}
+    if 'tier' not in columns:
+        cursor.execute("ALTER TABLE airports ADD COLUMN tier INTEGER NOT NULL DEFAULT 0")
+        logger.info("🔧 [AIRPORT-DB] Added tier column to existing database")
+    # OurAirports type (large_airport, heliport...) and scheduled_service (yes/no); NULL when the source lacks them
+    if 'airport_type' not in columns:
+        cursor.execute("ALTER TABLE airports ADD COLUMN airport_type TEXT")
+        cursor.execute("ALTER TABLE airports ADD COLUMN scheduled_service TEXT")
+        logger.info("🔧 [AIRPORT-DB] Added airport type columns to existing database")
+    
+    # Key/value metadata about the dataset (e.g. whether the full list was loaded)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS metadata (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """)
+    
+    # Offline gazetteer: one row per city name spelling, resolved to coordinates
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cities (
+            name TEXT NOT NULL,
+            country_code TEXT,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            population INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_city_name ON cities(name, population DESC)
+    """)
+    
+    # Search terms resolved outside the database (e.g. by grounding), with provenance and expiry.
+    # A NULL code is a negative entry: the term could not be resolved.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS resolved_aliases (
+            term TEXT PRIMARY KEY,
+            code TEXT,
+            name TEXT,
+            city TEXT,
+            country TEXT,
+            country_code TEXT,
+            source TEXT NOT NULL,
+            resolved_at INTEGER NOT NULL,
+            expires_at INTEGER NOT NULL
         )
     """)
     
@@ -46,44 +132,196 @@ def init_database():
         CREATE INDEX IF NOT EXISTS idx_name ON airports(name)
     """)
     
-    conn.commit()
-    conn.close()
-    print(f"✅ [AIRPORT-DB] Database initialized at {DB_PATH}")
+    # Default listing walks this index: curated tiers first, then by name
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tier_name ON airports(tier DESC, name)
+    """)
+
+
+def init_database():
+    """Initialize the airport database if it doesn't exist, migrating older schemas once per process"""
+    global _schema_checked
+    if os.path.exists(DB_PATH) and _schema_checked:
+        return
+    
+    with _write_lock:
+        is_new = not os.path.exists(DB_PATH)
+        conn = sqlite3.connect(DB_PATH)
+        # WAL lets pooled readers keep reading while a write or a swap commits (the mode is stored in the file)
+        conn.execute("PRAGMA journal_mode=WAL")
+        cursor = conn.cursor()
+        _create_schema(cursor)
+        if not is_new:
+            # Older databases may have curated rows without their tier set
+            _upsert_curated_airports(cursor)
+        if _get_metadata(cursor, "version") is None:
+            _touch_version(cursor)
+        conn.commit()
+        conn.close()
+    _schema_checked = True
+    if is_new:
+        logger.info("✅ [AIRPORT-DB] Database initialized at {}", DB_PATH)
+
+
+def _get_metadata(cursor, key: str) -> Optional[str]:
+    """Read a metadata value, or None if unset"""
+    cursor.execute("SELECT value FROM metadata WHERE key = ?", (key,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _set_metadata(cursor, key: str, value: str):
+    """Write a metadata value"""
+    cursor.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", (key, value))
+
+
+def _touch_version(cursor):
+    """Stamp the database with a new data version (used to invalidate caches built from it)"""
+    _set_metadata(cursor, "version", f"{time.time_ns():x}")
+
+
+class _ReadPool:
+    """Pool of read-only SQLite connections bound to one database file"""
+    
+    def __init__(self, path: str, size: int = 8):
+        self.path = path
+        self._idle = queue.LifoQueue(maxsize=size)
+    
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            conn = sqlite3.connect(f"file:{os.path.abspath(self.path)}?mode=ro", uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            return conn
+    
+    def release(self, conn: sqlite3.Connection):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+# Writers are serialized with each other and with database swaps; readers never take this lock and,
+# with the live file in WAL mode, never wait for a writer either
+_write_lock = threading.RLock()
+_refresh_lock = threading.Lock()
+_pool: Optional[_ReadPool] = None
+_reload_listeners: List[Callable[[], None]] = []
+_reload_timer: Optional[threading.Timer] = None
+_reload_timer_lock = threading.Lock()
+# Writes closer together than this share one rebuild of the in-memory indexes
+RELOAD_DELAY_SECONDS = 0.5
+
+
+def add_reload_listener(listener: Callable[[], None]):
+    """Register a callback run after the airport data changes (swap or write), e.g. to rebuild in-memory indexes.
+    
+    Listeners run on a background thread, shortly after the change and once per burst of changes.
+    """
+    if listener not in _reload_listeners:
+        _reload_listeners.append(listener)
+
+
+def _notify_reload():
+    """Drop the cached listings now and schedule the reload listeners off the writing thread"""
+    global _reload_timer
+    _invalidate_airport_list_blobs()
+    with _reload_timer_lock:
+        if _reload_timer is None:
+            _reload_timer = threading.Timer(RELOAD_DELAY_SECONDS, _run_reload_listeners)
+            _reload_timer.daemon = True
+            _reload_timer.start()
+
+
+def _run_reload_listeners():
+    global _reload_timer
+    with _reload_timer_lock:
+        _reload_timer = None
+    for listener in list(_reload_listeners):
+        try:
+            listener()
+        except Exception as e:
+            logger.warning("⚠️ [AIRPORT-DB] Reload listener {} failed: {}", getattr(listener, '__name__', listener), e)
+
+
+@contextmanager
+def _read_connection():
+    """Borrow a pooled read-only connection to the live database"""
+    global _pool
+    pool = _pool
+    if pool is None:
+        with _write_lock:
+            if _pool is None:
+                _pool = _ReadPool(DB_PATH)
+            pool = _pool
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+@contextmanager
+def _write_connection(touch_version: bool = True):
+    """Open a short-lived write connection; bumps the data version and notifies listeners if rows changed.
+    
+    Pass touch_version=False for writes that don't change the airport list (e.g. cached lookups).
+    """
+    with _write_lock:
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            yield conn
+            changed = touch_version and conn.total_changes > 0
+            if changed:
+                _touch_version(conn.cursor())
+            conn.commit()
+        finally:
+            conn.close()
+    if changed:
+        _notify_reload()
+
+
+def get_database_version() -> str:
+    """Get the version stamp of the live airport data"""
+    init_database()
+    with _read_connection() as conn:
+        return _get_metadata(conn.cursor(), "version") or "0"
 
 
 def download_airports_data():
     """Download comprehensive airport data from OurAirports (public database)"""
-    print("📥 [AIRPORT-DB] Downloading airport data from OurAirports...")
+    logger.info("📥 [AIRPORT-DB] Downloading airport data from OurAirports...")
     
     try:
         # OurAirports provides comprehensive airport data
         # URL: https://ourairports.com/data/airports.csv
         url = "https://davidmegginson.github.io/ourairports-data/airports.csv"
         
-        print(f"🌐 [AIRPORT-DB] Fetching data from {url}...")
+        logger.debug("🌐 [AIRPORT-DB] Fetching data from {}...", url)
         with urllib.request.urlopen(url, timeout=30) as response:
             data = response.read().decode('utf-8')
         
-        print(f"✅ [AIRPORT-DB] Downloaded {len(data)} bytes of airport data")
+        logger.info("✅ [AIRPORT-DB] Downloaded {} bytes of airport data", len(data))
         return data, "ourairports"
     
     except Exception as e:
-        print(f"⚠️ [AIRPORT-DB] Failed to download from OurAirports: {e}")
-        print("📥 [AIRPORT-DB] Trying alternative source: OpenFlights...")
+        logger.warning("⚠️ [AIRPORT-DB] Failed to download from OurAirports: {}", e)
+        logger.info("📥 [AIRPORT-DB] Trying alternative source: OpenFlights...")
         
         try:
             # Alternative: OpenFlights airport database
             url = "https://raw.githubusercontent.com/jpatokal/openflights/master/data/airports.dat"
             
-            print("🌐 [AIRPORT-DB] Fetching data from OpenFlights...")
+            logger.debug("🌐 [AIRPORT-DB] Fetching data from OpenFlights...")
             with urllib.request.urlopen(url, timeout=30) as response:
                 data = response.read().decode('utf-8')
             
-            print("✅ [AIRPORT-DB] Downloaded OpenFlights data")
+            logger.info("✅ [AIRPORT-DB] Downloaded OpenFlights data")
             return data, "openflights"
         
         except Exception as e2:
-            print(f"❌ [AIRPORT-DB] Failed to download from both sources: {e2}")
+            logger.error("❌ [AIRPORT-DB] Failed to download from both sources: {}", e2)
             return None, None
 
 
@@ -117,6 +355,9 @@ def parse_ourairports_csv(csv_data: str):
         # Only include airports with IATA codes (3-letter codes)
         if not iata_code or len(iata_code) != 3:
             continue
+        # Closed airports keep their codes in OurAirports but can't be flown to
+        if row.get('type', '') == 'closed':
+            continue
         
         name = row.get('name', '').strip()
         city = row.get('municipality', '').strip()
@@ -143,7 +384,9 @@ def parse_ourairports_csv(csv_data: str):
             country_code,
             latitude,
             longitude,
-            timezone
+            timezone,
+            row.get('type', '').strip() or None,
+            row.get('scheduled_service', '').strip() or None
         ))
     
     return airports
@@ -193,6 +436,7 @@ def parse_openflights_csv(csv_data: str):
         
         timezone = (row[9] if len(row) > 9 else '') or timezone_map.get(country_code, '')
         
+        # OpenFlights has no airport type or scheduled service flag
         airports.append((
             iata_code,
             name,
@@ -201,12 +445,57 @@ def parse_openflights_csv(csv_data: str):
             country_code,
             latitude,
             longitude,
-            timezone
+            timezone,
+            None,
+            None
         ))
     
     return airports
 
 
+def download_gazetteer_data() -> Optional[str]:
+    """Read the GeoNames cities file from GAZETTEER_PATH, or download it from GeoNames"""
+    if os.path.exists(GAZETTEER_PATH):
+        logger.info("📂 [AIRPORT-DB] Loading gazetteer from {}", GAZETTEER_PATH)
+        with open(GAZETTEER_PATH, 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    try:
+        logger.debug("🌐 [AIRPORT-DB] Fetching gazetteer from {}...", GAZETTEER_URL)
+        with urllib.request.urlopen(GAZETTEER_URL, timeout=60) as response:
+            archive = zipfile.ZipFile(io.BytesIO(response.read()))
+        data = archive.read(archive.namelist()[0]).decode('utf-8')
+        logger.info("✅ [AIRPORT-DB] Downloaded {} bytes of gazetteer data", len(data))
+        return data
+    except Exception as e:
+        logger.warning("⚠️ [AIRPORT-DB] Failed to download gazetteer: {}", e)
+        return None
+
+
+def parse_geonames_cities(data: str) -> List[tuple]:
+    """Parse GeoNames tab-separated cities into (name, country_code, latitude, longitude, population) rows.
+    
+    The name, ASCII name and ASCII alternate names (e.g. "bombay") each get a row, lower-cased.
+    """
+    cities = []
+    for line in data.splitlines():
+        fields = line.split('\t')
+        if len(fields) < 15:
+            continue
+        try:
+            latitude, longitude = float(fields[4]), float(fields[5])
+            population = int(fields[14] or 0)
+        except ValueError:
+            continue
+        
+        names = {fields[1].lower(), fields[2].lower()}
+        names.update(alt.lower() for alt in fields[3].split(',') if alt.isascii() and len(alt) > 2)
+        for name in names:
+            if name:
+                cities.append((name, fields[8], latitude, longitude, population))
+    return cities
+
+
 def get_popular_international_airports():
     """Get list of popular international tourist destination airports worldwide"""
     return [
@@ -737,169 +1026,284 @@ def get_popular_indian_airports():
     ]
 
 
-def populate_from_csv(csv_path: str = None):
-    """Populate database from CSV file or download from public source"""
-    init_database()
-    
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Check if data already exists
-    cursor.execute("SELECT COUNT(*) FROM airports")
-    count = cursor.fetchone()[0]
-    
-    if count > 100:
-        print(f"✅ [AIRPORT-DB] Database already has {count} airports")
-        # Still ensure popular airports are present even if database exists
-        print("🔍 [AIRPORT-DB] Ensuring popular airports are present...")
-        
-        # Ensure popular international airports are present
-        popular_international = get_popular_international_airports()
-        cursor.executemany("""
-            INSERT OR IGNORE INTO airports (code, name, city, country, country_code, latitude, longitude, timezone)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, popular_international)
-        conn.commit()
-        international_count = cursor.rowcount
-        if international_count > 0:
-            print(f"✅ [AIRPORT-DB] Added {international_count} popular international airports")
-        
-        # Ensure popular Indian airports are present
-        popular_indian = get_popular_indian_airports()
-        cursor.executemany("""
-            INSERT OR IGNORE INTO airports (code, name, city, country, country_code, latitude, longitude, timezone)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, popular_indian)
-        conn.commit()
-        indian_count = cursor.rowcount
-        if indian_count > 0:
-            print(f"✅ [AIRPORT-DB] Added {indian_count} popular Indian airports")
-        
-        # Update counts
-        cursor.execute("SELECT COUNT(*) FROM airports")
-        final_count = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM airports WHERE country_code = 'IN'")
-        india_count = cursor.fetchone()[0]
-        print(f"📊 [AIRPORT-DB] Final: {final_count} total airports, {india_count} Indian airports")
-        
-        # If database has too many airports, it needs cleanup (will be done by delete_unpopular_airports in lifespan)
-        if final_count > 200:
-            print(f"⚠️ [AIRPORT-DB] Database has {final_count} airports - cleanup needed (will be cleaned on startup)")
-        
-        conn.close()
-        return
+def get_curated_airports() -> List[tuple]:
+    """Get the curated popular airports as (airport_row, tier) pairs, deduplicated by IATA code"""
+    curated = (
+        [(airport, TIER_POPULAR) for airport in get_popular_international_airports()] +
+        [(airport, TIER_POPULAR_INDIA) for airport in get_popular_indian_airports()]
+    )
+    
+    # A code listed on both lists keeps its highest tier; within a tier the first entry wins
+    # (e.g. VTZ as Visakhapatnam and Vizag)
+    by_code = {}
+    for airport, tier in curated:
+        code = airport[0]
+        if code and (code not in by_code or tier > by_code[code][1]):
+            by_code[code] = (airport, tier)
+    return list(by_code.values())
+
+
+def _upsert_curated_airports(cursor) -> int:
+    """Insert missing curated airports and (re)apply the curated tiers - returns number of rows inserted"""
+    curated = get_curated_airports()
     
-    airports = []
+    cursor.executemany("""
+        INSERT OR IGNORE INTO airports (code, name, city, country, country_code, latitude, longitude, timezone, tier)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(*airport, tier) for airport, tier in curated])
+    inserted = max(cursor.rowcount, 0)
+    
+    # Airports dropped from the curated lists fall back to the standard tier
+    codes = [airport[0] for airport, _ in curated]
+    placeholders = ','.join(['?' for _ in codes])
+    cursor.execute(f"""
+        UPDATE airports SET tier = {TIER_STANDARD}
+        WHERE tier != {TIER_STANDARD} AND code NOT IN ({placeholders})
+    """, codes)
     
+    cursor.executemany("""
+        UPDATE airports SET tier = ? WHERE code = ? AND tier != ?
+    """, [(tier, airport[0], tier) for airport, tier in curated])
+    return inserted
+
+
+def _insert_all_airports(cursor, airports: List[tuple]) -> int:
+    """Insert parsed airport rows at the standard tier, keeping existing rows - returns number inserted"""
+    cursor.executemany(f"""
+        INSERT OR IGNORE INTO airports (code, name, city, country, country_code, latitude, longitude, timezone,
+                                        airport_type, scheduled_service, tier)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {TIER_STANDARD})
+    """, airports)
+    inserted = max(cursor.rowcount, 0)
+    # Curated rows went in first; give them the downloaded type too
+    cursor.executemany("""
+        UPDATE airports SET airport_type = ?, scheduled_service = ? WHERE code = ? AND airport_type IS NULL
+    """, [(airport[8], airport[9], airport[0]) for airport in airports if airport[8]])
+    return inserted
+
+
+def _load_airport_rows(csv_path: str = None) -> List[tuple]:
+    """Parse airports from a local OurAirports CSV, or download them from a public source"""
     # If CSV path provided, use it
     if csv_path and os.path.exists(csv_path):
-        print(f"📂 [AIRPORT-DB] Loading airports from local CSV: {csv_path}")
+        logger.info("📂 [AIRPORT-DB] Loading airports from local CSV: {}", csv_path)
         with open(csv_path, 'r', encoding='utf-8') as f:
             data = f.read()
-        airports = parse_ourairports_csv(data)
+        return parse_ourairports_csv(data)
     
     # Otherwise, download from public source
-    else:
-        print("🌐 [AIRPORT-DB] No local CSV found, downloading from public source...")
-        csv_data, source = download_airports_data()
-        
-        if csv_data:
-            if source == "openflights":
-                airports = parse_openflights_csv(csv_data)
-            else:
-                airports = parse_ourairports_csv(csv_data)
-        else:
-            print("❌ [AIRPORT-DB] Failed to download airport data")
-            conn.close()
-            return
-    
-    if not airports:
-        print("⚠️ [AIRPORT-DB] No airports found in data, using only popular airports")
-        airports = []
-    
-    # For fresh database, ONLY add popular tourist destination airports
-    # Don't add all downloaded airports - only popular ones to keep database clean
-    print("🎯 [AIRPORT-DB] Fresh database - adding ONLY popular tourist destination airports")
-    
-    popular_international = get_popular_international_airports()
-    popular_indian = get_popular_indian_airports()
-    
-    # Combine all popular airports - ignore downloaded data, only use curated list
-    all_popular_airports = popular_international + popular_indian
+    logger.debug("🌐 [AIRPORT-DB] No local CSV found, downloading from public source...")
+    csv_data, source = download_airports_data()
+    if not csv_data:
+        logger.error("❌ [AIRPORT-DB] Failed to download airport data")
+        return []
+    if source == "openflights":
+        return parse_openflights_csv(csv_data)
+    return parse_ourairports_csv(csv_data)
+
+
+def build_database_file(path: str, airports: List[tuple], cities: Optional[List[tuple]] = None) -> int:
+    """Build a complete airport database at path (never the live file) - returns the airport count"""
+    if os.path.exists(path):
+        os.remove(path)
     
-    # Remove duplicates based on IATA code
-    seen_codes = set()
-    unique_airports = []
-    for airport in all_popular_airports:
-        code = airport[0]
-        if code and code not in seen_codes:
-            seen_codes.add(code)
-            unique_airports.append(airport)
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    _create_schema(cursor)
     
-    print(f"📊 [AIRPORT-DB] Will add {len(unique_airports)} popular tourist destination airports only")
-    print(f"   International: {len(popular_international)}, Indian: {len(popular_indian)}")
-    print(f"   (Skipping {len(airports)} downloaded airports - only keeping popular ones)")
+    # Curated rows go in first so their names win over the downloaded ones
+    _upsert_curated_airports(cursor)
+    _insert_all_airports(cursor, airports)
+    if cities:
+        cursor.executemany("""
+            INSERT INTO cities (name, country_code, latitude, longitude, population)
+            VALUES (?, ?, ?, ?, ?)
+        """, cities)
+    
+    # Keep the previous gazetteer when this refresh couldn't fetch one (runtime data is copied at swap time)
+    if not cities and os.path.exists(DB_PATH):
+        cursor.execute("ATTACH DATABASE ? AS live", (os.path.abspath(DB_PATH),))
+        cursor.execute("SELECT COUNT(*) FROM live.sqlite_master WHERE type = 'table' AND name = 'cities'")
+        if cursor.fetchone()[0]:
+            cursor.execute("INSERT INTO cities SELECT * FROM live.cities")
+        conn.commit()
+        cursor.execute("DETACH DATABASE live")
     
-    # Insert only popular airports
-    cursor.executemany("""
-        INSERT OR IGNORE INTO airports (code, name, city, country, country_code, latitude, longitude, timezone)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, unique_airports)
-    inserted = cursor.rowcount
+    _set_metadata(cursor, "dataset", "full")
+    _set_metadata(cursor, "built_at", str(int(time.time())))
+    _touch_version(cursor)
     conn.commit()
-    print(f"📝 [AIRPORT-DB] Inserted {inserted} popular airports")
     
-    # Get final count
     cursor.execute("SELECT COUNT(*) FROM airports")
-    final_count = cursor.fetchone()[0]
-    
-    # Check India airport count
-    cursor.execute("SELECT COUNT(*) FROM airports WHERE country_code = 'IN'")
-    india_count = cursor.fetchone()[0]
-    print(f"📊 [AIRPORT-DB] Total airports: {final_count}, Indian airports: {india_count}")
-    
+    count = cursor.fetchone()[0]
     conn.close()
-    print(f"✅ [AIRPORT-DB] Successfully populated {final_count} airports into database")
+    return count
 
 
-def ensure_popular_airports():
-    """Ensure popular airports are always in the database (can be called anytime)"""
-    init_database()
-    
-    conn = sqlite3.connect(DB_PATH)
+def validate_database_file(path: str) -> bool:
+    """Check a rebuilt database is intact, large enough and holds every curated airport"""
+    try:
+        with closing(sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("PRAGMA integrity_check")
+            integrity = cursor.fetchone()[0]
+            if integrity != "ok":
+                logger.error("❌ [AIRPORT-DB] Integrity check failed for {}: {}", path, integrity)
+                return False
+            
+            cursor.execute("SELECT COUNT(*) FROM airports")
+            count = cursor.fetchone()[0]
+            if count < MIN_AIRPORTS_FOR_SWAP:
+                logger.error("❌ [AIRPORT-DB] Rebuilt database has only {} airports (need {})", count, MIN_AIRPORTS_FOR_SWAP)
+                return False
+            
+            curated_codes = [airport[0] for airport, _ in get_curated_airports()]
+            placeholders = ','.join(['?' for _ in curated_codes])
+            cursor.execute(f"SELECT COUNT(*) FROM airports WHERE tier > {TIER_STANDARD} AND code IN ({placeholders})", curated_codes)
+            curated_count = cursor.fetchone()[0]
+            if curated_count != len(curated_codes):
+                logger.error("❌ [AIRPORT-DB] Rebuilt database is missing {} curated airports", len(curated_codes) - curated_count)
+                return False
+            
+            return True
+    except sqlite3.Error as e:
+        logger.error("❌ [AIRPORT-DB] Could not validate {}: {}", path, e)
+        return False
+
+
+def _carry_over_runtime_data(conn: sqlite3.Connection):
+    """Copy data written at runtime from the live database into a rebuilt one (call under _write_lock)"""
+    if not os.path.exists(DB_PATH):
+        return
     cursor = conn.cursor()
+    cursor.execute("ATTACH DATABASE ? AS live", (os.path.abspath(DB_PATH),))
+    # Airports the live database has but the download lacks (e.g. added from CSV at runtime)
+    cursor.execute(f"""
+        INSERT OR IGNORE INTO airports (code, name, city, country, country_code, latitude, longitude, timezone,
+                                        airport_type, scheduled_service, tier)
+        SELECT code, name, city, country, country_code, latitude, longitude, timezone,
+               airport_type, scheduled_service, {TIER_STANDARD} FROM live.airports
+    """)
+    # Resolved aliases are runtime data, not part of the download
+    cursor.execute("INSERT OR REPLACE INTO resolved_aliases SELECT * FROM live.resolved_aliases WHERE expires_at > ?",
+                   (int(time.time()),))
+    conn.commit()
+    cursor.execute("DETACH DATABASE live")
+
+
+def swap_database(new_path: str):
+    """Copy the database at new_path over the live one in a single write transaction.
+    
+    The live file is not renamed: in WAL mode its -wal/-shm files would then belong to the wrong file.
+    Readers keep their snapshot until the copy commits and pick up the new data on their next query.
+    """
+    with _write_lock:
+        with closing(sqlite3.connect(new_path)) as new_conn, closing(sqlite3.connect(DB_PATH)) as live_conn:
+            live_conn.execute("PRAGMA journal_mode=WAL")
+            # Under the write lock, so nothing written to the live file before the copy can be lost
+            _carry_over_runtime_data(new_conn)
+            new_conn.backup(live_conn)
+            # Best effort: fold the copy back into the main file so the WAL doesn't stay at full size
+            live_conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    logger.info("🔄 [AIRPORT-DB] Swapped in rebuilt database at {}", DB_PATH)
+    _notify_reload()
+
+
+def refresh_airport_database(csv_path: str = None) -> Optional[int]:
+    """Download and build a new database beside the live one, validate it, then swap it in.
     
-    added_count = 0
+    Returns the new airport count, or None if the refresh was skipped or failed (live data is untouched).
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        logger.debug("⏳ [AIRPORT-DB] Refresh already running, skipping")
+        return None
     
-    # Add popular international airports
-    popular_international = get_popular_international_airports()
-    cursor.executemany("""
-        INSERT OR IGNORE INTO airports (code, name, city, country, country_code, latitude, longitude, timezone)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, popular_international)
-    conn.commit()
-    international_count = cursor.rowcount
-    added_count += international_count
+    build_path = f"{DB_PATH}.{os.getpid()}.building"
+    try:
+        started = time.perf_counter()
+        airports = _load_airport_rows(csv_path)
+        if not airports:
+            logger.warning("⚠️ [AIRPORT-DB] No airports found in data, keeping current database")
+            return None
+        
+        gazetteer = download_gazetteer_data()
+        cities = parse_geonames_cities(gazetteer) if gazetteer else []
+        
+        count = build_database_file(build_path, airports, cities)
+        logger.debug("📝 [AIRPORT-DB] Built {} airports into {}", count, build_path)
+        if not validate_database_file(build_path):
+            return None
+        
+        swap_database(build_path)
+        logger.info("✅ [AIRPORT-DB] Refresh complete: {} airports in {:.1f}s", count, time.perf_counter() - started)
+        return count
+    except Exception as e:
+        logger.error("❌ [AIRPORT-DB] Refresh failed: {}", e)
+        return None
+    finally:
+        if os.path.exists(build_path):
+            os.remove(build_path)
+        _refresh_lock.release()
+
+
+def needs_refresh(max_age_seconds: float) -> bool:
+    """Whether the live database lacks the full dataset or is older than max_age_seconds"""
+    init_database()
+    with _read_connection() as conn:
+        cursor = conn.cursor()
+        if _get_metadata(cursor, "dataset") != "full":
+            return True
+        built_at = _get_metadata(cursor, "built_at")
+    return built_at is None or time.time() - int(built_at) > max_age_seconds
+
+
+async def airport_refresh_loop(interval_seconds: float):
+    """Background task: refresh airport data in a worker thread whenever it is missing or stale"""
+    while True:
+        try:
+            if needs_refresh(interval_seconds):
+                await asyncio.to_thread(refresh_airport_database)
+        except Exception as e:
+            logger.error("❌ [AIRPORT-DB] Background refresh error: {}", e)
+        await asyncio.sleep(interval_seconds)
+
+
+def populate_from_csv(csv_path: str = None):
+    """Populate database with every IATA airport from a CSV file or public source, ranking curated ones first"""
+    init_database()
     
-    # Add popular Indian airports
-    popular_indian = get_popular_indian_airports()
-    cursor.executemany("""
-        INSERT OR IGNORE INTO airports (code, name, city, country, country_code, latitude, longitude, timezone)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, popular_indian)
-    conn.commit()
-    indian_count = cursor.rowcount
-    added_count += indian_count
+    with _read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM airports")
+        count = cursor.fetchone()[0]
+        dataset = _get_metadata(cursor, "dataset")
     
-    # Get final counts
-    cursor.execute("SELECT COUNT(*) FROM airports")
-    total_count = cursor.fetchone()[0]
-    cursor.execute("SELECT COUNT(*) FROM airports WHERE country_code = 'IN'")
-    india_count = cursor.fetchone()[0]
+    # Bulk loads are built beside the live database and swapped in, never written into it
+    if count <= 100 or dataset != "full":
+        refresh_airport_database(csv_path)
+    else:
+        logger.info("✅ [AIRPORT-DB] Database already has {} airports", count)
     
-    conn.close()
+    # Still ensure popular airports are present and ranked even if the refresh failed
+    ensure_popular_airports()
+
+
+def ensure_popular_airports():
+    """Ensure popular airports are always in the database and ranked as curated (can be called anytime)"""
+    init_database()
+    
+    with _write_connection() as conn:
+        cursor = conn.cursor()
+        added_count = _upsert_curated_airports(cursor)
+        
+        # Get final counts
+        cursor.execute("SELECT COUNT(*) FROM airports")
+        total_count = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM airports WHERE country_code = 'IN'")
+        india_count = cursor.fetchone()[0]
     
-    print(f"✅ [AIRPORT-DB] Popular airports check complete - Added: {added_count}, Total: {total_count}, Indian: {india_count}")
+    logger.info("✅ [AIRPORT-DB] Popular airports check complete - Added: {}, Total: {}, Indian: {}", added_count, total_count, india_count)
     return added_count, total_count, india_count
 
 
@@ -988,14 +1392,155 @@ def get_city_aliases():
     }
 
 
-def get_airports(search_term: Optional[str] = None, limit: int = 500) -> List[Dict]:
-    """Get airports from database with optional search - prioritizes Indian airports and handles city aliases"""
+def get_alias_index() -> FuzzyIndex:
+    """Fuzzy index over the city aliases, built once per process"""
+    global _alias_index
+    if _alias_index is None:
+        _alias_index = FuzzyIndex(get_city_aliases())
+    return _alias_index
+
+
+def _reset_geo_index():
+    global _geo_index, _all_geo_index
+    _geo_index = None
+    _all_geo_index = None
+
+
+# Airports a traveller can fly into: scheduled medium/large airports. Rows without a type
+# (curated, OpenFlights, runtime CSV) are kept - they were listed as commercial airports already.
+_COMMERCIAL_AIRPORT_FILTER = """
+    AND (airport_type IS NULL
+         OR (airport_type IN ('large_airport', 'medium_airport') AND scheduled_service = 'yes'))
+"""
+
+
+def get_geo_index(commercial_only: bool = True) -> GeoIndex:
+    """Spatial index over airports with coordinates, rebuilt lazily after the database changes.
+    
+    commercial_only leaves out heliports, airstrips and airports without scheduled service.
+    """
+    global _geo_index, _all_geo_index
+    index = _geo_index if commercial_only else _all_geo_index
+    if index is None:
+        init_database()
+        with _read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT code, name, city, country, country_code, tier, latitude, longitude
+                FROM airports
+                WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+                {_COMMERCIAL_AIRPORT_FILTER if commercial_only else ''}
+            """)
+            rows = cursor.fetchall()
+        index = GeoIndex([(row['latitude'], row['longitude'], dict(row)) for row in rows])
+        if commercial_only:
+            _geo_index = index
+        else:
+            _all_geo_index = index
+        logger.info("🗺️ [AIRPORT-DB] Built {} spatial index over {} airports",
+                    "commercial" if commercial_only else "full", len(index))
+    return index
+
+
+add_reload_listener(_reset_geo_index)
+
+
+def find_nearest_airports(latitude: float, longitude: float, limit: int = 3,
+                          max_km: float = MAX_NEAREST_AIRPORT_KM) -> List[Dict]:
+    """Nearest commercial airports to a coordinate, nearest first, each with a distance_km.
+    
+    Falls back to any airport only when no commercial airport is within max_km.
+    """
+    nearest = get_geo_index().nearest(latitude, longitude, k=limit, max_km=max_km)
+    if not nearest:
+        nearest = get_geo_index(commercial_only=False).nearest(latitude, longitude, k=limit, max_km=max_km)
+    results = []
+    for distance, airport in nearest:
+        result = {key: value for key, value in airport.items() if key not in ('latitude', 'longitude')}
+        result['distance_km'] = round(distance, 1)
+        results.append(result)
+    return results
+
+
+def find_airports_near_city(city_name: str, limit: int = 3) -> List[Dict]:
+    """Resolve a city through the offline gazetteer and return its nearest airports.
+    
+    Returns an empty list when the gazetteer doesn't know the city, so callers can fall back to grounding.
+    """
     init_database()
+    with _read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT latitude, longitude, country_code
+            FROM cities
+            WHERE name = ?
+            ORDER BY population DESC
+            LIMIT 1
+        """, (city_name.lower().strip(),))
+        city = cursor.fetchone()
+    
+    if not city:
+        return []
+    
+    airports = find_nearest_airports(city['latitude'], city['longitude'], limit=limit)
+    for airport in airports:
+        airport['name'] = f"{airport['name']} (nearest to {city_name}, {airport['distance_km']:.0f} km)"
+    if airports:
+        logger.info("🗺️ [AIRPORT-DB] Gazetteer resolved '{}' → {}", city_name, ', '.join(a['code'] for a in airports))
+    return airports
+
+
+def get_resolved_alias(term: str) -> Optional[Dict]:
+    """Look up an unexpired resolved alias for a search term.
     
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    Returns None on a miss, otherwise a dict whose 'airport' is None for a negative entry.
+    """
+    init_database()
+    with _read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT code, name, city, country, country_code, source, resolved_at
+            FROM resolved_aliases
+            WHERE term = ? AND expires_at > ?
+        """, (term.lower().strip(), int(time.time())))
+        row = cursor.fetchone()
+    
+    if not row:
+        return None
+    airport = None
+    if row['code']:
+        airport = {key: row[key] for key in ('code', 'name', 'city', 'country', 'country_code')}
+    return {'airport': airport, 'source': row['source'], 'resolved_at': row['resolved_at']}
+
+
+def save_resolved_alias(term: str, airport: Optional[Dict], source: str, ttl_seconds: int):
+    """Persist how a search term was resolved (airport None caches the failure) for ttl_seconds"""
+    init_database()
+    now = int(time.time())
+    airport = airport or {}
+    # Aliases are not part of the listings or the autocomplete tables, so this write triggers no reload
+    with _write_connection(touch_version=False) as conn:
+        conn.execute("DELETE FROM resolved_aliases WHERE expires_at <= ?", (now,))
+        conn.execute("""
+            INSERT OR REPLACE INTO resolved_aliases
+                (term, code, name, city, country, country_code, source, resolved_at, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            term.lower().strip(), airport.get('code'), airport.get('name'), airport.get('city'),
+            airport.get('country'), airport.get('country_code'), source, now, now + ttl_seconds
+        ))
+
+
+def get_airports(search_term: Optional[str] = None, limit: int = 500) -> List[Dict]:
+    """Get airports from database with optional search - ranks curated tiers first and handles city aliases"""
+    init_database()
     
+    with _read_connection() as conn:
+        return _search_airports(conn.cursor(), search_term, limit)
+
+
+def _search_airports(cursor, search_term: Optional[str], limit: int) -> List[Dict]:
+    """Run the exact alias, SQL and (as a last resort) fuzzy alias search strategies on a read cursor"""
     if search_term:
         # Case-insensitive search with improved matching
         search_term_upper = search_term.upper().strip()
@@ -1008,9 +1553,9 @@ def get_airports(search_term: Optional[str] = None, limit: int = 500) -> List[Di
         # Strategy 1: Exact alias match
         if search_term_lower in city_aliases:
             airport_code = city_aliases[search_term_lower]
-            print(f"🔍 [AIRPORT-DB] Found exact city alias: '{search_term}' → {airport_code}")
+            logger.debug("🔍 [AIRPORT-DB] Found exact city alias: '{}' → {}", search_term, airport_code)
             cursor.execute("""
-                SELECT code, name, city, country, country_code
+                SELECT code, name, city, country, country_code, tier
                 FROM airports
                 WHERE code = ?
                 LIMIT 1
@@ -1019,297 +1564,178 @@ def get_airports(search_term: Optional[str] = None, limit: int = 500) -> List[Di
             if row:
                 result = dict(row)
                 result['name'] = f"{result['name']} (nearest to {search_term})"
-                conn.close()
                 return [result]
         
-        # Strategy 2: Fuzzy alias match (for typos like "amala" → "ambala", "munar" → "munnar")
-        # First, apply common typo corrections
-        typo_corrections = {
-            'i': 'y',  # ooti → ooty
-            'y': 'i',
-            'ei': 'ee',
-            'ee': 'ei',
-        }
-        search_variants = [search_term_lower]
-        # Create variants with common typo fixes
-        for old, new in typo_corrections.items():
-            if old in search_term_lower:
-                variant = search_term_lower.replace(old, new)
-                search_variants.append(variant)
-        
-        # Use simple edit distance / character similarity
-        if len(search_term_lower) >= 3:
-            best_match = None
-            best_score = 0
-            
-            for alias_city, airport_code in city_aliases.items():
-                # Quick filter: must be within reasonable length difference
-                len_diff = abs(len(search_term_lower) - len(alias_city))
-                # Be more lenient for very short names (4 chars or less)
-                max_len_diff = 1 if min(len(search_term_lower), len(alias_city)) <= 4 else 2
-                if len_diff > max_len_diff:
-                    continue
-                
-                # Calculate similarity using common character ratio
-                # Check if any search variant matches exactly
-                if alias_city in search_variants:
-                    similarity = 1.0  # Perfect match via typo correction
-                # Check if search term is substring
-                elif search_term_lower in alias_city or alias_city in search_term_lower:
-                    similarity = 0.9  # High score for substring matches
-                else:
-                    # Calculate character overlap
-                    search_chars = set(search_term_lower)
-                    alias_chars = set(alias_city)
-                    common_chars = search_chars & alias_chars
-                    total_chars = search_chars | alias_chars
-                    similarity = len(common_chars) / len(total_chars) if total_chars else 0
-                
-                # Bonus for matching prefix (first 3 characters)
-                if len(search_term_lower) >= 3 and len(alias_city) >= 3:
-                    if search_term_lower[:3] == alias_city[:3]:
-                        similarity += 0.2
-                
-                # Track best match
-                if similarity > best_score and similarity >= 0.75:  # 75% threshold
-                    best_score = similarity
-                    best_match = (alias_city, airport_code)
-            
-            # If we found a good fuzzy match, use it
-            if best_match:
-                alias_city, airport_code = best_match
-                print(f"🔍 [AIRPORT-DB] Found fuzzy city alias match: '{search_term}' ≈ '{alias_city}' (similarity: {best_score:.2f}) → {airport_code}")
-                cursor.execute("""
-                    SELECT code, name, city, country, country_code
-                    FROM airports
-                    WHERE code = ?
-                    LIMIT 1
-                """, (airport_code,))
-                row = cursor.fetchone()
-                if row:
-                    result = dict(row)
-                    result['name'] = f"{result['name']} (nearest to {alias_city})"
-                    conn.close()
-                    return [result]
-        
-        # Get popular Indian airport codes for prioritization
-        popular_indian = get_popular_indian_airports()
-        indian_codes = [airport[0] for airport in popular_indian]
-        
-        # Build SQL query safely - handle empty indian_codes
-        if indian_codes:
-            in_clause = ','.join(['?' for _ in indian_codes])
-            sql_query = f"""
-                SELECT code, name, city, country, country_code
-                FROM airports
-                WHERE 
-                    UPPER(code) LIKE ? OR 
-                    UPPER(name) LIKE ? OR 
-                    UPPER(city) LIKE ? OR
-                    UPPER(country) LIKE ? OR
-                    code = ?
-                ORDER BY 
-                    CASE 
-                        WHEN code = ? THEN 1
-                        WHEN code IN ({in_clause}) THEN 2
-                        WHEN country_code = 'IN' THEN 3
-                        WHEN UPPER(code) LIKE ? THEN 4
-                        WHEN UPPER(name) LIKE ? THEN 5
-                        WHEN UPPER(city) LIKE ? THEN 6
-                        ELSE 7
-                    END,
-                    CASE 
-                        WHEN country_code = 'IN' THEN 1
-                        ELSE 2
-                    END,
-                    name
-                LIMIT ?
-            """
-            params = (
-                search_pattern, search_pattern, search_pattern, search_pattern, search_term_upper,
-                search_term_upper,
-                *indian_codes,
-                f"{search_term_upper}%",
-                f"%{search_term_upper}%",
-                f"%{search_term_upper}%",
-                limit
-            )
-        else:
-            # Fallback if no Indian codes available
-            sql_query = """
-                SELECT code, name, city, country, country_code
-                FROM airports
-                WHERE 
-                    UPPER(code) LIKE ? OR 
-                    UPPER(name) LIKE ? OR 
-                    UPPER(city) LIKE ? OR
-                    UPPER(country) LIKE ? OR
-                    code = ?
-                ORDER BY 
-                    CASE 
-                        WHEN code = ? THEN 1
-                        WHEN country_code = 'IN' THEN 2
-                        WHEN UPPER(code) LIKE ? THEN 3
-                        WHEN UPPER(name) LIKE ? THEN 4
-                        WHEN UPPER(city) LIKE ? THEN 5
-                        ELSE 6
-                    END,
-                    CASE 
-                        WHEN country_code = 'IN' THEN 1
-                        ELSE 2
-                    END,
-                    name
-                LIMIT ?
-            """
-            params = (
-                search_pattern, search_pattern, search_pattern, search_pattern, search_term_upper,
-                search_term_upper,
-                f"{search_term_upper}%",
-                f"%{search_term_upper}%",
-                f"%{search_term_upper}%",
-                limit
-            )
+        # Strategy 2: SQL search over code, name, city and country.
+        # Curated tiers rank first (popular Indian, then popular international), then match quality
+        sql_query = """
+            SELECT code, name, city, country, country_code, tier
+            FROM airports
+            WHERE 
+                UPPER(code) LIKE ? OR 
+                UPPER(name) LIKE ? OR 
+                UPPER(city) LIKE ? OR
+                UPPER(country) LIKE ? OR
+                code = ?
+            ORDER BY 
+                CASE WHEN code = ? THEN 1 ELSE 2 END,
+                tier DESC,
+                CASE 
+                    WHEN country_code = 'IN' THEN 1
+                    ELSE 2
+                END,
+                CASE 
+                    WHEN UPPER(code) LIKE ? THEN 1
+                    WHEN UPPER(name) LIKE ? THEN 2
+                    WHEN UPPER(city) LIKE ? THEN 3
+                    ELSE 4
+                END,
+                name
+            LIMIT ?
+        """
+        params = (
+            search_pattern, search_pattern, search_pattern, search_pattern, search_term_upper,
+            search_term_upper,
+            f"{search_term_upper}%",
+            f"%{search_term_upper}%",
+            f"%{search_term_upper}%",
+            limit
+        )
         
         cursor.execute(sql_query, params)
-    else:
-        # When no search term, prioritize Indian airports
-        popular_indian = get_popular_indian_airports()
-        indian_codes = [airport[0] for airport in popular_indian]
-        
-        # Build SQL query safely - handle empty indian_codes
-        if indian_codes:
-            in_clause = ','.join(['?' for _ in indian_codes])
-            sql_query = f"""
-                SELECT code, name, city, country, country_code
-                FROM airports
-                ORDER BY 
-                    CASE 
-                        WHEN code IN ({in_clause}) THEN 1
-                        WHEN country_code = 'IN' THEN 2
-                        ELSE 3
-                    END,
-                    name
-                LIMIT ?
-            """
-            params = (*indian_codes, limit)
-        else:
-            # Fallback if no Indian codes available
-            sql_query = """
-                SELECT code, name, city, country, country_code
+        rows = cursor.fetchall()
+        if rows:
+            return [dict(row) for row in rows]
+        
+        # Strategy 3: Fuzzy alias match via the prebuilt index, only when no real airport, city or country
+        # matched (typos like "amala" → "ambala", transpositions like "munanr" → "munnar", spellings like
+        # "darjiling" → "darjeeling") - so real names such as "Paris" never resolve to a look-alike alias
+        if len(search_term_lower) < 3:
+            return []
+        results = []
+        seen_codes = set()
+        for match in get_alias_index().search(search_term_lower, limit=limit):
+            if match.value in seen_codes:
+                continue
+            seen_codes.add(match.value)
+            cursor.execute("""
+                SELECT code, name, city, country, country_code, tier
                 FROM airports
-                ORDER BY 
-                    CASE 
-                        WHEN country_code = 'IN' THEN 1
-                        ELSE 2
-                    END,
-                    name
-                LIMIT ?
-            """
-            params = (limit,)
-        
-        cursor.execute(sql_query, params)
+                WHERE code = ?
+                LIMIT 1
+            """, (match.value,))
+            row = cursor.fetchone()
+            if row:
+                result = dict(row)
+                result['name'] = f"{result['name']} (nearest to {match.term})"
+                results.append(result)
+        
+        if results:
+            logger.opt(lazy=True).debug("🔍 [AIRPORT-DB] Found {} fuzzy city alias match(es) for '{}' → {}",
+                                        lambda: len(results), lambda: search_term,
+                                        lambda: ', '.join(r['code'] for r in results))
+        return results
+    else:
+        # When no search term, walk the tier index: curated airports first, then by name
+        cursor.execute("""
+            SELECT code, name, city, country, country_code, tier
+            FROM airports
+            ORDER BY tier DESC, name
+            LIMIT ?
+        """, (limit,))
     
     rows = cursor.fetchall()
-    airports = [dict(row) for row in rows]
-    
-    conn.close()
-    return airports
+    return [dict(row) for row in rows]
+
+
+def _invalidate_airport_list_blobs():
+    global _list_generation
+    _list_generation += 1
+    _stale_list_limits.update(_list_blobs)
+    _list_blobs.clear()
+
+
+def _rebuild_airport_list_blobs():
+    # Rebuild the listings that were being served so the next request doesn't pay for it
+    limits = list(_stale_list_limits)
+    _stale_list_limits.clear()
+    for limit in limits:
+        get_airport_list_blob(limit)
+
+
+add_reload_listener(_rebuild_airport_list_blobs)
+
+
+def get_airport_list_blob(limit: int) -> Tuple[str, bytes, bytes]:
+    """Unfiltered airport listing as a ready-to-send (etag, json body, gzipped body).
+    
+    Built once per database version and limit; the ETag is a hash of the body so it is strong.
+    """
+    blob = _list_blobs.get(limit)
+    if blob is not None:
+        return blob
+    
+    generation = _list_generation
+    airports = get_airports(limit=limit)
+    body = json.dumps({
+        "status": "success",
+        "message": f"Found {len(airports)} airports",
+        "airports": airports
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    blob = (f'"{hashlib.sha256(body).hexdigest()[:32]}"', body, gzip.compress(body, compresslevel=6))
+    
+    # Don't keep a listing built from data that was replaced while it was being built
+    if generation == _list_generation:
+        if len(_list_blobs) >= MAX_LIST_BLOBS:
+            _list_blobs.clear()
+        _list_blobs[limit] = blob
+        logger.debug("📦 [AIRPORT-DB] Cached airport list (limit {}): {} bytes, {} gzipped", limit, len(body), len(blob[2]))
+    return blob
 
 
 def get_airport_by_code(code: str) -> Optional[Dict]:
     """Get a specific airport by IATA code"""
     init_database()
     
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    with _read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT code, name, city, country, country_code, latitude, longitude, timezone
+            FROM airports
+            WHERE code = ?
+        """, (code.upper(),))
+        row = cursor.fetchone()
     
-    cursor.execute("""
-        SELECT code, name, city, country, country_code, latitude, longitude, timezone
-        FROM airports
-        WHERE code = ?
-    """, (code.upper(),))
-    
-    row = cursor.fetchone()
-    airport = dict(row) if row else None
-    
-    conn.close()
-    return airport
+    return dict(row) if row else None
 
 
-def delete_unpopular_airports():
-    """Delete ALL airports that are NOT tourist destinations - keep only popular international and Indian airports"""
+def refresh_airport_tiers() -> Dict[str, int]:
+    """Re-apply curated tiers without deleting anything - returns airport counts per tier"""
     init_database()
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Get ALL popular airport codes to keep (international + Indian)
-    popular_international = get_popular_international_airports()
-    popular_indian = get_popular_indian_airports()
-    
-    # Collect all codes to keep
-    popular_codes = set()
-    for airport in popular_international:
-        popular_codes.add(airport[0])  # code is first element
-    for airport in popular_indian:
-        popular_codes.add(airport[0])  # code is first element
-    
-    print(f"🔍 [AIRPORT-DB] Found {len(popular_codes)} popular tourist destination airports to keep")
-    print(f"   International: {len(popular_international)}, Indian: {len(popular_indian)}")
-    
-    # Get count before deletion
-    cursor.execute("SELECT COUNT(*) FROM airports")
-    total_before = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM airports WHERE country_code = 'US'")
-    usa_before = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM airports WHERE country_code = 'IN'")
-    india_before = cursor.fetchone()[0]
-    
-    # Delete ALL airports that are NOT in the popular list
-    if popular_codes:
-        placeholders = ','.join(['?' for _ in popular_codes])
-        cursor.execute(f"""
-            DELETE FROM airports 
-            WHERE code NOT IN ({placeholders})
-        """, list(popular_codes))
-        deleted_count = cursor.rowcount
-    else:
-        deleted_count = 0
-        print("⚠️ [AIRPORT-DB] No popular airports found, skipping deletion")
-    
-    conn.commit()
-    
-    # Get counts after deletion
-    cursor.execute("SELECT COUNT(*) FROM airports")
-    total_after = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM airports WHERE country_code = 'US'")
-    usa_after = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM airports WHERE country_code = 'IN'")
-    india_after = cursor.fetchone()[0]
-    
-    conn.close()
-    
-    print(f"✅ [AIRPORT-DB] Deleted {deleted_count} non-tourist airports")
-    print(f"📊 [AIRPORT-DB] Total airports: {total_before} → {total_after}")
-    print(f"📊 [AIRPORT-DB] USA airports: {usa_before} → {usa_after}")
-    print(f"📊 [AIRPORT-DB] Indian airports: {india_before} → {india_after}")
-    
-    return deleted_count
+    with _write_connection() as conn:
+        cursor = conn.cursor()
+        added = _upsert_curated_airports(cursor)
+        cursor.execute("SELECT tier, COUNT(*) FROM airports GROUP BY tier")
+        tier_counts = {tier: count for tier, count in cursor.fetchall()}
+    
+    counts = {
+        "added": added,
+        "popular_india": tier_counts.get(TIER_POPULAR_INDIA, 0),
+        "popular": tier_counts.get(TIER_POPULAR, 0),
+        "standard": tier_counts.get(TIER_STANDARD, 0),
+    }
+    counts["total"] = counts["popular_india"] + counts["popular"] + counts["standard"]
+    logger.info("✅ [AIRPORT-DB] Tiers refreshed - {}", counts)
+    return counts
 
 
 def add_airport_from_csv(csv_path: str):
     """Add airports from a CSV file"""
     init_database()
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    with open(csv_path, 'r', encoding='utf-8') as f:
+    with _write_connection() as conn, open(csv_path, 'r', encoding='utf-8') as f:
+        cursor = conn.cursor()
         reader = csv.DictReader(f)
         airports = []
         for row in reader:
@@ -1329,7 +1755,5 @@ def add_airport_from_csv(csv_path: str):
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """, airports)
     
-    conn.commit()
-    conn.close()
-    print(f"✅ [AIRPORT-DB] Added airports from {csv_path}")
+    logger.info("✅ [AIRPORT-DB] Added airports from {}", csv_path)
 
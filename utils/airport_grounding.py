@@ -2,16 +2,34 @@
 Airport Grounding Service
 Uses Google's Gemini Grounding to find airports near cities that aren't in the database
 """
-import google.generativeai as genai
 import os
 from typing import Optional, Dict, List
-import json
 import re
+import threading
+from concurrent.futures import Future
+from loguru import logger
+from utils.log import log_payload
+from utils.airport_db import get_resolved_alias, save_resolved_alias
+from utils.llm_cache import cached_generate, parse_json_reply
+from utils.llm_provider import get_llm_provider, llm_available
 
-# Configure Gemini API
-API_KEY = os.getenv("GOOGLE_API_KEY")
-if API_KEY:
-    genai.configure(api_key=API_KEY)
+
+# Grounded answers are kept for a month; failures are retried after a few minutes
+GROUNDING_CACHE_TTL_SECONDS = int(os.getenv("GROUNDING_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+GROUNDING_NEGATIVE_TTL_SECONDS = int(os.getenv("GROUNDING_NEGATIVE_TTL_SECONDS", "600"))
+
+# One in-flight grounding call per search term; concurrent callers wait for its result
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _airport_reply(text: str) -> Optional[Dict]:
+    """The parsed grounding answer if it is a JSON object with a 3-letter airport code, else None"""
+    data = parse_json_reply(text)
+    code = data.get('airport_code') if data else None
+    if not isinstance(code, str) or not re.fullmatch(r"[A-Za-z]{3}", code.strip()):
+        return None
+    return data
 
 
 def find_nearby_airport_with_grounding(city_name: str) -> Optional[Dict]:
@@ -19,15 +37,15 @@ def find_nearby_airport_with_grounding(city_name: str) -> Optional[Dict]:
     Use Gemini with grounding to find the nearest airport to a city
     Returns airport information including code, name, and city
     """
-    if not API_KEY:
-        print("❌ [AIRPORT-GROUNDING] No Google API key found")
+    if not llm_available():
+        logger.error("❌ [AIRPORT-GROUNDING] No Google API key found")
         return None
     
     try:
-        print(f"🌐 [AIRPORT-GROUNDING] Searching for airport near '{city_name}' using Gemini grounding...")
+        logger.debug("🌐 [AIRPORT-GROUNDING] Searching for airport near '{}' using Gemini grounding...", city_name)
         
         # Use Gemini to find airport information with grounding
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        provider = get_llm_provider()
         
         prompt = f"""
 What is the nearest commercial airport to {city_name}? 
@@ -43,30 +61,26 @@ Provide the response ONLY in this exact JSON format (no other text):
 If {city_name} has its own airport, use that. Otherwise, find the nearest major commercial airport.
 """
         
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.1,  # Low temperature for factual responses
-            ),
-            tools='google_search_retrieval'  # Enable grounding
-        )
-        
-        result_text = response.text.strip()
-        print(f"🌐 [AIRPORT-GROUNDING] Gemini response: {result_text[:200]}...")
-        
-        # Try to extract JSON from the response
-        # Remove markdown code blocks if present
-        result_text = re.sub(r'```json\s*', '', result_text)
-        result_text = re.sub(r'```\s*$', '', result_text)
-        result_text = result_text.strip()
+        result_text = cached_generate(
+            "airport.grounding", 'gemini-1.5-flash', prompt,
+            lambda: provider.generate(
+                'gemini-1.5-flash',
+                prompt,
+                site="airport.grounding",
+                grounding=True,  # Enable grounding
+                generation_config={"temperature": 0.1}  # Low temperature for factual responses
+            ).text,
+            config={"temperature": 0.1, "tools": "google_search_retrieval"},
+            validate=lambda text: _airport_reply(text) is not None
+        ).strip()
+        log_payload("🌐 [AIRPORT-GROUNDING] Gemini response", result_text)
         
-        # Parse JSON
-        try:
-            airport_data = json.loads(result_text)
-            
+        # Parse JSON (markdown code blocks and surrounding text are tolerated)
+        airport_data = parse_json_reply(result_text)
+        if airport_data is not None:
             # Validate the response
-            if not airport_data.get('airport_code') or len(airport_data.get('airport_code', '')) != 3:
-                print(f"⚠️ [AIRPORT-GROUNDING] Invalid airport code in response")
+            if _airport_reply(result_text) is None:
+                logger.warning("⚠️ [AIRPORT-GROUNDING] Invalid airport code in response")
                 return None
             
             result = {
@@ -79,34 +93,78 @@ If {city_name} has its own airport, use that. Otherwise, find the nearest major
                 'distance_km': airport_data.get('distance_km', 0)
             }
             
-            print(f"✅ [AIRPORT-GROUNDING] Found: {result['code']} - {result['name']} ({result['city']}) - {result['distance_km']}km away")
+            logger.info("✅ [AIRPORT-GROUNDING] Found: {} - {} ({}) - {}km away", result['code'], result['name'], result['city'], result['distance_km'])
             return result
-            
-        except json.JSONDecodeError as e:
-            print(f"❌ [AIRPORT-GROUNDING] Failed to parse JSON response: {e}")
-            print(f"   Raw response: {result_text}")
-            
-            # Fallback: try to extract airport code manually
-            code_match = re.search(r'\b([A-Z]{3})\b', result_text)
-            if code_match:
-                code = code_match.group(1)
-                print(f"⚠️ [AIRPORT-GROUNDING] Extracted airport code from text: {code}")
-                return {
-                    'code': code,
-                    'name': f"Airport near {city_name}",
-                    'city': city_name,
-                    'country': 'Unknown',
-                    'country_code': 'XX',
-                    'source': 'grounding-fallback'
-                }
-            
-            return None
+        
+        logger.error("❌ [AIRPORT-GROUNDING] Failed to parse JSON response")
+        logger.debug("❌ [AIRPORT-GROUNDING] Raw response: {}", result_text)
+        
+        # Fallback: try to extract airport code manually
+        code_match = re.search(r'\b([A-Z]{3})\b', result_text)
+        if code_match:
+            code = code_match.group(1)
+            logger.warning("⚠️ [AIRPORT-GROUNDING] Extracted airport code from text: {}", code)
+            return {
+                'code': code,
+                'name': f"Airport near {city_name}",
+                'city': city_name,
+                'country': 'Unknown',
+                'country_code': 'XX',
+                'source': 'grounding-fallback'
+            }
+        
+        return None
     
     except Exception as e:
-        print(f"❌ [AIRPORT-GROUNDING] Error: {str(e)}")
+        logger.error("❌ [AIRPORT-GROUNDING] Error: {}", str(e))
         return None
 
 
+def find_nearby_airport_cached(city_name: str) -> Optional[Dict]:
+    """
+    Resolve a city through the persisted alias cache, calling grounding only on a miss.
+    Concurrent lookups of the same term share one grounding call, and the outcome
+    (including a failure) is written back with its TTL.
+    """
+    term = city_name.lower().strip()
+    cached = get_resolved_alias(term)
+    if cached is not None:
+        status = "hit" if cached['airport'] else "negative hit"
+        logger.debug("💾 [AIRPORT-GROUNDING] Cache {} for '{}' (source: {})", status, city_name, cached['source'])
+        return cached['airport']
+    
+    with _inflight_lock:
+        future = _inflight.get(term)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _inflight[term] = future
+    
+    if not is_leader:
+        logger.debug("⏳ [AIRPORT-GROUNDING] Waiting for in-flight lookup of '{}'", city_name)
+        return future.result()
+    
+    try:
+        airport = find_nearby_airport_with_grounding(city_name)
+        # Without an API key nothing was attempted, so there is nothing to cache
+        if llm_available():
+            if airport:
+                # Codes scraped from unparseable answers are low-confidence - keep them only briefly
+                source = airport.get('source', 'grounding')
+                ttl = GROUNDING_CACHE_TTL_SECONDS if source == 'grounding' else GROUNDING_NEGATIVE_TTL_SECONDS
+                save_resolved_alias(term, airport, source, ttl)
+            else:
+                save_resolved_alias(term, None, 'grounding', GROUNDING_NEGATIVE_TTL_SECONDS)
+        future.set_result(airport)
+        return airport
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(term, None)
+
+
 def enrich_airports_with_grounding(search_term: str, existing_airports: List[Dict]) -> List[Dict]:
     """
     If existing airport search returns no results, use grounding to find nearby airport
@@ -120,10 +178,10 @@ def enrich_airports_with_grounding(search_term: str, existing_airports: List[Dic
     if not search_term or len(search_term) < 2:
         return existing_airports
     
-    print(f"🔍 [AIRPORT-GROUNDING] No results for '{search_term}', trying grounding service...")
+    logger.debug("🔍 [AIRPORT-GROUNDING] No results for '{}', trying grounding service...", search_term)
     
-    # Use grounding to find nearby airport
-    grounded_airport = find_nearby_airport_with_grounding(search_term)
+    # Use grounding to find nearby airport (served from the alias cache when already resolved)
+    grounded_airport = find_nearby_airport_cached(search_term)
     
     if grounded_airport:
         # Format it like a database result
@@ -134,7 +192,7 @@ def enrich_airports_with_grounding(search_term: str, existing_airports: List[Dic
             'country': grounded_airport['country'],
             'country_code': grounded_airport['country_code'],
         }
-        print(f"✅ [AIRPORT-GROUNDING] Returning grounded result: {result}")
+        logger.info("✅ [AIRPORT-GROUNDING] Returning grounded result: {}", result)
         return [result]
     
     return existing_airports
@@ -145,7 +203,7 @@ def get_airport_suggestions_for_city(city_name: str) -> List[str]:
     Get airport code suggestions for a city using grounding
     Useful for autocomplete/suggestions
     """
-    airport = find_nearby_airport_with_grounding(city_name)
+    airport = find_nearby_airport_cached(city_name)
     if airport:
         return [airport['code']]
     return []
@@ -0,0 +1,94 @@
+"""
+Request Deadlines
+One deadline per trip plan, held in a contextvar, so every stage, worker thread and upstream call can see how
+much time is left. When the remaining budget runs low, optional work (reverse-leg and alternative-airport
+flight searches, alternative places searches, place photos in the PDF) is skipped so that the plan comes back
+thinner but on time instead of timing out. Upstream calls are not started once the deadline has passed.
+  PLAN_DEADLINE_SECONDS      budget per plan, queue wait included (default 300); clients may ask for less
+                             with an X-Request-Timeout header (seconds)
+  DEADLINE_RESERVE_SECONDS   time kept back for the itinerary and PDF after the searches (default 60)
+"""
+import contextvars
+import math
+import os
+import time
+from typing import List, Optional
+
+from loguru import logger
+
+from utils.metrics import OPTIONAL_WORK_SKIPPED
+from utils.tracing import set_attributes
+
+PLAN_DEADLINE_SECONDS = float(os.getenv("PLAN_DEADLINE_SECONDS", "300"))
+DEADLINE_RESERVE_SECONDS = float(os.getenv("DEADLINE_RESERVE_SECONDS", "60"))
+# Time kept for the xhtml2pdf render itself when deciding whether to fetch more place photos
+PDF_RESERVE_SECONDS = 15.0
+
+# Rough cost of each kind of optional work, in seconds; it is skipped when it would eat into the reserve
+OPTIONAL_WORK_SECONDS = {
+    "flights.reverse_leg": 10.0,
+    "flights.alternative_airports": 10.0,
+    "places.alternative_searches": 8.0,
+    "pdf.place_images": 3.0,
+}
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised instead of starting an upstream call after the plan's deadline"""
+
+
+class Deadline:
+    __slots__ = ("expires_at", "skipped")
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+        self.skipped: List[str] = []
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+
+_deadline_var: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("plan_deadline", default=None)
+
+
+def start_deadline(seconds: Optional[float] = None) -> Deadline:
+    """Give the calling request (and everything it spawns) a deadline; never longer than PLAN_DEADLINE_SECONDS"""
+    seconds = PLAN_DEADLINE_SECONDS if seconds is None or seconds <= 0 else min(seconds, PLAN_DEADLINE_SECONDS)
+    deadline = Deadline(seconds)
+    _deadline_var.set(deadline)
+    return deadline
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _deadline_var.get()
+
+
+def remaining() -> float:
+    """Seconds left for the current plan (infinite outside one)"""
+    deadline = _deadline_var.get()
+    return deadline.remaining() if deadline is not None else math.inf
+
+
+def bounded_timeout(timeout: float, floor: float = 1.0) -> float:
+    """An upstream timeout cut down to the time left, but never below floor"""
+    return max(min(timeout, remaining()), floor)
+
+
+def skip_optional(work: str, reserve: float = DEADLINE_RESERVE_SECONDS) -> bool:
+    """True (logged and counted) when `work` would leave less than `reserve` seconds for the rest of the plan"""
+    left = remaining()
+    if left - OPTIONAL_WORK_SECONDS[work] >= reserve:
+        return False
+    deadline = _deadline_var.get()
+    if deadline is not None and work not in deadline.skipped:
+        deadline.skipped.append(work)
+        OPTIONAL_WORK_SKIPPED.inc(work=work)
+        logger.info("⏳ [DEADLINE] Skipping {} with {:.1f} s left", work, left)
+        set_attributes(deadline_skipped=",".join(deadline.skipped))
+    return True
+
+
+def check_deadline(what: str):
+    """Refuse to start an upstream call once the plan's deadline has passed"""
+    if remaining() <= 0:
+        raise DeadlineExceeded(f"Deadline passed before {what}")
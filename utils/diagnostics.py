@@ -0,0 +1,76 @@
+"""
+Request Diagnostics
+Per-request latency breakdown for support tickets. When a plan asks for it (include_diagnostics), the spans
+its work finishes are tallied into a collector held in a contextvar: upstream calls per service and target,
+LLM cache hits and misses per site, and PDF render time. The tally follows the request into asyncio.to_thread
+workers the same way the active span does. Spans are the source; they are recorded even when tracing
+export is off.
+"""
+import contextvars
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from utils.tracing import add_span_listener
+
+_diagnostics_var: contextvars.ContextVar[Optional["RequestDiagnostics"]] = contextvars.ContextVar(
+    "request_diagnostics", default=None)
+
+
+class RequestDiagnostics:
+    """Counters for one request, filled from its finished spans (possibly on worker threads)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.upstream: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(
+            lambda: defaultdict(lambda: {"calls": 0, "errors": 0, "ms": 0.0}))
+        self.cache: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self.pdf_render_ms: Optional[float] = None
+
+    def record(self, span) -> None:
+        name = span.name
+        attributes = span.attributes
+        with self._lock:
+            if name == "serpapi.search":
+                self._upstream("serpapi", attributes.get("engine", ""), span)
+            elif name == "llm.generate":
+                self._upstream("gemini", attributes.get("site", ""), span)
+            elif name == "llm.call" and attributes.get("cache_enabled"):
+                self.cache[attributes.get("site", "")]["hits" if attributes.get("cache_hit") else "misses"] += 1
+            elif name == "pdf.xhtml2pdf":
+                self.pdf_render_ms = round(span.duration_ms, 1)
+
+    def _upstream(self, service: str, target: str, span) -> None:
+        entry = self.upstream[service][target]
+        entry["calls"] += 1
+        entry["errors"] += span.status == "error"
+        entry["ms"] = round(entry["ms"] + span.duration_ms, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            upstream = {service: {target: dict(entry) for target, entry in targets.items()}
+                        for service, targets in self.upstream.items()}
+            cache = {site: dict(counts) for site, counts in self.cache.items()}
+        return {
+            "upstream_calls": {service: sum(entry["calls"] for entry in targets.values())
+                               for service, targets in upstream.items()},
+            "upstream": upstream,
+            "cache": cache,
+            "pdf_render_ms": self.pdf_render_ms,
+        }
+
+
+def start_diagnostics() -> RequestDiagnostics:
+    """Collect diagnostics for the calling request (call from its task before starting work)"""
+    diagnostics = RequestDiagnostics()
+    _diagnostics_var.set(diagnostics)
+    return diagnostics
+
+
+def _collect_span(span) -> None:
+    diagnostics = _diagnostics_var.get()
+    if diagnostics is not None:
+        diagnostics.record(span)
+
+
+add_span_listener(_collect_span)
@@ -0,0 +1,130 @@
+"""
+Fuzzy Matching Utility
+Trigram-indexed fuzzy lookup for place names with Damerau-Levenshtein ranking
+and a phonetic key tuned for Indian place-name spellings
+"""
+import re
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+# Spelling variants that are common when Indian place names are romanised.
+# Applied in order, longest patterns first, after lower-casing.
+_PHONETIC_RULES = [
+    (r"[^a-z]", ""),
+    (r"(bh|dh|gh|jh|kh|ph|th|ch|sh)", lambda m: {"ph": "f", "ch": "c", "sh": "s"}.get(m.group(1), m.group(1)[0])),
+    (r"(ee|ea|ie|ii|ey|y)", "i"),
+    (r"(oo|ou|uu)", "u"),
+    (r"(aa|ah)", "a"),
+    (r"w", "v"),
+    (r"z", "j"),
+    (r"(q|ck)", "k"),
+    (r"x", "ks"),
+    (r"(pore|poor)$", "pur"),
+    (r"(.)\1+", r"\1"),
+    (r"[ah]$", ""),
+]
+_COMPILED_RULES = [(re.compile(pattern), repl) for pattern, repl in _PHONETIC_RULES]
+
+# Names up to this long allow a single edit and must keep their first two letters: two edits on a short name
+# reach real, unrelated places (Paris/Puri, Hanoi/Hampi, Bangkok/Gangtok)
+SHORT_NAME_LENGTH = 7
+
+
+class FuzzyMatch(NamedTuple):
+    term: str
+    value: str
+    distance: int
+    score: float
+
+
+def phonetic_key(text: str) -> str:
+    """Collapse spelling variants of a place name (Ooty/Ooti, Darjeeling/Darjiling, Jhansi/Jansi) to one key"""
+    key = text.lower()
+    for pattern, repl in _COMPILED_RULES:
+        key = pattern.sub(repl, key)
+    return key
+
+
+def damerau_levenshtein(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """Optimal string alignment distance (adjacent transpositions cost 1).
+
+    Stops early and returns max_distance + 1 once every cell in a row exceeds max_distance.
+    """
+    if a == b:
+        return 0
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def _trigrams(text: str) -> List[str]:
+    padded = f"$${text}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _max_distance(length: int) -> int:
+    """Allowed typos for a query - one for short names, two otherwise"""
+    return 1 if length <= SHORT_NAME_LENGTH else 2
+
+
+class FuzzyIndex:
+    """Immutable trigram + phonetic index over a term -> value mapping, built once and queried per keystroke"""
+
+    def __init__(self, entries: Dict[str, str]):
+        self.entries = {term.lower().strip(): value for term, value in entries.items()}
+        self._postings = defaultdict(set)
+        self._phonetic = defaultdict(set)
+        for term in self.entries:
+            for gram in set(_trigrams(term)):
+                self._postings[gram].add(term)
+            self._phonetic[phonetic_key(term)].add(term)
+
+    def _candidates(self, query: str, max_distance: int) -> set:
+        grams = _trigrams(query)
+        # Each edit (a transposition counts as one) destroys at most four padded trigrams
+        min_shared = max(1, len(grams) - 4 * max_distance)
+        shared = defaultdict(int)
+        for gram in set(grams):
+            for term in self._postings.get(gram, ()):
+                shared[term] += 1
+        return {term for term, count in shared.items() if count >= min_shared}
+
+    def search(self, query: str, limit: int = 5) -> List[FuzzyMatch]:
+        """Ranked matches for query: exact, then fewest edits, with phonetic equivalents counted as one edit"""
+        query = query.lower().strip()
+        if not query:
+            return []
+
+        max_distance = _max_distance(len(query))
+        short = len(query) <= SHORT_NAME_LENGTH
+        key = phonetic_key(query)
+        phonetic_terms = self._phonetic.get(key, set()) if len(key) >= 3 else set()
+        matches = []
+        for term in self._candidates(query, max_distance) | phonetic_terms:
+            distance = damerau_levenshtein(query, term, max_distance)
+            if term in phonetic_terms:
+                distance = min(distance, 1)
+            if distance > max_distance:
+                continue
+            if short and distance and term[:2] != query[:2]:
+                continue
+            score = 1.0 - distance / max(len(query), len(term))
+            if term.startswith(query[:3]):
+                score += 0.1
+            matches.append(FuzzyMatch(term, self.entries[term], distance, round(min(score, 1.0), 3)))
+
+        matches.sort(key=lambda m: (m.distance, -m.score, m.term))
+        return matches[:limit]
@@ -0,0 +1,112 @@
+"""
+Gemini Client Registry
+One process-wide set of Gemini clients, created in the FastAPI lifespan and shared by every agent.
+Avoids per-request client construction and concurrent genai.configure() calls on global SDK state.
+The SDKs themselves are imported on first use (or by the startup warm-up), not when this module loads.
+"""
+import os
+import threading
+from typing import Dict
+
+from loguru import logger
+
+WARM_MODEL = "gemini-2.5-flash-lite"
+
+_lock = threading.Lock()
+_client = None
+_legacy_configured = False
+_models: Dict[str, object] = {}
+
+
+def _legacy_sdk():
+    """Legacy SDK used by the agents (GenerativeModel handles), or None when not installed"""
+    try:
+        import google.generativeai as legacy_genai
+    except Exception:  # pragma: no cover
+        return None
+    return legacy_genai
+
+
+def _genai_sdk():
+    """New Google GenAI SDK (for grounding; its client keeps a pooled HTTP connection), or None"""
+    try:
+        from google import genai
+    except Exception:  # pragma: no cover
+        return None
+    return genai
+
+
+def _api_key() -> str:
+    api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY or GOOGLE_API_KEY not set")
+    return api_key
+
+
+def get_genai_client():
+    """Shared google-genai Client (created on first use if the lifespan hasn't made it yet)"""
+    global _client
+    if _client is None:
+        genai = _genai_sdk()
+        if genai is None:
+            raise RuntimeError("google-genai package not available")
+        with _lock:
+            if _client is None:
+                _client = genai.Client(api_key=_api_key())
+                logger.debug("🔌 [GEMINI-CLIENTS] Created shared google-genai client")
+    return _client
+
+
+def get_generative_model(model_name: str):
+    """Shared GenerativeModel handle for model_name; the legacy SDK is configured exactly once"""
+    global _legacy_configured
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+    legacy_genai = _legacy_sdk()
+    if legacy_genai is None:
+        raise RuntimeError("google-generativeai package not available")
+    with _lock:
+        if not _legacy_configured:
+            legacy_genai.configure(api_key=_api_key())
+            _legacy_configured = True
+        model = _models.get(model_name)
+        if model is None:
+            model = legacy_genai.GenerativeModel(model_name)
+            _models[model_name] = model
+    return model
+
+
+def init_gemini_clients():
+    """Create the shared clients at startup; missing keys or packages are reported, not raised"""
+    for name, factory in (("google-genai client", get_genai_client),
+                          ("generative model", lambda: get_generative_model(WARM_MODEL))):
+        try:
+            factory()
+        except Exception as e:
+            logger.warning("⚠️ [GEMINI-CLIENTS] Could not create {}: {}", name, e)
+
+
+def warm_gemini_connections():
+    """Open the TLS connections up front with cheap model-metadata lookups (run in a worker thread)"""
+    try:
+        get_genai_client().models.get(model=WARM_MODEL)
+        if _legacy_configured:
+            _legacy_sdk().get_model(f"models/{WARM_MODEL}")
+        logger.debug("🔥 [GEMINI-CLIENTS] Connections warmed")
+    except Exception as e:
+        logger.warning("⚠️ [GEMINI-CLIENTS] Warm-up failed: {}", e)
+
+
+def close_gemini_clients():
+    """Release pooled connections on shutdown"""
+    global _client
+    with _lock:
+        client, _client = _client, None
+        _models.clear()
+    close = getattr(client, "close", None) if client is not None else None
+    if callable(close):
+        try:
+            close()
+        except Exception as e:
+            logger.warning("⚠️ [GEMINI-CLIENTS] Error closing client: {}", e)
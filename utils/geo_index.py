@@ -0,0 +1,88 @@
+"""
+Geospatial Index Utility
+KD-tree over points on the unit sphere for nearest-neighbour lookups by great-circle distance
+"""
+import heapq
+import math
+from typing import Any, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two coordinates in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _to_xyz(lat: float, lon: float) -> Tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(lon)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+def _km_to_chord(km: float) -> float:
+    """Straight-line distance through the unit sphere for a great-circle distance (monotonic, so pruning stays exact)"""
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+class GeoIndex:
+    """Immutable 3-D KD-tree of (latitude, longitude, item) points"""
+
+    def __init__(self, points: List[Tuple[float, float, Any]]):
+        self._points = [(_to_xyz(lat, lon), lat, lon, item) for lat, lon, item in points]
+        self._root = self._build(list(range(len(self._points))), 0)
+
+    def __len__(self):
+        return len(self._points)
+
+    def _build(self, indices: List[int], depth: int):
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda i: self._points[i][0][axis])
+        middle = len(indices) // 2
+        return (
+            indices[middle],
+            axis,
+            self._build(indices[:middle], depth + 1),
+            self._build(indices[middle + 1:], depth + 1),
+        )
+
+    def nearest(self, lat: float, lon: float, k: int = 3, max_km: Optional[float] = None) -> List[Tuple[float, Any]]:
+        """Up to k (distance_km, item) pairs closest to the coordinate, nearest first"""
+        if self._root is None or k <= 0:
+            return []
+
+        target = _to_xyz(lat, lon)
+        bound = _km_to_chord(max_km) ** 2 if max_km is not None else float("inf")
+        best = []  # max-heap of (-squared chord, index)
+
+        def visit(node):
+            if node is None:
+                return
+            index, axis, left, right = node
+            point = self._points[index][0]
+            squared = sum((point[i] - target[i]) ** 2 for i in range(3))
+            worst = -best[0][0] if len(best) == k else bound
+            if squared <= worst:
+                heapq.heappush(best, (-squared, index))
+                if len(best) > k:
+                    heapq.heappop(best)
+
+            delta = target[axis] - point[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            visit(near)
+            worst = -best[0][0] if len(best) == k else bound
+            if delta * delta <= worst:
+                visit(far)
+
+        visit(self._root)
+
+        results = []
+        for _, index in sorted(best, reverse=True):
+            _, point_lat, point_lon, item = self._points[index]
+            results.append((haversine_km(lat, lon, point_lat, point_lon), item))
+        return results
@@ -10,6 +10,8 @@ from typing import Optional, Tuple
 from urllib.parse import urlparse
 import logging
 
+from utils.deadline import bounded_timeout
+
 logger = logging.getLogger(__name__)
 
 class ImageHandler:
@@ -69,8 +71,8 @@ class ImageHandler:
                 logger.warning(f"Skipping problematic URL: {image_url}")
                 return self._get_fallback_image(fallback_type), True
                 
-            # Try to fetch the image with timeout
-            response = requests.get(image_url, timeout=10, stream=True)
+            # Try to fetch the image with timeout (shortened when the plan's deadline is close)
+            response = requests.get(image_url, timeout=bounded_timeout(10), stream=True)
             response.raise_for_status()
             
             # Check content type
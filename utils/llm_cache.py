@@ -0,0 +1,187 @@
+"""
+LLM Response Cache
+Disk-backed cache for Gemini responses, keyed by model, normalized prompt and generation config.
+Each call site has its own TTL; the cache is bounded in size and evicts least recently used entries.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+from utils.tracing import span
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+LLM_CACHE_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "64")) * 1024 * 1024)
+# Comma-separated call sites to bypass, e.g. "flights.grounded,extraction.plan"
+LLM_CACHE_DISABLED_SITES = {site.strip() for site in os.getenv("LLM_CACHE_DISABLE", "").split(",") if site.strip()}
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# How long each call site's answers stay valid
+SITE_TTLS = {
+    "extraction.plan": DAY,  # prompt embeds today's date
+    "extraction.destination": 30 * DAY,
+    "extraction.airports": 7 * DAY,
+    "airport.grounding": 30 * DAY,
+    "flights.grounded": 6 * HOUR,  # fares and schedules move
+}
+DEFAULT_TTL = DAY
+
+_lock = threading.Lock()
+_initialized = False
+
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    conn = sqlite3.connect(LLM_CACHE_PATH, timeout=5)
+    if not _initialized:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                site TEXT NOT NULL,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at INTEGER NOT NULL,
+                expires_at INTEGER NOT NULL,
+                last_access INTEGER NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+        conn.commit()
+        _initialized = True
+    return conn
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so formatting-only prompt changes share a cache entry"""
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def cache_key(model: str, prompt: str, config: Any = None) -> str:
+    """Stable key from the model, normalized prompt and a hash of the generation config"""
+    config_hash = hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+    material = json.dumps([model, normalize_prompt(prompt), config_hash])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def get_cached_response(site: str, model: str, prompt: str, config: Any = None) -> Optional[str]:
+    """Return an unexpired cached response, or None"""
+    key = cache_key(model, prompt, config)
+    now = int(time.time())
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                row = conn.execute(
+                    "SELECT response FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row:
+                    conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                    conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        logger.warning("⚠️ [LLM-CACHE] Read failed for {}: {}", site, e)
+        return None
+    return row[0] if row else None
+
+
+def cache_stats() -> Dict[str, int]:
+    """Live entry count and stored bytes; raises sqlite3.Error when the cache database is unusable"""
+    with _lock:
+        conn = _connect()
+        try:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache WHERE expires_at > ?", (int(time.time()),)
+            ).fetchone()
+        finally:
+            conn.close()
+    return {"entries": entries, "bytes": size, "max_bytes": LLM_CACHE_MAX_BYTES}
+
+
+def store_response(site: str, model: str, prompt: str, response: str, config: Any = None,
+                   ttl_seconds: Optional[int] = None):
+    """Store a response and evict least recently used entries beyond the size bound"""
+    key = cache_key(model, prompt, config)
+    now = int(time.time())
+    ttl = ttl_seconds if ttl_seconds is not None else SITE_TTLS.get(site, DEFAULT_TTL)
+    size = len(response.encode("utf-8"))
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+                conn.execute("""
+                    INSERT OR REPLACE INTO llm_cache (key, site, model, response, size, created_at, expires_at, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (key, site, model, response, size, now, now + ttl, now))
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+                if total > LLM_CACHE_MAX_BYTES:
+                    evicted = 0
+                    for old_key, old_size in conn.execute(
+                        "SELECT key, size FROM llm_cache ORDER BY last_access"
+                    ).fetchall():
+                        if total <= LLM_CACHE_MAX_BYTES:
+                            break
+                        conn.execute("DELETE FROM llm_cache WHERE key = ?", (old_key,))
+                        total -= old_size
+                        evicted += 1
+                    logger.debug("🧹 [LLM-CACHE] Evicted {} least recently used entries", evicted)
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        logger.warning("⚠️ [LLM-CACHE] Write failed for {}: {}", site, e)
+
+
+def parse_json_reply(text: str) -> Optional[Dict]:
+    """The JSON object in a model reply (bare, fenced or surrounded by prose), or None"""
+    text = re.sub(r"```(?:json)?", "", text or "").strip()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        match = re.search(r"\{[\s\S]*\}", text)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return None
+    return data if isinstance(data, dict) else None
+
+
+def cached_generate(site: str, model: str, prompt: str, generate: Callable[[], str], config: Any = None,
+                    ttl_seconds: Optional[int] = None, use_cache: bool = True,
+                    validate: Optional[Callable[[str], bool]] = None) -> str:
+    """
+    Return the cached response for this model/prompt/config, or call generate() and cache its text.
+    Pass use_cache=False (or list the site in LLM_CACHE_DISABLE) to opt a call out.
+    Empty responses, and responses that validate() rejects, are never cached, so a bad answer is
+    retried on the next call instead of being replayed for the site's whole TTL.
+    """
+    enabled = use_cache and LLM_CACHE_ENABLED and site not in LLM_CACHE_DISABLED_SITES
+    with span("llm.call", site=site, model=model, cache_enabled=enabled) as call_span:
+        if enabled:
+            cached = get_cached_response(site, model, prompt, config)
+            if cached is not None and (validate is None or validate(cached)):
+                logger.debug("💾 [LLM-CACHE] Hit for {} ({})", site, model)
+                call_span.set_attribute("cache_hit", True)
+                return cached
+
+        call_span.set_attribute("cache_hit", False)
+        response = generate()
+        if enabled and response:
+            if validate is None or validate(response):
+                store_response(site, model, prompt, response, config, ttl_seconds)
+            else:
+                logger.debug("🚫 [LLM-CACHE] Not caching invalid response for {} ({})", site, model)
+                call_span.set_attribute("cache_rejected", True)
+        return response
@@ -0,0 +1,250 @@
+"""
+LLM Provider
+Single interface every agent uses to call a language model, so the backend can be swapped:
+  - gemini: live Gemini calls through the shared client registry (default)
+  - record: live Gemini calls, with every prompt and response appended to a JSONL file
+  - replay: answers served from a recording with synthetic latency, no network needed
+Select with LLM_PROVIDER; see LLM_RECORDING_PATH and LLM_REPLAY_LATENCY.
+Each call times out after LLM_TIMEOUT_SECONDS (default 120), or sooner when the plan's deadline is closer.
+"""
+import functools
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from utils.gemini_clients import get_genai_client, get_generative_model
+from utils.llm_cache import cache_key
+from utils.tracing import span
+from utils.deadline import bounded_timeout, check_deadline
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+LLM_RECORDING_PATH = os.getenv("LLM_RECORDING_PATH", "recordings/llm.jsonl")
+# "recorded" (replay the captured latency), "fixed:MS", "uniform:MIN_MS:MAX_MS" or "lognormal:MEDIAN_MS:SIGMA"
+LLM_REPLAY_LATENCY = os.getenv("LLM_REPLAY_LATENCY", "recorded")
+# When strict, a prompt missing from the recording is an error instead of a same-site stand-in
+LLM_REPLAY_STRICT = os.getenv("LLM_REPLAY_STRICT", "false").lower() in ("1", "true", "yes")
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+
+
+class LLMResponse:
+    """Text of a model response, its web citations, and the raw SDK response when there is one"""
+
+    def __init__(self, text: str, citations: Optional[List[str]] = None, raw: Any = None):
+        self.text = text or ""
+        self.citations = citations or []
+        self.raw = raw
+
+
+def extract_citations(response: Any) -> List[str]:
+    """Web URIs backing a grounded google-genai response"""
+    citations = []
+    try:
+        grounding = response.candidates[0].grounding_metadata if response.candidates else None
+    except Exception:
+        return citations
+    if grounding and getattr(grounding, "grounding_supports", None):
+        chunks = getattr(grounding, "grounding_chunks", None) or []
+        for support in grounding.grounding_supports:
+            for i in getattr(support, "grounding_chunk_indices", None) or []:
+                if i < len(chunks) and getattr(chunks[i], "web", None) and getattr(chunks[i].web, "uri", None):
+                    citations.append(chunks[i].web.uri)
+    return citations
+
+
+def _request_config(grounding: bool, generation_config: Optional[Dict], response_schema: Any) -> Dict:
+    """JSON-able description of a request's settings, used in recording keys"""
+    return {
+        "grounding": grounding,
+        "generation_config": generation_config or {},
+        "response_schema": getattr(response_schema, "__name__", None),
+    }
+
+
+def traced(generate):
+    """Wrap a provider's generate() in an llm.generate span with the call site and payload sizes"""
+    @functools.wraps(generate)
+    def wrapper(self, model: str, prompt: str, *, site: str = "default", grounding: bool = False,
+                generation_config: Optional[Dict] = None, response_schema: Any = None) -> LLMResponse:
+        with span("llm.generate", site=site, model=model, provider=self.name, grounding=grounding,
+                  prompt_chars=len(prompt)) as call_span:
+            check_deadline(f"Gemini call {site}")
+            response = generate(self, model, prompt, site=site, grounding=grounding,
+                                generation_config=generation_config, response_schema=response_schema)
+            call_span.set_attributes(response_chars=len(response.text), citations=len(response.citations))
+            return response
+    return wrapper
+
+
+class GeminiProvider:
+    """Live Gemini calls: grounded or schema-constrained prompts use google-genai, the rest the legacy SDK"""
+
+    name = "gemini"
+
+    @traced
+    def generate(self, model: str, prompt: str, *, site: str = "default", grounding: bool = False,
+                 generation_config: Optional[Dict] = None, response_schema: Any = None) -> LLMResponse:
+        timeout = bounded_timeout(LLM_TIMEOUT_SECONDS)
+        if not grounding and response_schema is None:
+            request_options = {"timeout": timeout}
+            if generation_config:
+                response = get_generative_model(model).generate_content(prompt, generation_config=generation_config,
+                                                                        request_options=request_options)
+            else:
+                response = get_generative_model(model).generate_content(prompt, request_options=request_options)
+            return LLMResponse(response.text, raw=response)
+
+        try:
+            # Loaded on first grounded call (or by the startup warm-up) to keep imports cheap
+            from google.genai import types
+        except Exception:  # pragma: no cover
+            raise RuntimeError("google-genai package not available")
+        tools = []
+        if grounding:
+            # Gemini 1.x models only support the older search-retrieval tool
+            if model.startswith("gemini-1"):
+                tools.append(types.Tool(google_search_retrieval=types.GoogleSearchRetrieval()))
+            else:
+                tools.append(types.Tool(google_search=types.GoogleSearch()))
+        config = types.GenerateContentConfig(tools=tools, response_schema=response_schema,
+                                             http_options=types.HttpOptions(timeout=int(timeout * 1000)),
+                                             **(generation_config or {}))
+        response = get_genai_client().models.generate_content(model=model, contents=prompt, config=config)
+        return LLMResponse(response.text, extract_citations(response), raw=response)
+
+
+class RecordingProvider:
+    """Wraps another provider and appends every prompt/response pair to a JSONL recording"""
+
+    name = "record"
+
+    def __init__(self, inner, path: str):
+        self.inner = inner
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def generate(self, model: str, prompt: str, *, site: str = "default", grounding: bool = False,
+                 generation_config: Optional[Dict] = None, response_schema: Any = None) -> LLMResponse:
+        started = time.perf_counter()
+        response = self.inner.generate(model, prompt, site=site, grounding=grounding,
+                                       generation_config=generation_config, response_schema=response_schema)
+        config = _request_config(grounding, generation_config, response_schema)
+        record = {
+            "key": cache_key(model, prompt, config),
+            "site": site,
+            "model": model,
+            "prompt": prompt,
+            "config": config,
+            "text": response.text,
+            "citations": response.citations,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return response
+
+
+def parse_latency(spec: str):
+    """Turn a latency spec into a function of the recorded latency (ms) returning seconds to wait"""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(":") if v]
+    if kind == "fixed":
+        return lambda recorded: values[0] / 1000
+    if kind == "uniform":
+        return lambda recorded: random.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda recorded: random.lognormvariate(0, sigma) * median / 1000
+    if kind in ("recorded", ""):
+        return lambda recorded: (recorded or 0) / 1000
+    if kind == "none":
+        return lambda recorded: 0
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+def replay_sleep(latency: float, timeout: float, what: str):
+    """Sleep for a replayed call's latency, timing out the way the live client would when it is too slow"""
+    if latency > timeout:
+        time.sleep(timeout)
+        raise TimeoutError(f"{what} timed out after {timeout:.1f} s")
+    time.sleep(latency)
+
+
+class ReplayProvider:
+    """Serves responses from a recording, sleeping for a synthetic latency instead of calling the network"""
+
+    name = "replay"
+
+    def __init__(self, path: str, latency: str = "recorded", strict: bool = False):
+        self.path = path
+        self.strict = strict
+        self._latency = parse_latency(latency)
+        self._by_key: Dict[str, Dict] = {}
+        self._by_site: Dict[str, List[Dict]] = defaultdict(list)
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._by_key[record["key"]] = record
+                    self._by_site[record["site"]].append(record)
+        logger.debug("📼 [LLM-PROVIDER] Loaded {} recorded responses from {}", len(self._by_key), path)
+
+    @traced
+    def generate(self, model: str, prompt: str, *, site: str = "default", grounding: bool = False,
+                 generation_config: Optional[Dict] = None, response_schema: Any = None) -> LLMResponse:
+        config = _request_config(grounding, generation_config, response_schema)
+        record = self._by_key.get(cache_key(model, prompt, config))
+        if record is None:
+            # Prompts embed dates and free text, so fall back to any answer recorded at the same call site
+            candidates = self._by_site.get(site)
+            if self.strict or not candidates:
+                raise LookupError(f"No recorded response for {site} ({model})")
+            record = random.choice(candidates)
+        replay_sleep(self._latency(record.get("latency_ms")), bounded_timeout(LLM_TIMEOUT_SECONDS), f"Gemini call {site}")
+        return LLMResponse(record["text"], record.get("citations"))
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def create_llm_provider(kind: str = LLM_PROVIDER):
+    """Build the provider named by kind ("gemini", "record" or "replay")"""
+    if kind == "record":
+        return RecordingProvider(GeminiProvider(), LLM_RECORDING_PATH)
+    if kind == "replay":
+        return ReplayProvider(LLM_RECORDING_PATH, LLM_REPLAY_LATENCY, LLM_REPLAY_STRICT)
+    if kind != "gemini":
+        raise ValueError(f"Unknown LLM_PROVIDER: {kind}")
+    return GeminiProvider()
+
+
+def get_llm_provider():
+    """Process-wide provider, created from LLM_PROVIDER on first use"""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = create_llm_provider()
+                logger.debug("🧩 [LLM-PROVIDER] Using {} provider", _provider.name)
+    return _provider
+
+
+def llm_available() -> bool:
+    """Whether a call can be attempted: offline providers always can, live Gemini needs an API key"""
+    if LLM_PROVIDER == "replay" or (_provider is not None and _provider.name == "replay"):
+        return True
+    return bool(os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY"))
+
+
+def set_llm_provider(provider):
+    """Swap the process-wide provider (e.g. from a benchmark or load-test harness)"""
+    global _provider
+    with _provider_lock:
+        _provider = provider
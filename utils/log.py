@@ -0,0 +1,80 @@
+"""
+Logging
+Loguru setup shared by the app: leveled records that carry the request and trace IDs, as text or JSON,
+plus sampled and truncated dumps of large payloads (SerpAPI responses, documents).
+  LOG_LEVEL                 minimum level (default INFO)
+  LOG_FORMAT                text (default) or json, one JSON object per line
+  LOG_PAYLOAD_SAMPLE_RATE   share of payload dumps written when DEBUG is on (default 0.1)
+  LOG_PAYLOAD_MAX_CHARS     payload dumps are cut to this length (default 2000)
+Expensive DEBUG arguments should be passed as "{}" arguments or via logger.opt(lazy=True), so nothing is
+formatted unless the record is actually written.
+"""
+import contextvars
+import os
+import random
+import sys
+import uuid
+from typing import Any, Optional
+
+from loguru import logger
+
+from utils.tracing import current_trace_id
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+TEXT_FORMAT = ("<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <7}</level> | "
+               "<cyan>{extra[request_id]}</cyan> | {message}")
+
+_min_level_no = logger.level("DEBUG").no
+_payload_sample_rate = 0.1
+_payload_max_chars = 2000
+
+
+def _add_context(record):
+    record["extra"]["request_id"] = request_id_var.get() or "-"
+    trace_id = current_trace_id()
+    if trace_id:
+        record["extra"]["trace_id"] = trace_id
+
+
+def configure_logging():
+    """Replace loguru's default DEBUG stderr sink with the configured one (call once at startup)"""
+    global _min_level_no, _payload_sample_rate, _payload_max_chars
+    level = os.getenv("LOG_LEVEL", "INFO").upper()
+    as_json = os.getenv("LOG_FORMAT", "text").lower() == "json"
+    _payload_sample_rate = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.1"))
+    _payload_max_chars = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "2000"))
+    _min_level_no = logger.level(level).no
+    logger.configure(
+        handlers=[{
+            "sink": sys.stdout,
+            "level": level,
+            "format": "{message}" if as_json else TEXT_FORMAT,
+            "serialize": as_json,
+            "colorize": False if as_json else None,
+            "backtrace": False,
+            "diagnose": False,
+        }],
+        patcher=_add_context,
+        extra={"request_id": "-"},
+    )
+
+
+def log_enabled(level: str) -> bool:
+    return logger.level(level).no >= _min_level_no
+
+
+def new_request_id(incoming: Optional[str] = None) -> str:
+    """Use the caller's X-Request-ID when it looks sane, otherwise mint one"""
+    if incoming and len(incoming) <= 128 and incoming.isprintable():
+        return incoming
+    return uuid.uuid4().hex[:16]
+
+
+def log_payload(label: str, payload: Any, level: str = "DEBUG"):
+    """Dump a (possibly huge) payload for a sample of calls, truncated; costs nothing when the level is off"""
+    if not log_enabled(level) or random.random() >= _payload_sample_rate:
+        return
+    text = payload if isinstance(payload, str) else repr(payload)
+    suffix = f"... [{len(text) - _payload_max_chars} more chars]" if len(text) > _payload_max_chars else ""
+    logger.opt(depth=1).log(level, "{} ({} chars): {}{}", label, len(text), text[:_payload_max_chars], suffix)
@@ -0,0 +1,102 @@
+"""
+Event Loop Monitor
+Finds code that blocks the event loop. A heartbeat task ticks every LOOP_MONITOR_INTERVAL_MS and records how
+late each tick was (event-loop lag). A watchdog thread checks whether the next tick is overdue. When the loop is
+held longer than LOOP_BLOCK_THRESHOLD_MS, the watchdog captures the loop thread's stack while it is still
+blocked. It logs the stack and the innermost app function (the blocking call site) and counts the block per
+call site in /metrics.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from loguru import logger
+
+from utils.metrics import EVENT_LOOP_LAG, EVENT_LOOP_LAG_LAST, EVENT_LOOP_BLOCKS, EVENT_LOOP_BLOCK_DURATION
+
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "50"))
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+STACK_DEPTH = 25
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_monitor: Optional["LoopMonitor"] = None
+
+
+def blocking_site(frame) -> str:
+    """Innermost frame in the app's own code (not the stdlib or site-packages), as path:function"""
+    innermost = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_REPO_ROOT) and "site-packages" not in filename:
+            return f"{filename[len(_REPO_ROOT):]}:{frame.f_code.co_name}"
+        innermost = innermost or frame
+        frame = frame.f_back
+    return f"{os.path.basename(innermost.f_code.co_filename)}:{innermost.f_code.co_name}" if innermost else "unknown"
+
+
+class LoopMonitor:
+    """Heartbeat on the loop plus a watchdog thread that snapshots the loop thread when a tick is overdue"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval_ms: float = LOOP_MONITOR_INTERVAL_MS,
+                 threshold_ms: float = LOOP_BLOCK_THRESHOLD_MS):
+        self.loop = loop
+        self.loop_thread = threading.get_ident()
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self._next_tick = time.monotonic() + self.interval
+        self._stall_site: Optional[str] = None
+        self._stop = threading.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+
+    async def _heartbeat(self):
+        while True:
+            self._next_tick = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - self._next_tick)
+            EVENT_LOOP_LAG.observe(lag)
+            EVENT_LOOP_LAG_LAST.set(lag)
+            if lag >= self.threshold:
+                site = self._stall_site or "unknown"
+                EVENT_LOOP_BLOCKS.inc(site=site)
+                EVENT_LOOP_BLOCK_DURATION.observe(lag)
+                logger.warning("🐢 [LOOP-MONITOR] Event loop blocked for {:.0f} ms in {}", lag * 1000, site)
+            self._stall_site = None
+
+    def _watch(self):
+        # Check often enough that a block is caught close to the threshold
+        check_every = max(0.005, self.threshold / 4)
+        while not self._stop.wait(check_every):
+            overdue = time.monotonic() - self._next_tick
+            if overdue < self.threshold or self._stall_site is not None:
+                continue
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is None:
+                continue
+            self._stall_site = blocking_site(frame)
+            current = getattr(asyncio.tasks, "_current_tasks", {}).get(self.loop)
+            stack = "".join(traceback.format_stack(frame, limit=STACK_DEPTH))
+            logger.warning("🐢 [LOOP-MONITOR] Event loop held for over {:.0f} ms by {} (task {}):\n{}",
+                           overdue * 1000, self._stall_site, current.get_name() if current else "-", stack)
+
+    def start(self):
+        self._task = self.loop.create_task(self._heartbeat(), name="loop-monitor")
+        self._watchdog.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+
+
+def start_loop_monitor() -> LoopMonitor:
+    """Start monitoring the running loop (call from the lifespan)"""
+    global _monitor
+    _monitor = LoopMonitor(asyncio.get_running_loop())
+    _monitor.start()
+    logger.info("🐢 [LOOP-MONITOR] Watching for event-loop blocks over {} ms", LOOP_BLOCK_THRESHOLD_MS)
+    return _monitor
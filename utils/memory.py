@@ -0,0 +1,46 @@
+"""
+Memory Accounting
+Per-stage Python heap accounting for the workflow, using tracemalloc. Each stage records how much memory it
+kept (retained) and how high the heap rose above its starting point (peak). The numbers go on the
+stage's span and into the debug log. tracemalloc slows allocations down noticeably, so this is a debug tool.
+The heap is process-wide, so the numbers are only exact while a single plan is running.
+  MEMORY_PROFILING   on/off; defaults to on when LOG_LEVEL is DEBUG
+  MEMORY_FRAMES      traceback depth kept per allocation (default 1)
+"""
+import os
+import tracemalloc
+from typing import Dict, Optional
+
+MEMORY_PROFILING = os.getenv(
+    "MEMORY_PROFILING", "on" if os.getenv("LOG_LEVEL", "INFO").upper() == "DEBUG" else "off"
+).lower() in ("1", "on", "true", "yes")
+MEMORY_FRAMES = int(os.getenv("MEMORY_FRAMES", "1"))
+
+
+def memory_accounting_enabled() -> bool:
+    """Start tracemalloc on first use when MEMORY_PROFILING is on"""
+    if not MEMORY_PROFILING:
+        return False
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(MEMORY_FRAMES)
+    return True
+
+
+def start_stage_memory() -> Optional[int]:
+    """Mark the start of a stage; returns the baseline (traced bytes) to pass to end_stage_memory"""
+    if not memory_accounting_enabled():
+        return None
+    tracemalloc.reset_peak()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def end_stage_memory(baseline: Optional[int]) -> Dict[str, float]:
+    """Retained and peak KiB of a stage started with start_stage_memory ({} when accounting is off)"""
+    if baseline is None or not tracemalloc.is_tracing():
+        return {}
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "mem_retained_kib": round((current - baseline) / 1024, 1),
+        "mem_peak_kib": round(max(peak - baseline, 0) / 1024, 1),
+        "mem_heap_kib": round(current / 1024, 1),
+    }
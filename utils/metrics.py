@@ -0,0 +1,288 @@
+"""
+Metrics
+In-process counters, gauges and histograms rendered in the Prometheus text format at /metrics.
+Request metrics come from the HTTP middleware; stage, upstream (SerpAPI, Gemini) and cache metrics
+are derived from finished tracing spans, so they follow the same instrumentation points as traces
+(spans are still recorded for metrics when TRACING_ENABLED=false or a trace is not sampled).
+"""
+import asyncio
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from utils.tracing import add_span_listener, dropped_spans, export_queue_depth
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = ""
+    _collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _collected_items(self) -> List[Tuple[Tuple[str, ...], object]]:
+        """(label values, value) pairs - from the collect callback when there is one, else the stored values"""
+        if self._collect is None:
+            with self._lock:
+                return list(self._values.items())
+        try:
+            return list(self._collect().items())
+        except Exception as e:
+            logger.warning("⚠️ [METRICS] Could not collect {}: {}", self.name, e)
+            return []
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonic count per label set; with collect=fn the counts are read from fn() at scrape time"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def snapshot(self) -> Dict[Tuple[str, ...], float]:
+        """Copy of every label set's count, keyed by label values in labelnames order"""
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(v)}"
+                for key, v in self._collected_items()]
+
+
+class Gauge(_Metric):
+    """Current value per label set; with collect=fn the values are read from fn() at scrape time"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+        if not labelnames and collect is None:
+            self._values[()] = 0
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    @contextmanager
+    def track_inprogress(self, **labels: str):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+                for key, v in self._collected_items()]
+
+
+class Histogram(_Metric):
+    """Cumulative buckets, sum and count per label set"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def render_metrics() -> str:
+    """Every registered metric in the Prometheus text exposition format (0.0.4)"""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+# --- Metric definitions -------------------------------------------------------
+
+HTTP_REQUEST_DURATION = Histogram(
+    "journezy_http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status"))
+HTTP_REQUESTS_IN_FLIGHT = Gauge("journezy_http_requests_in_flight", "HTTP requests currently being handled")
+PLANS_IN_FLIGHT = Gauge("journezy_plans_in_flight", "Trip plans currently running")
+PLANS_QUEUED = Gauge("journezy_plans_queued", "Trip plans waiting for an admission slot")
+PLAN_QUEUE_WAIT = Histogram(
+    "journezy_plan_queue_wait_seconds", "Time plans waited for an admission slot", ("outcome",))
+PLANS_REJECTED = Counter("journezy_plans_rejected", "Trip plans shed by admission control", ("reason",))
+OPTIONAL_WORK_SKIPPED = Counter(
+    "journezy_optional_work_skipped", "Optional work skipped to finish a plan within its deadline", ("work",))
+STAGE_DURATION = Histogram(
+    "journezy_workflow_stage_duration_seconds", "Planning workflow stage latency", ("stage", "outcome"))
+UPSTREAM_REQUESTS = Counter(
+    "journezy_upstream_requests", "Calls to SerpAPI engines and Gemini call sites", ("service", "target", "outcome"))
+UPSTREAM_DURATION = Histogram(
+    "journezy_upstream_request_duration_seconds", "Upstream call latency", ("service", "target"))
+UPSTREAM_PAYLOAD_BYTES = Counter(
+    "journezy_upstream_payload_bytes", "Response bytes received from upstreams", ("service", "target"))
+LLM_CACHE_REQUESTS = Counter("journezy_llm_cache_requests", "LLM response cache lookups", ("site", "result"))
+PDF_RENDERS_IN_PROGRESS = Gauge("journezy_pdf_renders_in_progress", "PDF documents currently being rendered")
+PDF_RENDER_DURATION = Histogram("journezy_pdf_render_duration_seconds", "xhtml2pdf render time", ())
+EVENT_LOOP_LAG = Histogram(
+    "journezy_event_loop_lag_seconds", "How late the event loop woke a periodic timer", (), LAG_BUCKETS)
+EVENT_LOOP_LAG_LAST = Gauge("journezy_event_loop_lag_last_seconds", "Most recent event-loop lag sample")
+EVENT_LOOP_BLOCKS = Counter(
+    "journezy_event_loop_blocks", "Times the event loop was held past the blocking threshold, per call site", ("site",))
+EVENT_LOOP_BLOCK_DURATION = Histogram(
+    "journezy_event_loop_block_duration_seconds", "How long the loop was held, for blocks over the threshold", (),
+    LAG_BUCKETS)
+
+
+def _cache_hit_ratio() -> Dict[Tuple[str, ...], float]:
+    sites = {key[0] for key in list(LLM_CACHE_REQUESTS._values)}
+    ratios = {}
+    for site in sites:
+        hits = LLM_CACHE_REQUESTS.value(site=site, result="hit")
+        total = hits + LLM_CACHE_REQUESTS.value(site=site, result="miss")
+        if total:
+            ratios[(site,)] = hits / total
+    return ratios
+
+
+def thread_pool_stats() -> Dict[str, int]:
+    """Default executor (asyncio.to_thread) queue depth, thread count and thread limit"""
+    try:
+        executor = getattr(asyncio.get_running_loop(), "_default_executor", None)
+    except RuntimeError:
+        executor = None
+    if executor is None:
+        return {"queued": 0, "threads": 0, "max_workers": 0}
+    return {"queued": executor._work_queue.qsize(), "threads": len(executor._threads),
+            "max_workers": executor._max_workers}
+
+
+def _thread_pool_stats() -> Dict[Tuple[str, ...], float]:
+    stats = thread_pool_stats()
+    return {("queued",): stats["queued"], ("threads",): stats["threads"]}
+
+
+Gauge("journezy_llm_cache_hit_ratio", "Share of LLM cache lookups that hit, per call site", ("site",),
+      collect=_cache_hit_ratio)
+Gauge("journezy_thread_pool", "Default thread pool used by asyncio.to_thread", ("state",),
+      collect=_thread_pool_stats)
+Gauge("journezy_trace_export_queue_depth", "Finished spans waiting to be exported", (),
+      collect=lambda: {(): export_queue_depth()})
+Counter("journezy_trace_spans_dropped", "Finished spans that were never exported", ("reason",),
+        collect=lambda: {(reason,): count for reason, count in dropped_spans().items()})
+
+
+def _observe_span(span) -> None:
+    """Turn finished spans into stage, upstream and cache metrics"""
+    name = span.name
+    seconds = span.duration_ms / 1000
+    attributes = span.attributes
+    if name.startswith("workflow.") and name != "workflow.plan":
+        STAGE_DURATION.observe(seconds, stage=name[len("workflow."):], outcome=span.status)
+    elif name == "serpapi.search":
+        engine = attributes.get("engine", "")
+        UPSTREAM_REQUESTS.inc(service="serpapi", target=engine, outcome=span.status)
+        UPSTREAM_DURATION.observe(seconds, service="serpapi", target=engine)
+        if attributes.get("payload_bytes"):
+            UPSTREAM_PAYLOAD_BYTES.inc(attributes["payload_bytes"], service="serpapi", target=engine)
+    elif name == "llm.generate":
+        site = attributes.get("site", "")
+        UPSTREAM_REQUESTS.inc(service="gemini", target=site, outcome=span.status)
+        UPSTREAM_DURATION.observe(seconds, service="gemini", target=site)
+        if attributes.get("response_chars"):
+            UPSTREAM_PAYLOAD_BYTES.inc(attributes["response_chars"], service="gemini", target=site)
+    elif name == "llm.call" and attributes.get("cache_enabled"):
+        LLM_CACHE_REQUESTS.inc(site=attributes.get("site", ""), result="hit" if attributes.get("cache_hit") else "miss")
+    elif name == "pdf.xhtml2pdf":
+        PDF_RENDER_DURATION.observe(seconds)
+
+
+add_span_listener(_observe_span)
+
+
+def observe_request(method: str, route: str, status: int, started: float):
+    HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=method, route=route, status=str(status))
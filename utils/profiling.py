@@ -0,0 +1,175 @@
+"""
+Request Profiling
+Opt-in sampling profiler for a single request. A request carrying X-Profile-Token (or ?profile=<token>)
+equal to PROFILING_TOKEN is sampled every PROFILING_INTERVAL_MS: on the event-loop thread while one of its
+own tasks is running, and on thread-pool workers while they run its asyncio.to_thread calls. Stacks are
+written in the folded format read by flamegraph.pl, speedscope and inferno to PROFILING_DIR/<trace id>.folded.
+Without PROFILING_TOKEN, or without the header, a request costs one header lookup.
+"""
+import asyncio
+import collections
+import contextvars
+import functools
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+import weakref
+from typing import Optional
+
+from loguru import logger
+
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+PROFILING_DIR = os.getenv("PROFILING_DIR", "profiles")
+PROFILING_MAX_SECONDS = float(os.getenv("PROFILING_MAX_SECONDS", "330"))
+
+_PROFILE_ID = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+_session_var: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar("profile_session",
+                                                                                          default=None)
+_patched_loops: "weakref.WeakSet[asyncio.AbstractEventLoop]" = weakref.WeakSet()
+
+
+def profiling_requested(token: Optional[str]) -> bool:
+    """True when profiling is configured and the caller presented the admin token"""
+    return bool(PROFILING_TOKEN and token) and hmac.compare_digest(token, PROFILING_TOKEN)
+
+
+@functools.lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    if filename.startswith(_REPO_ROOT):
+        return filename[len(_REPO_ROOT):]
+    marker = filename.rfind("site-packages" + os.sep)
+    if marker >= 0:
+        return filename[marker + len("site-packages") + 1:]
+    return os.path.basename(filename)
+
+
+def _fold(frame, root: str) -> str:
+    """Outermost-first 'a;b;c' stack, one entry per function"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        name = getattr(code, "co_qualname", code.co_name)
+        names.append(f"{name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ":"))
+        frame = frame.f_back
+    names.append(root)
+    return ";".join(reversed(names))
+
+
+def _worker_context(frame) -> Optional[contextvars.Context]:
+    """Context of the asyncio.to_thread call a thread-pool worker is running, if any"""
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == "run" and code.co_filename.endswith(os.path.join("concurrent", "futures", "thread.py")):
+            fn = getattr(frame.f_locals.get("self"), "fn", None)
+            context = getattr(getattr(fn, "func", None), "__self__", None)
+            return context if isinstance(context, contextvars.Context) else None
+        frame = frame.f_back
+    return None
+
+
+class ProfileSession:
+    """Samples one request's stacks on a background thread until stop()"""
+
+    def __init__(self, profile_id: str, loop: asyncio.AbstractEventLoop):
+        self.profile_id = profile_id
+        self.loop = loop
+        self.loop_thread = threading.get_ident()
+        self.tasks: "weakref.WeakSet[asyncio.Task]" = weakref.WeakSet()
+        self.stacks: collections.Counter = collections.Counter()
+        self.samples = 0
+        self.started = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{profile_id}", daemon=True)
+
+    def _sample(self):
+        current_tasks = getattr(asyncio.tasks, "_current_tasks", {})
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self._thread.ident:
+                continue
+            if thread_id == self.loop_thread:
+                task = current_tasks.get(self.loop)
+                if task is None or task not in self.tasks:
+                    continue
+                root = "event-loop"
+            else:
+                context = _worker_context(frame)
+                if context is None or context.get(_session_var) is not self:
+                    continue
+                root = "thread-pool"
+            self.stacks[_fold(frame, root)] += 1
+            self.samples += 1
+
+    def _run(self):
+        interval = PROFILING_INTERVAL_MS / 1000
+        deadline = self.started + PROFILING_MAX_SECONDS
+        while not self._stop.wait(interval) and time.perf_counter() < deadline:
+            try:
+                self._sample()
+            except Exception as e:
+                logger.warning("⚠️ [PROFILING] Sampling failed for {}: {}", self.profile_id, e)
+                break
+        self._write()
+
+    def _write(self):
+        os.makedirs(PROFILING_DIR, exist_ok=True)
+        path = os.path.join(PROFILING_DIR, f"{self.profile_id}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+        logger.info("🔬 [PROFILING] {} samples over {:.0f} ms written to {}",
+                    self.samples, (time.perf_counter() - self.started) * 1000, path)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling; the profile is written by the sampler thread so the event loop never waits on it"""
+        self._stop.set()
+
+
+def _install_task_factory(loop: asyncio.AbstractEventLoop):
+    """Register every task created inside a profiled request with its session"""
+    if loop in _patched_loops:
+        return
+    previous = loop.get_task_factory()
+
+    def factory(loop, coro, **kwargs):
+        task = previous(loop, coro, **kwargs) if previous else asyncio.Task(coro, loop=loop, **kwargs)
+        context = kwargs.get("context")
+        session = context.get(_session_var) if context is not None else _session_var.get()
+        if session is not None:
+            session.tasks.add(task)
+        return task
+
+    loop.set_task_factory(factory)
+    _patched_loops.add(loop)
+
+
+def start_profile(profile_id: str) -> Optional[ProfileSession]:
+    """Begin sampling the calling request (call from its task, before any work is awaited)"""
+    if not _PROFILE_ID.match(profile_id or ""):
+        return None
+    loop = asyncio.get_running_loop()
+    _install_task_factory(loop)
+    session = ProfileSession(profile_id, loop)
+    session.tasks.add(asyncio.current_task())
+    _session_var.set(session)
+    session.start()
+    logger.info("🔬 [PROFILING] Sampling request {} every {} ms", profile_id, PROFILING_INTERVAL_MS)
+    return session
+
+
+def load_profile(profile_id: str) -> Optional[str]:
+    """Folded stacks of a finished profile, or None"""
+    if not _PROFILE_ID.match(profile_id or ""):
+        return None
+    path = os.path.join(PROFILING_DIR, f"{profile_id}.folded")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read()
@@ -0,0 +1,147 @@
+"""
+Readiness
+Dependency and overload checks for the /ready probe. A background task runs them every
+READINESS_INTERVAL_SECONDS and caches the result, so answering the probe costs nothing even on a busy loop.
+Not ready means: the airport database is unusable, the process is overloaded (event-loop lag, a backed-up
+thread pool, too many plans running, a full admission queue), or the checks themselves have stopped running.
+Upstream error rates and cache state are reported but never make the instance unready, since every instance
+shares the same upstreams.
+  READINESS_INTERVAL_SECONDS     how often the checks run (default 5)
+  READY_MAX_LOOP_LAG_MS          loop lag above this is overload (default 500)
+  READY_MAX_THREAD_QUEUE         to_thread calls waiting for a worker above this is overload (default 32)
+  READY_MAX_PLANS                plans running above this is overload (default 0, no limit)
+  READY_UPSTREAM_ERROR_RATE      share of failed upstream calls since the last check reported as degraded (0.5)
+"""
+import asyncio
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from loguru import logger
+
+from utils.admission import PLAN_ADMISSION
+from utils.airport_autocomplete import autocomplete_warm
+from utils.airport_db import get_database_version
+from utils.llm_cache import LLM_CACHE_ENABLED, cache_stats
+from utils.metrics import EVENT_LOOP_LAG_LAST, PLANS_IN_FLIGHT, UPSTREAM_REQUESTS, Gauge, thread_pool_stats
+
+READINESS_INTERVAL_SECONDS = float(os.getenv("READINESS_INTERVAL_SECONDS", "5"))
+READY_MAX_LOOP_LAG_MS = float(os.getenv("READY_MAX_LOOP_LAG_MS", "500"))
+READY_MAX_THREAD_QUEUE = int(os.getenv("READY_MAX_THREAD_QUEUE", "32"))
+READY_MAX_PLANS = int(os.getenv("READY_MAX_PLANS", "0"))
+READY_UPSTREAM_ERROR_RATE = float(os.getenv("READY_UPSTREAM_ERROR_RATE", "0.5"))
+# An upstream needs this many calls in a window before its error rate counts
+UPSTREAM_MIN_CALLS = 5
+
+_state: Dict[str, Any] = {"ready": False, "checked_at": None, "reasons": ["starting"], "checks": {}}
+_last_upstream: Dict[tuple, float] = {}
+
+READY = Gauge("journezy_ready", "1 when the instance reports ready on /ready", collect=lambda: {(): int(is_ready())})
+
+
+def _check_database() -> Dict[str, Any]:
+    try:
+        return {"ok": True, "version": get_database_version()}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
+def _check_caches() -> Dict[str, Any]:
+    llm_cache: Dict[str, Any] = {"enabled": LLM_CACHE_ENABLED}
+    if LLM_CACHE_ENABLED:
+        try:
+            llm_cache.update(cache_stats())
+        except Exception as e:
+            llm_cache["error"] = str(e)
+    return {"llm_cache": llm_cache, "autocomplete_warm": autocomplete_warm()}
+
+
+def _check_upstreams() -> Dict[str, Any]:
+    """Calls and failures per service since the previous check"""
+    global _last_upstream
+    current = UPSTREAM_REQUESTS.snapshot()
+    window = defaultdict(lambda: {"calls": 0, "errors": 0})
+    for key, count in current.items():
+        service, _, outcome = key
+        delta = count - _last_upstream.get(key, 0)
+        window[service]["calls"] += delta
+        if outcome == "error":
+            window[service]["errors"] += delta
+    _last_upstream = current
+    for counts in window.values():
+        failing = (counts["calls"] >= UPSTREAM_MIN_CALLS
+                   and counts["errors"] / counts["calls"] >= READY_UPSTREAM_ERROR_RATE)
+        counts["state"] = "degraded" if failing else "ok"
+    return dict(window)
+
+
+def _check_load() -> Dict[str, Any]:
+    pool = thread_pool_stats()
+    return {
+        "loop_lag_ms": round(EVENT_LOOP_LAG_LAST.value() * 1000, 1),
+        "plans_in_flight": int(PLANS_IN_FLIGHT.value()),
+        "plans_queued": PLAN_ADMISSION.queued,
+        "thread_pool": pool,
+    }
+
+
+def _overload_reasons(load: Dict[str, Any]) -> List[str]:
+    reasons = []
+    if load["loop_lag_ms"] > READY_MAX_LOOP_LAG_MS:
+        reasons.append(f"event loop lag {load['loop_lag_ms']:.0f} ms")
+    if load["thread_pool"]["queued"] > READY_MAX_THREAD_QUEUE:
+        reasons.append(f"{load['thread_pool']['queued']} calls queued for the thread pool")
+    if READY_MAX_PLANS and load["plans_in_flight"] > READY_MAX_PLANS:
+        reasons.append(f"{load['plans_in_flight']} plans in flight")
+    if PLAN_ADMISSION.limit > 0 and load["plans_queued"] >= PLAN_ADMISSION.queue_max:
+        reasons.append("plan admission queue is full")
+    return reasons
+
+
+async def run_checks() -> Dict[str, Any]:
+    """Run every check once and cache the result; the blocking ones (SQLite) run in a worker thread"""
+    # Load first: the checks below queue on the same thread pool they would be measuring
+    load = _check_load()
+    database, caches = await asyncio.gather(asyncio.to_thread(_check_database), asyncio.to_thread(_check_caches))
+    reasons = _overload_reasons(load)
+    if not database["ok"]:
+        reasons.insert(0, "airport database unavailable")
+    was_ready = _state["ready"]
+    _state.update({
+        "ready": not reasons,
+        "checked_at": time.time(),
+        "reasons": reasons,
+        "checks": {"database": database, "caches": caches, "load": load, "upstreams": _check_upstreams()},
+    })
+    if was_ready and reasons:
+        logger.warning("🚦 [READINESS] Not ready: {}", "; ".join(reasons))
+    elif not was_ready and not reasons:
+        logger.info("🚦 [READINESS] Ready")
+    return _state
+
+
+async def readiness_loop():
+    """Refresh the cached readiness every READINESS_INTERVAL_SECONDS (run as a lifespan task)"""
+    while True:
+        try:
+            await run_checks()
+        except Exception as e:
+            logger.warning("⚠️ [READINESS] Checks failed: {}", e)
+        await asyncio.sleep(READINESS_INTERVAL_SECONDS)
+
+
+def _stale() -> bool:
+    checked_at = _state["checked_at"]
+    return checked_at is None or time.time() - checked_at > 3 * READINESS_INTERVAL_SECONDS
+
+
+def is_ready() -> bool:
+    return _state["ready"] and not _stale()
+
+
+def readiness() -> Dict[str, Any]:
+    """Last cached readiness; checks that stopped refreshing (e.g. a starved loop) count as not ready"""
+    if _stale() and _state["checked_at"] is not None:
+        return {**_state, "ready": False, "reasons": ["readiness checks are stale"] + _state["reasons"]}
+    return _state
@@ -0,0 +1,129 @@
+"""
+SerpAPI Transport
+Single entry point for SerpAPI searches used by the flight, hotel and places tools.
+SERPAPI_MODE selects how searches are served:
+  - live: call SerpAPI (default)
+  - record: call SerpAPI and save each response as a gzipped fixture keyed by normalized params
+  - replay: serve fixtures locally with synthetic latency and optional error injection
+Each search times out after SERPAPI_TIMEOUT_SECONDS (default 30), or sooner when the plan's deadline is closer.
+"""
+import glob
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from typing import Dict, List
+
+from loguru import logger
+from utils.llm_provider import parse_latency, replay_sleep
+from utils.tracing import span, set_attributes
+from utils.deadline import bounded_timeout, check_deadline
+
+SERPAPI_MODE = os.getenv("SERPAPI_MODE", "live").lower()
+SERPAPI_FIXTURES_DIR = os.getenv("SERPAPI_FIXTURES_DIR", "fixtures/serpapi")
+# Same specs as LLM_REPLAY_LATENCY: "recorded", "fixed:MS", "uniform:MIN_MS:MAX_MS", "lognormal:MEDIAN_MS:SIGMA"
+SERPAPI_REPLAY_LATENCY = os.getenv("SERPAPI_REPLAY_LATENCY", "recorded")
+SERPAPI_REPLAY_STRICT = os.getenv("SERPAPI_REPLAY_STRICT", "false").lower() in ("1", "true", "yes")
+# Fraction of replayed searches that fail; "error" returns SerpAPI's {"error": ...} body, "exception" raises
+SERPAPI_REPLAY_ERROR_RATE = float(os.getenv("SERPAPI_REPLAY_ERROR_RATE", "0"))
+SERPAPI_REPLAY_ERROR_MODE = os.getenv("SERPAPI_REPLAY_ERROR_MODE", "error")
+SERPAPI_TIMEOUT_SECONDS = float(os.getenv("SERPAPI_TIMEOUT_SECONDS", "30"))
+
+# Parameters that don't change the answer
+_IGNORED_PARAMS = {"api_key", "output", "no_cache", "async"}
+
+_replay_latency = parse_latency(SERPAPI_REPLAY_LATENCY)
+_fixtures_by_engine: Dict[str, List[str]] = {}
+
+
+def normalize_params(params: Dict) -> Dict:
+    """Drop credentials and empty values, stringify, and collapse whitespace/case in free-text queries"""
+    normalized = {}
+    for key, value in params.items():
+        if key in _IGNORED_PARAMS or value is None or value == "":
+            continue
+        value = str(value).strip()
+        if key == "q":
+            value = re.sub(r"\s+", " ", value).lower()
+        normalized[key] = value
+    return dict(sorted(normalized.items()))
+
+
+def fixture_path(params: Dict) -> str:
+    """Fixture file for a search: <engine>-<hash of normalized params>.json.gz"""
+    normalized = normalize_params(params)
+    digest = hashlib.sha256(json.dumps(normalized).encode()).hexdigest()[:24]
+    return os.path.join(SERPAPI_FIXTURES_DIR, f"{normalized.get('engine', 'search')}-{digest}.json.gz")
+
+
+def _live_search(params: Dict, timeout: float) -> Dict:
+    from serpapi import GoogleSearch
+    # Same as GoogleSearch.get_dict(), but keeps the raw response so its size can be traced
+    search = GoogleSearch({**params, "output": "json"})
+    search.timeout = timeout
+    response = search.get_response()
+    set_attributes(payload_bytes=len(response.content))
+    return json.loads(response.text)
+
+
+def _record(params: Dict, timeout: float) -> Dict:
+    started = time.perf_counter()
+    results = _live_search(params, timeout)
+    latency_ms = round((time.perf_counter() - started) * 1000, 1)
+    if "error" not in results:
+        path = fixture_path(params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fixture = {"params": normalize_params(params), "latency_ms": latency_ms, "recorded_at": int(time.time()),
+                   "response": results}
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(fixture, f)
+        logger.debug("📼 [SERPAPI] Recorded {} ({} ms)", path, latency_ms)
+    return results
+
+
+def _load_fixture(path: str) -> Dict:
+    with gzip.open(path, "rb") as f:
+        data = f.read()
+    set_attributes(payload_bytes=len(data), fixture=os.path.basename(path))
+    return json.loads(data)
+
+
+def _replay(params: Dict, timeout: float) -> Dict:
+    path = fixture_path(params)
+    if not os.path.exists(path):
+        engine = normalize_params(params).get("engine", "search")
+        if engine not in _fixtures_by_engine:
+            _fixtures_by_engine[engine] = sorted(glob.glob(os.path.join(SERPAPI_FIXTURES_DIR, f"{engine}-*.json.gz")))
+        candidates = _fixtures_by_engine[engine]
+        if SERPAPI_REPLAY_STRICT or not candidates:
+            raise LookupError(f"No SerpAPI fixture for {normalize_params(params)}")
+        # Dates and queries vary between runs, so stand in with a fixture from the same engine
+        path = candidates[int(hashlib.sha256(path.encode()).hexdigest(), 16) % len(candidates)]
+
+    fixture = _load_fixture(path)
+    replay_sleep(_replay_latency(fixture.get("latency_ms")), timeout, "SerpAPI search")
+
+    if SERPAPI_REPLAY_ERROR_RATE and random.random() < SERPAPI_REPLAY_ERROR_RATE:
+        if SERPAPI_REPLAY_ERROR_MODE == "exception":
+            raise ConnectionError("Injected SerpAPI replay failure")
+        return {"error": "Injected SerpAPI replay error"}
+    return fixture["response"]
+
+
+def serp_search(params: Dict) -> Dict:
+    """Run a SerpAPI search in the configured mode and return the response dict"""
+    with span("serpapi.search", engine=params.get("engine", "search"), mode=SERPAPI_MODE) as search_span:
+        check_deadline("SerpAPI search")
+        timeout = bounded_timeout(SERPAPI_TIMEOUT_SECONDS)
+        if SERPAPI_MODE == "replay":
+            results = _replay(params, timeout)
+        elif SERPAPI_MODE == "record":
+            results = _record(params, timeout)
+        else:
+            results = _live_search(params, timeout)
+        if isinstance(results, dict) and "error" in results:
+            search_span.record_error(results["error"])
+        return results
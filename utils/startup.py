@@ -0,0 +1,96 @@
+"""
+Startup
+Cold-start bookkeeping and warm-up for the FastAPI lifespan. Each startup phase is timed; the timings are
+logged and exported as journezy_startup_phase_seconds. The warm-up imports the heavy SDKs (which load lazily
+everywhere else), creates the shared Gemini clients and renders a tiny Markdown and PDF document, so the
+first request doesn't pay for any of it.
+  STARTUP_WARMUP   wait (default): finish warm-up before serving; background: serve at once; off: skip
+"""
+import importlib
+import io
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from loguru import logger
+
+from utils.gemini_clients import init_gemini_clients
+from utils.metrics import Gauge
+
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "wait").lower()
+
+# Imported in this order by the warm-up; together they are most of a cold process's import time
+WARMUP_MODULES = (
+    "google.genai",
+    "google.generativeai",
+    "serpapi",
+    "markdown",
+    "xhtml2pdf.pisa",
+)
+
+STARTUP_TIMINGS: Dict[str, float] = {}
+_process_started = time.perf_counter()
+
+STARTUP_PHASE_SECONDS = Gauge("journezy_startup_phase_seconds", "Duration of each startup phase", ("phase",),
+                              collect=lambda: {(phase,): ms / 1000 for phase, ms in list(STARTUP_TIMINGS.items())})
+
+
+@contextmanager
+def startup_phase(name: str):
+    """Time one lifespan phase into STARTUP_TIMINGS (ms)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def since_process_start_ms() -> float:
+    """Milliseconds since this module was imported, i.e. roughly since the app started importing"""
+    return round((time.perf_counter() - _process_started) * 1000, 1)
+
+
+def warm_imports() -> Dict[str, float]:
+    """Import the heavy optional modules; returns ms per module (missing ones are skipped)"""
+    timings = {}
+    for name in WARMUP_MODULES:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            logger.debug("⏭️ [STARTUP] Not warming {}: {}", name, e)
+            continue
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    return timings
+
+
+def warm_renderers():
+    """Run markdown and xhtml2pdf once so their parsers, CSS defaults and fonts are loaded"""
+    try:
+        import markdown
+        html = markdown.markdown("# Warm-up\n\n| a | b |\n|---|---|\n| 1 | 2 |", extensions=['tables', 'fenced_code'])
+    except ImportError:
+        html = "<h1>Warm-up</h1>"
+    try:
+        from xhtml2pdf import pisa
+        pisa.CreatePDF(f"<html><body>{html}</body></html>", dest=io.BytesIO())
+    except ImportError:
+        pass
+
+
+def warm_up() -> Dict[str, float]:
+    """Blocking warm-up (run it in a worker thread); returns ms per step"""
+    timings = {f"import {name}": ms for name, ms in warm_imports().items()}
+    started = time.perf_counter()
+    init_gemini_clients()
+    timings["gemini_clients"] = round((time.perf_counter() - started) * 1000, 1)
+    started = time.perf_counter()
+    try:
+        warm_renderers()
+    except Exception as e:
+        logger.warning("⚠️ [STARTUP] Renderer warm-up failed: {}", e)
+    timings["renderers"] = round((time.perf_counter() - started) * 1000, 1)
+    STARTUP_TIMINGS.update({f"warmup {step}": ms for step, ms in timings.items()})
+    logger.info("🔥 [STARTUP] Warm-up done: {}", ", ".join(f"{k} {v:.0f} ms" for k, v in timings.items()))
+    return timings
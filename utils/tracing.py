@@ -0,0 +1,362 @@
+"""
+Tracing
+Lightweight spans for the planning workflow and its upstream calls (Gemini, SerpAPI, PDF rendering).
+The active span is kept in a contextvar, so spans nest across awaits and asyncio.to_thread calls.
+Finished spans are batched on a background thread and exported as:
+  - jsonl: one JSON object per span appended to TRACE_EXPORT_PATH (default), which is rotated to
+    TRACE_EXPORT_PATH.1 once it reaches TRACE_EXPORT_MAX_MB
+  - otlp: OTLP/HTTP JSON posted to TRACE_OTLP_ENDPOINT (an OpenTelemetry collector, Jaeger, Tempo...)
+  - none: spans are timed but not exported
+At most TRACE_QUEUE_MAX spans wait for export; beyond that they are dropped and counted. Requests to
+TRACE_SAMPLED_PATHS (default /plan-trip) are always exported, other requests with probability
+TRACE_SAMPLE_RATE. TRACING_ENABLED=false stops all export, but spans are still timed and passed to the
+span listeners, so the metrics and diagnostics built on them keep working.
+"""
+import contextvars
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() not in ("0", "false", "no")
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "jsonl").lower()
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "traces/spans.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "journezy-trip-planner")
+TRACE_EXPORT_MAX_BYTES = int(float(os.getenv("TRACE_EXPORT_MAX_MB", "64")) * 1024 * 1024)
+TRACE_QUEUE_MAX = int(os.getenv("TRACE_QUEUE_MAX", "10000"))
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_SAMPLED_PATHS = {path.strip() for path in os.getenv("TRACE_SAMPLED_PATHS", "/plan-trip").split(",")
+                       if path.strip()}
+
+EXPORT_BATCH_SIZE = 256
+EXPORT_INTERVAL_SECONDS = 1.0
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation with attributes; ending it exports it and restores the previous active span"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes",
+                 "status", "error", "sampled", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any],
+                 sampled: bool = True):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.status = "ok"
+        self.error = None
+        # Unsampled spans still reach the span listeners (metrics), they are just not exported
+        self.sampled = sampled
+        self._token = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def record_error(self, error: Any):
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else str(error)
+
+    def end(self, error: Any = None):
+        if self.end_ns is not None:
+            return
+        if error is not None:
+            self.record_error(error)
+        self.end_ns = time.time_ns()
+        if self._token is not None:
+            try:
+                _current_span.reset(self._token)
+            except ValueError:
+                # Ended from a different context than it started in; nothing to restore
+                pass
+            self._token = None
+        _export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stand-in when there is no active span; accepts every call and records nothing"""
+
+    trace_id = None
+    span_id = None
+    sampled = False
+    duration_ms = 0.0
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def record_error(self, error):
+        pass
+
+    def end(self, error=None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def new_trace_id() -> str:
+    return os.urandom(16).hex()
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[tuple]:
+    """(trace_id, parent span_id) from a W3C traceparent header, or None"""
+    parts = (header or "").strip().split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16 and parts[1] != "0" * 32:
+        return parts[1], parts[2]
+    return None
+
+
+def sample_request(path: str, continued: bool = False) -> bool:
+    """Whether a request's trace is exported: always for TRACE_SAMPLED_PATHS and continued traces"""
+    return continued or path in TRACE_SAMPLED_PATHS or random.random() < TRACE_SAMPLE_RATE
+
+
+def start_span(name: str, *, trace_id: Optional[str] = None, parent_id: Optional[str] = None,
+               sampled: Optional[bool] = None, **attributes: Any):
+    """
+    Start a span and make it the active one; the caller must call end().
+    With no active span and no trace_id this starts a new trace. sampled defaults to the parent's,
+    and is always False with TRACING_ENABLED=false.
+    """
+    parent = _current_span.get()
+    if trace_id is None:
+        trace_id = parent.trace_id if parent is not None else new_trace_id()
+        if parent is not None and parent_id is None:
+            parent_id = parent.span_id
+    if not TRACING_ENABLED:
+        sampled = False
+    elif sampled is None:
+        sampled = parent.sampled if parent is not None else True
+    span_obj = Span(name, trace_id, parent_id, attributes, sampled)
+    span_obj._token = _current_span.set(span_obj)
+    return span_obj
+
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """Context manager form of start_span; an escaping exception marks the span as failed"""
+    span_obj = start_span(name, **attributes)
+    try:
+        yield span_obj
+    except BaseException as e:
+        span_obj.end(error=e)
+        raise
+    else:
+        span_obj.end()
+
+
+def current_span():
+    """Active span (a no-op span when there is none)"""
+    return _current_span.get() or NOOP_SPAN
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace ID of the active span, if its trace is being exported"""
+    active = _current_span.get()
+    return active.trace_id if active is not None and active.sampled else None
+
+
+def set_attributes(**attributes: Any):
+    """Attach attributes to the active span, if any"""
+    active = _current_span.get()
+    if active is not None:
+        active.attributes.update(attributes)
+
+
+# --- Export -----------------------------------------------------------------
+
+_export_queue: "queue.Queue[Span]" = queue.Queue(maxsize=TRACE_QUEUE_MAX)
+_exporter_thread: Optional[threading.Thread] = None
+_exporter_lock = threading.Lock()
+_stop = threading.Event()
+_span_listeners: List = []
+# Spans lost on the way out, by reason (queue_full, export_failed)
+_dropped: Dict[str, int] = {"queue_full": 0, "export_failed": 0}
+_dropped_lock = threading.Lock()
+# An unreachable collector fails every batch; warn at most once per interval with the running total
+EXPORT_FAILURE_LOG_INTERVAL_SECONDS = 60.0
+_last_failure_log = float("-inf")
+_unlogged_failures = 0
+
+
+def add_span_listener(listener):
+    """Call listener(span) for every finished span, on the thread that ended it (e.g. for metrics)"""
+    _span_listeners.append(listener)
+
+
+def export_queue_depth() -> int:
+    return _export_queue.qsize()
+
+
+def dropped_spans() -> Dict[str, int]:
+    with _dropped_lock:
+        return dict(_dropped)
+
+
+def _count_dropped(reason: str, count: int):
+    with _dropped_lock:
+        _dropped[reason] += count
+
+
+def _export(span_obj: Span):
+    for listener in _span_listeners:
+        try:
+            listener(span_obj)
+        except Exception as e:
+            logger.warning("⚠️ [TRACING] Span listener failed: {}", e)
+    if TRACE_EXPORTER == "none" or not span_obj.sampled:
+        return
+    _ensure_exporter()
+    try:
+        _export_queue.put_nowait(span_obj)
+    except queue.Full:
+        # The exporter can't keep up (e.g. an unreachable collector); never block or grow without bound
+        _count_dropped("queue_full", 1)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Span]) -> Dict[str, Any]:
+    """OTLP/HTTP JSON body for a batch of spans"""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{
+            "scope": {"name": "journezy.tracing"},
+            "spans": [{
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                "name": s.name,
+                "kind": 1,
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items() if v is not None],
+                "status": {"code": 2, "message": s.error or ""} if s.status == "error" else {"code": 1},
+            } for s in spans],
+        }],
+    }]}
+
+
+def _write_batch(batch: List[Span]):
+    if TRACE_EXPORTER == "otlp":
+        body = json.dumps(to_otlp(batch)).encode()
+        request = urllib.request.Request(TRACE_OTLP_ENDPOINT, data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+        urllib.request.urlopen(request, timeout=5).close()
+        return
+    directory = os.path.dirname(os.path.abspath(TRACE_EXPORT_PATH))
+    os.makedirs(directory, exist_ok=True)
+    try:
+        if os.path.getsize(TRACE_EXPORT_PATH) >= TRACE_EXPORT_MAX_BYTES:
+            # Keep one previous file, so the spans on disk never exceed about twice the limit
+            os.replace(TRACE_EXPORT_PATH, TRACE_EXPORT_PATH + ".1")
+    except FileNotFoundError:
+        pass
+    with open(TRACE_EXPORT_PATH, "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(s.to_dict(), default=str) + "\n" for s in batch))
+
+
+def _drain(max_items: int) -> List[Span]:
+    batch = []
+    while len(batch) < max_items:
+        try:
+            batch.append(_export_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _export_loop():
+    while not _stop.is_set():
+        _stop.wait(EXPORT_INTERVAL_SECONDS)
+        flush()
+
+
+def flush():
+    """Write out every queued span (called periodically and on shutdown)"""
+    while True:
+        batch = _drain(EXPORT_BATCH_SIZE)
+        if not batch:
+            return
+        try:
+            _write_batch(batch)
+        except Exception as e:
+            _count_dropped("export_failed", len(batch))
+            _log_export_failure(len(batch), e)
+
+
+def _log_export_failure(count: int, error: Exception):
+    global _last_failure_log, _unlogged_failures
+    _unlogged_failures += count
+    now = time.monotonic()
+    if now - _last_failure_log < EXPORT_FAILURE_LOG_INTERVAL_SECONDS:
+        return
+    logger.warning("⚠️ [TRACING] Dropped {} spans, export failed: {}", _unlogged_failures, error)
+    _last_failure_log = now
+    _unlogged_failures = 0
+
+
+def _ensure_exporter():
+    global _exporter_thread
+    if _exporter_thread is None:
+        with _exporter_lock:
+            if _exporter_thread is None:
+                _stop.clear()
+                _exporter_thread = threading.Thread(target=_export_loop, name="trace-exporter", daemon=True)
+                _exporter_thread.start()
+
+
+def shutdown_tracing():
+    """Stop the exporter thread and flush what is left"""
+    global _exporter_thread
+    _stop.set()
+    thread, _exporter_thread = _exporter_thread, None
+    if thread is not None:
+        thread.join(timeout=5)
+    flush()
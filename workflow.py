@@ -1,16 +1,22 @@
 from typing import Any
 from datetime import datetime, timedelta
 import os
-import tempfile
+import io
 import base64
 import asyncio
+import time
 
+from loguru import logger
 from tools.flights import find_flights
 from grounding_service import GroundedFlightFinder
 from tools.hotels import find_hotels
 from tools.places import find_places_to_visit
 from agents.deligator import extract_tour_information
 from agents.itinerary_writer import write_itinerary
+from utils.tracing import span, start_span, set_attributes
+from utils.metrics import PDF_RENDERS_IN_PROGRESS
+from utils.memory import start_stage_memory, end_stage_memory
+from utils.deadline import current_deadline, start_deadline, skip_optional, PDF_RESERVE_SECONDS
 
 
 
@@ -32,14 +38,41 @@ class TourPlannerWorkflow:
         self.consider_toddler_friendly = False
         self.consider_senior_friendly = False
         self.safety_check = True
+        # Wall-clock milliseconds per workflow stage, for Server-Timing and load tests
+        self.stage_timings = {}
+        # Which search produced self.flights_data: grounded, serpapi, none or skipped (no airports)
+        self.flights_source = None
+        # Retained/peak KiB per stage when MEMORY_PROFILING is on (see utils/memory.py)
+        self.stage_memory = {}
+        self._stage = None
+
+    def _start_stage(self, stage: str):
+        """End the running stage and open a tracing span for the next one"""
+        self._end_stage()
+        self._stage = (stage, start_span(f"workflow.{stage}"), time.perf_counter(), start_stage_memory())
+
+    def _end_stage(self, error: Exception | None = None, **attributes):
+        """Close the running stage's span and record its duration"""
+        if self._stage is None:
+            return
+        stage, stage_span, started, memory_baseline = self._stage
+        self._stage = None
+        memory = end_stage_memory(memory_baseline)
+        if memory:
+            self.stage_memory[stage] = memory
+            logger.debug("🧠 [WORKFLOW] {} memory: retained {} KiB, peak {} KiB (heap {} KiB)", stage,
+                         memory["mem_retained_kib"], memory["mem_peak_kib"], memory["mem_heap_kib"])
+        stage_span.set_attributes(**attributes, **memory)
+        stage_span.end(error=error)
+        self.stage_timings[stage] = round((time.perf_counter() - started) * 1000, 1)
 
     async def run(self, query: str, *, budget_amount: float | None = None, currency: str = "USD", 
                   travelers=None, flight_preferences=None,
                   consider_toddler_friendly: bool = False, consider_senior_friendly: bool = False,
                   safety_check: bool = True) -> str:
         """Main workflow execution using Gemini directly"""
-        print("🤖 [WORKFLOW] Starting workflow...")
-        print(f"📝 [WORKFLOW] Query: {query}")
+        logger.debug("🤖 [WORKFLOW] Starting workflow...")
+        logger.debug("📝 [WORKFLOW] Query: {}", query)
 
         # Store the new parameters
         self.travelers = travelers
@@ -48,31 +81,39 @@ class TourPlannerWorkflow:
         self.consider_senior_friendly = consider_senior_friendly
         self.safety_check = safety_check
 
-        try:
-            # Add timeout to prevent infinite running
-            return await asyncio.wait_for(
-                self._execute_workflow(query, budget_amount, currency),
-                timeout=300.0  # 5 minutes timeout
-            )
-        except asyncio.TimeoutError:
-            print("⏰ [WORKFLOW] Workflow timed out after 5 minutes")
-            return "Error: Trip planning timed out. Please try again with a simpler request."
-        except Exception as e:
-            print(f"❌ [WORKFLOW] Unexpected error: {str(e)}")
-            return f"Error: {str(e)}"
+        # The caller's deadline (main.py starts one per request), or a fresh PLAN_DEADLINE_SECONDS budget
+        deadline = current_deadline() or start_deadline()
+        with span("workflow.plan", language=self.language) as plan_span:
+            try:
+                # Hard stop at the deadline; the stages skip optional work well before it. Blocking stage work runs
+                # in worker threads, so the timeout fires mid-stage; the abandoned thread finishes its current
+                # upstream call and starts no new ones (check_deadline)
+                return await asyncio.wait_for(
+                    self._execute_workflow(query, budget_amount, currency),
+                    timeout=max(deadline.remaining(), 0.0)
+                )
+            except asyncio.TimeoutError:
+                logger.warning("⏰ [WORKFLOW] Workflow hit its deadline (skipped: {})", deadline.skipped or "nothing")
+                plan_span.record_error("deadline exceeded")
+                return "Error: Trip planning timed out. Please try again with a simpler request."
+            except Exception as e:
+                logger.error("❌ [WORKFLOW] Unexpected error: {}", str(e))
+                plan_span.record_error(e)
+                return f"Error: {str(e)}"
 
     async def _execute_workflow(self, query: str, budget_amount: float | None = None, currency: str = "USD") -> str:
         """Execute the actual workflow logic"""
         try:
             # Step 1: Extract tour information with Gemini
-            print("🎯 [WORKFLOW] Step 1: Extracting tour information with Gemini...")
-            extracted_info = extract_tour_information(query)
+            self._start_stage("extract")
+            logger.info("🎯 [WORKFLOW] Step 1: Extracting tour information with Gemini...")
+            extracted_info = await asyncio.to_thread(extract_tour_information, query)
             if not extracted_info.tour_info:
-                print(f"❌ [WORKFLOW] Failed to extract tour info: {extracted_info.reasoning}")
+                logger.error("❌ [WORKFLOW] Failed to extract tour info: {}", extracted_info.reasoning)
                 return f"Failed to plan the tour. Possible reason: {extracted_info.reasoning}"
 
             destination = extracted_info.tour_info.destination
-            print(f"✅ [WORKFLOW] Extracted destination: {destination}")
+            logger.info("✅ [WORKFLOW] Extracted destination: {}", destination)
 
             # Determine trip dates for nights calculation
             start_date = extracted_info.tour_info.departure_date
@@ -86,7 +127,10 @@ class TourPlannerWorkflow:
                 nights = 0
 
             # Step 2: Flights - prefer Gemini Grounding, then fallback to SerpAPI
-            print("[WORKFLOW] Step 2: Finding flights (grounded first)...")
+            set_attributes(destination=destination, airport_from=extracted_info.tour_info.airport_from,
+                           airport_to=extracted_info.tour_info.airport_to)
+            self._start_stage("flights")
+            logger.info("[WORKFLOW] Step 2: Finding flights (grounded first)...")
 
             def has_flight_lines(formatted: str) -> bool:
                 if not formatted:
@@ -106,8 +150,9 @@ class TourPlannerWorkflow:
 
             # Check if we have valid airports
             if not from_list or not to_list:
-                print("[WORKFLOW] No valid airports found, skipping flight search")
+                logger.info("[WORKFLOW] No valid airports found, skipping flight search")
                 self.flights_data = ""
+                self.flights_source = "skipped"
             else:
                 # 2.a Grounded primary
                 grounded_found = False
@@ -123,15 +168,16 @@ class TourPlannerWorkflow:
                     if has_flight_lines(grounded):
                         flights_formatted = grounded
                         grounded_found = True
-                        print("[WORKFLOW] Grounded flight search returned results")
+                        logger.info("[WORKFLOW] Grounded flight search returned results")
                 except Exception as _ge:
-                    print(f"[WORKFLOW] Grounded flight search error: {_ge}")
+                    logger.info("[WORKFLOW] Grounded flight search error: {}", _ge)
 
                 if grounded_found:
                     # If it's a round-trip, append reverse leg using the same primary airports
-                    if extracted_info.tour_info.return_date:
+                    if extracted_info.tour_info.return_date and not skip_optional("flights.reverse_leg"):
                         try:
-                            reverse_text = find_flights(
+                            reverse_text = await asyncio.to_thread(
+                                find_flights,
                                 to_list[0],
                                 from_list[0],
                                 extracted_info.tour_info.return_date,
@@ -149,17 +195,25 @@ class TourPlannerWorkflow:
                             pass
                     # Keep only top 3 cheapest for each direction when possible
                     self.flights_data = flights_formatted
-                    print("[WORKFLOW] Flights data set from grounded search")
+                    self.flights_source = "grounded"
+                    set_attributes(flights_source="grounded")
+                    logger.info("[WORKFLOW] Flights data set from grounded search")
                 else:
-                    print("[WORKFLOW] Grounded empty; trying SerpAPI...")
+                    logger.info("[WORKFLOW] Grounded empty; trying SerpAPI...")
                     found = False
                     selected_pair = (None, None)
+                    serpapi_attempts = 0
                     for dep in from_list:
                         if found:
                             break
                         for arr in to_list:
+                            # Only the primary pair is essential; alternative airports wait for spare time
+                            if serpapi_attempts and skip_optional("flights.alternative_airports"):
+                                break
+                            serpapi_attempts += 1
                             try:
-                                candidate = find_flights(
+                                candidate = await asyncio.to_thread(
+                                    find_flights,
                                     dep,
                                     arr,
                                     extracted_info.tour_info.departure_date,
@@ -178,11 +232,15 @@ class TourPlannerWorkflow:
                                     break
                             except Exception:
                                 continue
+                    self.flights_source = "serpapi" if found else "none"
+                    set_attributes(flights_source=self.flights_source, serpapi_attempts=serpapi_attempts)
                     if found:
                         # Add a separate return one-way if possible
-                        if extracted_info.tour_info.return_date and selected_pair[0] and selected_pair[1]:
+                        if (extracted_info.tour_info.return_date and selected_pair[0] and selected_pair[1]
+                                and not skip_optional("flights.reverse_leg")):
                             try:
-                                reverse_text = find_flights(
+                                reverse_text = await asyncio.to_thread(
+                                    find_flights,
                                     selected_pair[1],
                                     selected_pair[0],
                                     extracted_info.tour_info.return_date,
@@ -199,13 +257,15 @@ class TourPlannerWorkflow:
                             except Exception:
                                 pass
                         self.flights_data = flights_formatted
-                        print(f"[WORKFLOW] Flights data retrieved via SerpAPI for {selected_pair[0]} -> {selected_pair[1]}")
+                        logger.info("[WORKFLOW] Flights data retrieved via SerpAPI for {} -> {}", selected_pair[0], selected_pair[1])
                     else:
                         self.flights_data = ""
-                        print("[WORKFLOW] No flights found from grounded or SerpAPI")
+                        logger.info("[WORKFLOW] No flights found from grounded or SerpAPI")
 
             # Step 3: Find hotels
-            print("🏨 [WORKFLOW] Step 3: Finding hotels...")
+            self._end_stage(flights_bytes=len(self.flights_data or ""))
+            self._start_stage("hotels")
+            logger.info("🏨 [WORKFLOW] Step 3: Finding hotels...")
             _check_in = extracted_info.tour_info.departure_date
             _check_out = extracted_info.tour_info.return_date
             try:
@@ -218,7 +278,8 @@ class TourPlannerWorkflow:
                 pass
             # Enforce hotel budget cap if budget present
             remaining_currency = (currency or "USD").upper()
-            self.hotels_data = find_hotels(
+            self.hotels_data = await asyncio.to_thread(
+                find_hotels,
                 extracted_info.tour_info.destination,
                 _check_in,
                 _check_out,
@@ -275,40 +336,51 @@ class TourPlannerWorkflow:
                         self.hotels_data = header + "\n\n" + "\n\n".join(within_cap[:3]) + "\n"
                 except Exception:
                     pass
-            print(f"✅ [WORKFLOW] Hotels data retrieved")
+            logger.info("✅ [WORKFLOW] Hotels data retrieved")
 
             # Step 4: Find places to visit
-            print("📍 [WORKFLOW] Step 4: Finding places...")
+            self._end_stage(hotels_bytes=len(self.hotels_data or ""))
+            self._start_stage("places")
+            logger.info("📍 [WORKFLOW] Step 4: Finding places...")
             try:
-                self.places_data = find_places_to_visit(
-                    destination, 
+                self.places_data = await asyncio.to_thread(
+                    find_places_to_visit,
+                    destination,
                     toddler_friendly=self.consider_toddler_friendly,
                     senior_friendly=self.consider_senior_friendly
                 )
-                print(f"✅ [WORKFLOW] Places data retrieved: {len(self.places_data) if self.places_data else 0} characters")
+                logger.info("✅ [WORKFLOW] Places data retrieved: {} characters", len(self.places_data) if self.places_data else 0)
             except Exception as e:
-                print(f"❌ [WORKFLOW] Error finding places: {str(e)}")
+                logger.error("❌ [WORKFLOW] Error finding places: {}", str(e))
                 # Create fallback places data
-                self.places_data = f"Here are the top places to visit in {destination}:\n\n"
-                self.places_data += f"{destination} City Center\n"
-                self.places_data += "Description: Explore the vibrant heart of the city\n"
-                self.places_data += "Rating: 4.2 (Popular destination)\n"
-                self.places_data += "Price: Free Entry\n"
-                self.places_data += "Image: N/A\n\n"
-                self.places_data += f"{destination} Historic Area\n"
-                self.places_data += "Description: Discover local history and architecture\n"
-                self.places_data += "Rating: 4.3 (Historical significance)\n"
-                self.places_data += "Price: Free Entry\n"
-                self.places_data += "Image: N/A\n\n"
-                self.places_data += f"Local Attractions\n"
-                self.places_data += "Description: Popular local sights and activities\n"
-                self.places_data += "Rating: 4.0 (Various options)\n"
-                self.places_data += "Price: Varies\n"
-                self.places_data += "Image: N/A\n"
-                print(f"✅ [WORKFLOW] Created fallback places data")
+                self.places_data = "\n".join([
+                    f"Here are the top places to visit in {destination}:",
+                    "",
+                    f"{destination} City Center",
+                    "Description: Explore the vibrant heart of the city",
+                    "Rating: 4.2 (Popular destination)",
+                    "Price: Free Entry",
+                    "Image: N/A",
+                    "",
+                    f"{destination} Historic Area",
+                    "Description: Discover local history and architecture",
+                    "Rating: 4.3 (Historical significance)",
+                    "Price: Free Entry",
+                    "Image: N/A",
+                    "",
+                    "Local Attractions",
+                    "Description: Popular local sights and activities",
+                    "Rating: 4.0 (Various options)",
+                    "Price: Varies",
+                    "Image: N/A",
+                    "",
+                ])
+                logger.info("✅ [WORKFLOW] Created fallback places data")
 
             # Step 5: Generate itinerary using Gemini
-            print("📄 [WORKFLOW] Step 5: Generating itinerary with Gemini...")
+            self._end_stage(places_bytes=len(self.places_data or ""))
+            self._start_stage("itinerary")
+            logger.debug("📄 [WORKFLOW] Step 5: Generating itinerary with Gemini...")
 
             # Budget-aware context preparation (no currency conversion; API returns desired currency)
             budget_summary_note = ""
@@ -346,85 +418,98 @@ class TourPlannerWorkflow:
                 except Exception:
                     budget_summary_note = f"Budget: {budget_amount} {user_currency}. (Estimation unavailable)"
 
+            # Sights info for the itinerary prompt: the places summary plus the trip context, joined once
+            sights_parts = [self.places_data]
+            if budget_summary_note:
+                sights_parts.extend(["\n\n", budget_summary_note])
+
             # Prepare traveler context for itinerary
-            traveler_context = ""
             if self.travelers:
-                traveler_context = f"\n\nTraveler Information:\n"
-                traveler_context += f"- Adults: {self.travelers.adults}\n"
-                traveler_context += f"- Children: {self.travelers.children}\n"
-                traveler_context += f"- Seniors: {self.travelers.seniors}\n"
-                traveler_context += f"- Children under 5: {self.travelers.children_under_5}\n"
+                sights_parts.extend([
+                    "\n\nTraveler Information:\n",
+                    f"- Adults: {self.travelers.adults}\n",
+                    f"- Children: {self.travelers.children}\n",
+                    f"- Seniors: {self.travelers.seniors}\n",
+                    f"- Children under 5: {self.travelers.children_under_5}\n",
+                ])
                 if self.travelers.itinerary_based_passengers:
-                    traveler_context += f"- Itinerary should be tailored to passenger types\n"
+                    sights_parts.append("- Itinerary should be tailored to passenger types\n")
 
             # Add special considerations
-            special_considerations = ""
             if self.consider_toddler_friendly:
-                special_considerations += "\n- Include toddler-friendly activities and accommodations\n"
+                sights_parts.append("\n- Include toddler-friendly activities and accommodations\n")
             if self.consider_senior_friendly:
-                special_considerations += "\n- Include senior citizen-friendly activities and accommodations\n"
+                sights_parts.append("\n- Include senior citizen-friendly activities and accommodations\n")
 
             # Add flight preferences context
-            flight_prefs_context = ""
             if self.flight_preferences:
-                flight_prefs_context = "\n\nFlight Preferences:\n"
+                sights_parts.append("\n\nFlight Preferences:\n")
                 if self.flight_preferences.avoid_red_eye:
-                    flight_prefs_context += "- Avoid red-eye flights\n"
+                    sights_parts.append("- Avoid red-eye flights\n")
                 if self.flight_preferences.avoid_early_morning:
-                    flight_prefs_context += "- Avoid early morning flights (before 8 AM)\n"
+                    sights_parts.append("- Avoid early morning flights (before 8 AM)\n")
                 if self.flight_preferences.child_friendly:
-                    flight_prefs_context += "- Prefer child-friendly flight times\n"
+                    sights_parts.append("- Prefer child-friendly flight times\n")
                 if self.flight_preferences.senior_friendly:
-                    flight_prefs_context += "- Prefer senior-friendly flight times\n"
+                    sights_parts.append("- Prefer senior-friendly flight times\n")
                 if self.flight_preferences.direct_flights_only:
-                    flight_prefs_context += "- Prefer direct flights only\n"
+                    sights_parts.append("- Prefer direct flights only\n")
 
             # Add safety information if requested
-            safety_context = ""
             if self.safety_check:
-                safety_context = "\n\nSafety Information:\n- Consider travel safety and current conditions\n- Provide safety tips for the destination\n"
+                sights_parts.append("\n\nSafety Information:\n- Consider travel safety and current conditions\n- Provide safety tips for the destination\n")
 
-            self.itinerary = write_itinerary(
+            self.itinerary = await asyncio.to_thread(
+                write_itinerary,
                 query,
                 destination,
                 flights_info=self.flights_data,
                 hotels_info=self.hotels_data,
-                sights_info=(self.places_data + ("\n\n" + budget_summary_note if budget_summary_note else "") + 
-                           traveler_context + special_considerations + flight_prefs_context + safety_context),
+                sights_info="".join(sights_parts),
                 language=self.language,
             )
-            print(f"✅ [WORKFLOW] Itinerary generated")
+            logger.info("✅ [WORKFLOW] Itinerary generated")
 
             # Generate PDF from the markdown itinerary
-            print("📄 [WORKFLOW] Converting itinerary to PDF...")
+            self._end_stage(itinerary_bytes=len(self.itinerary or ""))
+            self._start_stage("pdf")
+            logger.debug("📄 [WORKFLOW] Converting itinerary to PDF...")
             pdf_base64 = await self._generate_pdf_from_markdown(self.itinerary)
-            print(f"✅ [WORKFLOW] PDF generated successfully")
-            print(f"📊 [WORKFLOW] PDF data length: {len(pdf_base64)} characters")
-            print(f"🎯 [WORKFLOW] PDF data ready for download")
+            self._end_stage(document_bytes=len(pdf_base64 or ""))
+            logger.info("✅ [WORKFLOW] PDF generated successfully")
+            logger.debug("📊 [WORKFLOW] PDF data length: {} characters", len(pdf_base64))
+            logger.info("🎯 [WORKFLOW] PDF data ready for download")
 
             return pdf_base64
 
         except Exception as e:
-            print(f"❌ [WORKFLOW] Error: {str(e)}")
+            logger.error("❌ [WORKFLOW] Error: {}", str(e))
+            self._end_stage(error=e)
             return f"Error occurred during trip planning: {str(e)}"
+        finally:
+            # Early returns and cancellation (timeout) leave the current stage open
+            self._end_stage()
 
     async def _generate_pdf_from_markdown(self, markdown_content: str) -> str:
         """Generate comprehensive PDF with itinerary, flights, hotels, and places data"""
+        # Image downloads and the xhtml2pdf render block; keep them off the event loop
+        return await asyncio.to_thread(self._render_pdf, markdown_content)
+
+    def _render_pdf(self, markdown_content: str) -> str:
         try:
-            print("📄 [PDF-GEN] Starting comprehensive PDF generation...")
+            logger.debug("📄 [PDF-GEN] Starting comprehensive PDF generation...")
 
             # Generate HTML content with all travel data
-            html_content = self._create_complete_html_content(markdown_content)
+            with span("pdf.html", markdown_chars=len(markdown_content)):
+                html_content = self._create_complete_html_content(markdown_content)
             
-            # Generate temporary filename using timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            pdf_file = os.path.join(tempfile.gettempdir(), f"itinerary_{timestamp}.pdf")
-            print(f"📝 [PDF-GEN] Creating PDF file: {pdf_file}")
+            # Render into memory: no temp file round trip, and the bytes are encoded straight from the buffer
+            pdf_buffer = io.BytesIO()
 
             # Try using xhtml2pdf first (more reliable than wkhtmltopdf)
             try:
                 from xhtml2pdf import pisa
-                print("✅ [PDF-GEN] Using xhtml2pdf for PDF generation")
+                logger.debug("✅ [PDF-GEN] Using xhtml2pdf for PDF generation")
                 
                 # Configure xhtml2pdf to handle local images and avoid network issues
                 def link_callback(uri, rel):
@@ -435,28 +520,28 @@ class TourPlannerWorkflow:
                         return os.path.join(static_path, uri[8:])  # Remove '/static/' prefix
                     return uri
                 
-                with open(pdf_file, 'wb') as output_file:
+                with span("pdf.xhtml2pdf", html_chars=len(html_content)), PDF_RENDERS_IN_PROGRESS.track_inprogress():
                     pisa_status = pisa.CreatePDF(
                         html_content, 
-                        dest=output_file,
+                        dest=pdf_buffer,
                         link_callback=link_callback
                     )
                 
                 if pisa_status.err:
-                    print(f"⚠️ [PDF-GEN] xhtml2pdf warnings: {pisa_status.err}")
+                    logger.warning("⚠️ [PDF-GEN] xhtml2pdf warnings: {}", pisa_status.err)
                 
-                if os.path.exists(pdf_file) and os.path.getsize(pdf_file) > 1000:
-                    print("✅ [PDF-GEN] PDF generated successfully with xhtml2pdf")
+                if pdf_buffer.getbuffer().nbytes > 1000:
+                    logger.info("✅ [PDF-GEN] PDF generated successfully with xhtml2pdf")
                 else:
                     raise RuntimeError("xhtml2pdf generated invalid or empty PDF")
                     
             except Exception as xhtml_error:
-                print(f"❌ [PDF-GEN] xhtml2pdf failed: {str(xhtml_error)}")
+                logger.error("❌ [PDF-GEN] xhtml2pdf failed: {}", str(xhtml_error))
                 
                 # Fallback to pdfkit if available
                 try:
                     import pdfkit
-                    print("🔄 [PDF-GEN] Falling back to pdfkit...")
+                    logger.debug("🔄 [PDF-GEN] Falling back to pdfkit...")
                     
                     options = {
                         'encoding': 'UTF-8',
@@ -469,54 +554,44 @@ class TourPlannerWorkflow:
                         'quiet': ''
                     }
                     
-                    pdfkit.from_string(html_content, pdf_file, options=options)
-                    print("✅ [PDF-GEN] PDF generated successfully with pdfkit")
+                    # output_path=False returns the PDF bytes instead of writing a file
+                    pdf_buffer = io.BytesIO(pdfkit.from_string(html_content, False, options=options) or b"")
+                    logger.info("✅ [PDF-GEN] PDF generated successfully with pdfkit")
                     
                 except Exception as pdfkit_error:
-                    print(f"❌ [PDF-GEN] pdfkit also failed: {str(pdfkit_error)}")
+                    logger.error("❌ [PDF-GEN] pdfkit also failed: {}", str(pdfkit_error))
                     return self._fallback_markdown_download(markdown_content)
 
-            # Verify PDF was created successfully
-            if not os.path.exists(pdf_file):
-                print("❌ [PDF-GEN] PDF file was not created")
-                return self._fallback_markdown_download(markdown_content)
+            # The HTML is usually bigger than the PDF; drop it before encoding
+            del html_content
 
-            file_size = os.path.getsize(pdf_file)
-            print(f"📊 [PDF-GEN] PDF file size: {file_size} bytes")
+            file_size = pdf_buffer.getbuffer().nbytes
+            logger.debug("📊 [PDF-GEN] PDF size: {} bytes", file_size)
 
             if file_size < 1000:
-                print("❌ [PDF-GEN] PDF file is too small, likely corrupted")
+                logger.error("❌ [PDF-GEN] PDF is too small, likely corrupted")
                 return self._fallback_markdown_download(markdown_content)
 
-            # Read PDF file and convert to base64
-            print("📖 [PDF-GEN] Reading PDF file...")
-            with open(pdf_file, 'rb') as f:
-                pdf_data = f.read()
-
-            print(f"🔄 [PDF-GEN] Converting {len(pdf_data)} bytes to base64...")
-            pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
-            print(f"✅ [PDF-GEN] PDF converted to base64 ({len(pdf_base64)} characters)")
-
-            # Clean up temporary file
-            try:
-                os.unlink(pdf_file)
-                print("🧹 [PDF-GEN] Temporary file cleaned up")
-            except Exception as cleanup_error:
-                print(f"⚠️ [PDF-GEN] Cleanup warning: {str(cleanup_error)}")
+            # Encode from a view of the buffer (no bytes copy) and release the PDF before building the str
+            logger.debug("🔄 [PDF-GEN] Converting {} bytes to base64...", file_size)
+            with pdf_buffer.getbuffer() as pdf_view:
+                encoded = base64.b64encode(pdf_view)
+            pdf_buffer.close()
+            pdf_base64 = encoded.decode('ascii')
+            del encoded
+            logger.info("✅ [PDF-GEN] PDF converted to base64 ({} characters)", len(pdf_base64))
 
-            print("✅ [PDF-GEN] PDF generation completed successfully")
+            logger.info("✅ [PDF-GEN] PDF generation completed successfully")
             return pdf_base64
 
         except Exception as e:
-            print(f"❌ [PDF-GEN] Unexpected error in PDF generation: {str(e)}")
-            import traceback
-            print(f"❌ [PDF-GEN] Traceback: {traceback.format_exc()}")
+            logger.exception("❌ [PDF-GEN] Unexpected error in PDF generation: {}", e)
             return self._fallback_markdown_download(markdown_content)
 
     def _create_complete_html_content(self, itinerary_content: str) -> str:
         """Create comprehensive HTML content with all travel data"""
         try:
-            print("🎨 [PDF-GEN] Creating comprehensive HTML content...")
+            logger.debug("🎨 [PDF-GEN] Creating comprehensive HTML content...")
             
             # Convert markdown itinerary to HTML
             try:
@@ -810,11 +885,11 @@ class TourPlannerWorkflow:
             </html>
             """
             
-            print("✅ [PDF-GEN] HTML content created successfully")
+            logger.debug("✅ [PDF-GEN] HTML content created successfully")
             return html_content
             
         except Exception as e:
-            print(f"❌ [PDF-GEN] Error creating HTML content: {str(e)}")
+            logger.error("❌ [PDF-GEN] Error creating HTML content: {}", str(e))
             # Fallback to simple HTML
             return f"""
             <!DOCTYPE html>
@@ -840,7 +915,7 @@ class TourPlannerWorkflow:
         if not self.flights_data or self.flights_data.strip() == "":
             return '<div class="section"><h2 class="section-title">✈️ Flights</h2><div class="no-data">No flight information available</div></div>'
         
-        flights_html = '<div class="section page-break"><h2 class="section-title">✈️ Flights</h2>'
+        flights_html = ['<div class="section page-break"><h2 class="section-title">✈️ Flights</h2>']
         
         try:
             # Parse flight data
@@ -851,11 +926,11 @@ class TourPlannerWorkflow:
                 line = line.strip()
                 if not line:
                     if current_flight:
-                        flights_html += self._format_flight_html(current_flight)
+                        flights_html.append(self._format_flight_html(current_flight))
                         current_flight = {}
                 elif ' - ' in line and ('→' in line or '->' in line):
                     if current_flight:
-                        flights_html += self._format_flight_html(current_flight)
+                        flights_html.append(self._format_flight_html(current_flight))
                     current_flight = {'route': line}
                 elif line.startswith('Price'):
                     current_flight['price'] = line
@@ -863,14 +938,14 @@ class TourPlannerWorkflow:
                     current_flight['duration'] = line
             
             if current_flight:
-                flights_html += self._format_flight_html(current_flight)
+                flights_html.append(self._format_flight_html(current_flight))
                 
         except Exception as e:
-            print(f"⚠️ [PDF-GEN] Error parsing flights: {str(e)}")
-            flights_html += f'<div class="flight-item"><pre>{self.flights_data}</pre></div>'
+            logger.warning("⚠️ [PDF-GEN] Error parsing flights: {}", str(e))
+            flights_html.append(f'<div class="flight-item"><pre>{self.flights_data}</pre></div>')
         
-        flights_html += '</div>'
-        return flights_html
+        flights_html.append('</div>')
+        return "".join(flights_html)
 
     def _format_flight_html(self, flight_data: dict) -> str:
         """Format individual flight data as HTML"""
@@ -889,7 +964,7 @@ class TourPlannerWorkflow:
         if not self.hotels_data or self.hotels_data.strip() == "":
             return '<div class="section"><h2 class="section-title">🏨 Hotels</h2><div class="no-data">No hotel information available</div></div>'
         
-        hotels_html = '<div class="section page-break"><h2 class="section-title">🏨 Hotels</h2>'
+        hotels_html = ['<div class="section page-break"><h2 class="section-title">🏨 Hotels</h2>']
         
         try:
             # Parse hotel blocks
@@ -897,14 +972,14 @@ class TourPlannerWorkflow:
             
             for hotel_block in hotel_blocks:
                 if hotel_block.strip():
-                    hotels_html += self._format_hotel_html(hotel_block)
+                    hotels_html.append(self._format_hotel_html(hotel_block))
                     
         except Exception as e:
-            print(f"⚠️ [PDF-GEN] Error parsing hotels: {str(e)}")
-            hotels_html += f'<div class="hotel-item"><pre>{self.hotels_data}</pre></div>'
+            logger.warning("⚠️ [PDF-GEN] Error parsing hotels: {}", str(e))
+            hotels_html.append(f'<div class="hotel-item"><pre>{self.hotels_data}</pre></div>')
         
-        hotels_html += '</div>'
-        return hotels_html
+        hotels_html.append('</div>')
+        return "".join(hotels_html)
 
     def _format_hotel_html(self, hotel_block: str) -> str:
         """Format individual hotel data as HTML"""
@@ -943,7 +1018,7 @@ class TourPlannerWorkflow:
         if not self.places_data or self.places_data.strip() == "":
             return '<div class="section"><h2 class="section-title">📍 Places to Visit</h2><div class="no-data">No places information available</div></div>'
         
-        places_html = '<div class="section page-break"><h2 class="section-title">📍 Places to Visit</h2>'
+        places_html = ['<div class="section page-break"><h2 class="section-title">📍 Places to Visit</h2>']
         
         try:
             # Parse places data
@@ -954,7 +1029,7 @@ class TourPlannerWorkflow:
                 line = line.strip()
                 if not line:
                     if current_place:
-                        places_html += self._format_place_html(current_place)
+                        places_html.append(self._format_place_html(current_place))
                         current_place = {}
                 elif line.startswith('Description:'):
                     current_place['description'] = line.replace('Description:', '').strip()
@@ -971,23 +1046,25 @@ class TourPlannerWorkflow:
                     current_place['name'] = line
             
             if current_place:
-                places_html += self._format_place_html(current_place)
+                places_html.append(self._format_place_html(current_place))
                 
         except Exception as e:
-            print(f"⚠️ [PDF-GEN] Error parsing places: {str(e)}")
-            places_html += f'<div class="place-item"><pre>{self.places_data}</pre></div>'
+            logger.warning("⚠️ [PDF-GEN] Error parsing places: {}", str(e))
+            places_html.append(f'<div class="place-item"><pre>{self.places_data}</pre></div>')
         
-        places_html += '</div>'
-        return places_html
+        places_html.append('</div>')
+        return "".join(places_html)
 
     def _format_place_html(self, place_data: dict) -> str:
         """Format individual place data as HTML with embedded images"""
         # Include image if available
         image_html = ""
-        if 'image' in place_data and place_data['image'] and place_data['image'] != 'N/A':
+        # Remote photos are fetched one by one; leave them out when the deadline is close
+        if 'image' in place_data and place_data['image'] and place_data['image'] != 'N/A' and not (
+                place_data['image'].startswith('http') and skip_optional("pdf.place_images", reserve=PDF_RESERVE_SECONDS)):
             try:
                 from utils.image_handler import image_handler
-                print(f"🖼️ [PDF-GEN] Processing image for {place_data.get('name', 'Place')}: {place_data['image']}")
+                logger.debug("🖼️ [PDF-GEN] Processing image for {}: {}", place_data.get('name', 'Place'), place_data['image'])
                 
                 # Get image as base64 data URI
                 image_data, is_fallback = image_handler.get_image_data(
@@ -996,9 +1073,9 @@ class TourPlannerWorkflow:
                 )
                 
                 if is_fallback:
-                    print(f"⚠️ [PDF-GEN] Using fallback image for {place_data.get('name', 'Place')}")
+                    logger.warning("⚠️ [PDF-GEN] Using fallback image for {}", place_data.get('name', 'Place'))
                 else:
-                    print(f"✅ [PDF-GEN] Successfully loaded image for {place_data.get('name', 'Place')}")
+                    logger.debug("✅ [PDF-GEN] Successfully loaded image for {}", place_data.get('name', 'Place'))
                 
                 # Create data URI
                 data_uri = f"data:image/png;base64,{image_data}"
@@ -1012,7 +1089,7 @@ class TourPlannerWorkflow:
                 """
                 
             except Exception as e:
-                print(f"❌ [PDF-GEN] Error processing image for {place_data.get('name', 'Place')}: {str(e)}")
+                logger.error("❌ [PDF-GEN] Error processing image for {}: {}", place_data.get('name', 'Place'), str(e))
                 # Don't show broken image links
                 image_html = ""
         
@@ -1030,11 +1107,11 @@ class TourPlannerWorkflow:
 
     def _fallback_markdown_download(self, markdown_content: str) -> str:
         """Fallback to markdown download when PDF generation fails"""
-        print("🔄 [PDF-GEN] Using markdown fallback")
+        logger.debug("🔄 [PDF-GEN] Using markdown fallback")
         try:
             markdown_base64 = base64.b64encode(markdown_content.encode('utf-8')).decode('utf-8')
-            print(f"✅ [PDF-GEN] Markdown fallback ready ({len(markdown_base64)} characters)")
+            logger.info("✅ [PDF-GEN] Markdown fallback ready ({} characters)", len(markdown_base64))
             return markdown_base64
         except Exception as fallback_error:
-            print(f"❌ [PDF-GEN] Markdown fallback failed: {str(fallback_error)}")
+            logger.error("❌ [PDF-GEN] Markdown fallback failed: {}", str(fallback_error))
             return ""